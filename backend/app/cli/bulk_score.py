@@ -0,0 +1,386 @@
+# app/cli/bulk_score.py
+"""Skoring offline banyak gambar dengan pipeline PredictService.
+
+Gambar diambil dari folder (rekursif) atau manifest (satu path per baris, atau
+CSV dengan kolom `path`). Decode + ekstraksi fitur berjalan paralel di proses
+worker, inferensi dilakukan per chunk di proses utama, dan hasil ditulis
+bertahap ke CSV / JSONL / Parquet. Path yang sudah selesai dicatat di file
+checkpoint sehingga run yang terputus bisa dilanjutkan dengan `--resume`.
+
+Jalankan dari folder backend:
+    python -m app.cli.bulk_score data/arsip --output hasil.csv --resume
+"""
+
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Set
+
+import numpy as np
+
+from app.services.predict_service import PredictService, _warm_up_worker
+
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".bmp", ".webp", ".tif", ".tiff"}
+FORMATS = ("csv", "jsonl", "parquet")
+MODEL_TYPES = ("knn", "svm")
+COLUMNS = [
+    "path",
+    "svm_label",
+    "svm_confidence",
+    "knn_label",
+    "knn_confidence",
+    "extraction_ms",
+    "error",
+]
+# Tipe kolom untuk schema Parquet; kolom lain bertipe string. Schema ditetapkan
+# di awal agar chunk tanpa error (kolom `error` semua None) tidak membuat tipe
+# `null` yang lalu bentrok dengan chunk berikutnya.
+COLUMN_TYPES = {
+    "svm_confidence": "float64",
+    "knn_confidence": "float64",
+    "extraction_ms": "int64",
+}
+
+
+# ==================== INPUT ====================
+
+
+def iter_directory(root: Path) -> Iterator[str]:
+    """Semua file gambar di bawah `root`, urut agar hasil bisa direproduksi."""
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for filename in sorted(filenames):
+            if Path(filename).suffix.lower() in IMAGE_EXTENSIONS:
+                yield str(Path(dirpath) / filename)
+
+
+def iter_manifest(manifest: Path) -> Iterator[str]:
+    """Path dari manifest: CSV berkolom `path` atau teks satu path per baris.
+
+    Path relatif dianggap relatif terhadap folder manifest.
+    """
+    base = manifest.parent
+    with open(manifest, newline="", encoding="utf-8") as handle:
+        if manifest.suffix.lower() == ".csv":
+            rows = (row["path"] for row in csv.DictReader(handle))
+        else:
+            rows = (line.strip() for line in handle)
+
+        for row in rows:
+            if row and not row.startswith("#"):
+                yield str(base / row) if not os.path.isabs(row) else row
+
+
+# ==================== WORKER ====================
+
+
+def _score_path(path: str) -> dict:
+    """Baca file lalu ekstraksi fitur di proses worker.
+
+    Error per file dikembalikan sebagai data agar satu gambar rusak tidak
+    menghentikan seluruh run.
+    """
+    start = time.perf_counter()
+    try:
+        image_bytes = Path(path).read_bytes()
+        img_bgr = PredictService._decode_image(image_bytes)
+        if img_bgr is None:
+            raise ValueError("Gagal membaca gambar.")
+        features = PredictService._extract_features(img_bgr)
+    except Exception as exc:
+        return {"path": path, "features": None, "error": str(exc)}
+
+    return {
+        "path": path,
+        "features": features,
+        "extraction_ms": int((time.perf_counter() - start) * 1000),
+        "error": None,
+    }
+
+
+# ==================== OUTPUT ====================
+
+
+class ResultWriter:
+    """Penulis hasil bertahap (append) untuk CSV, JSONL, atau Parquet.
+
+    Parquet tidak bisa di-append, jadi run lanjutan menulis file bagian baru
+    (`hasil.1.parquet`, `hasil.2.parquet`, ...) di samping file awal.
+    """
+
+    def __init__(self, output: Path, output_format: str, columns: List[str] = COLUMNS):
+        self.output = output
+        self.format = output_format
+        self._handle = None
+        self._csv = None
+        self._parquet = None
+        self._schema = None
+
+        if output_format == "parquet":
+            try:
+                import pyarrow as pa
+            except ImportError:
+                raise SystemExit(
+                    "Format parquet membutuhkan pyarrow: pip install pyarrow"
+                )
+            self._schema = pa.schema(
+                [
+                    (name, pa.type_for_alias(COLUMN_TYPES.get(name, "string")))
+                    for name in columns
+                ]
+            )
+            self.output = self._next_parquet_path(output)
+        else:
+            is_new = not output.exists() or output.stat().st_size == 0
+            self._handle = open(output, "a", newline="", encoding="utf-8")
+            if output_format == "csv":
+                self._csv = csv.DictWriter(self._handle, fieldnames=columns)
+                if is_new:
+                    self._csv.writeheader()
+
+    @staticmethod
+    def _next_parquet_path(output: Path) -> Path:
+        candidate, index = output, 0
+        while candidate.exists():
+            index += 1
+            candidate = output.with_name(f"{output.stem}.{index}{output.suffix}")
+        return candidate
+
+    def write(self, rows: List[dict]) -> None:
+        """Menulis satu chunk lalu flush ke disk sebelum checkpoint diperbarui."""
+        if not rows:
+            return
+
+        if self.format == "parquet":
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            table = pa.Table.from_pylist(rows, schema=self._schema)
+            if self._parquet is None:
+                self._parquet = pq.ParquetWriter(self.output, self._schema)
+            self._parquet.write_table(table)
+            return
+
+        if self.format == "csv":
+            self._csv.writerows(rows)
+        else:
+            for row in rows:
+                self._handle.write(json.dumps(row, ensure_ascii=False) + "\n")
+        self._handle.flush()
+        os.fsync(self._handle.fileno())
+
+    def close(self) -> None:
+        if self._parquet is not None:
+            self._parquet.close()
+        if self._handle is not None:
+            self._handle.close()
+
+
+class Checkpoint:
+    """Daftar path yang sudah ditulis ke output (satu path per baris)."""
+
+    def __init__(self, path: Path, resume: bool):
+        self.path = path
+        self.done: Set[str] = set()
+        if resume and path.exists():
+            with open(path, encoding="utf-8") as handle:
+                self.done = {line.rstrip("\n") for line in handle if line.strip()}
+        elif path.exists():
+            path.unlink()
+        self._handle = open(path, "a", encoding="utf-8")
+
+    def mark(self, paths: Iterable[str]) -> None:
+        for path in paths:
+            self._handle.write(path + "\n")
+            self.done.add(path)
+        self._handle.flush()
+        os.fsync(self._handle.fileno())
+
+    def close(self) -> None:
+        self._handle.close()
+
+
+# ==================== SCORING ====================
+
+
+def _infer_chunk(items: List[dict]) -> List[dict]:
+    """Inferensi satu chunk: fitur ditumpuk agar tiap model dipanggil sekali."""
+    ok = [item for item in items if item["error"] is None]
+    predictions: Dict[str, list] = {}
+    if ok:
+        features = np.vstack([item["features"] for item in ok])
+        predictions = {
+            model_type: PredictService._infer_batch(features, model_type)
+            for model_type in MODEL_TYPES
+        }
+
+    rows, position = [], 0
+    for item in items:
+        row = dict.fromkeys(COLUMNS)
+        row["path"] = item["path"]
+        row["error"] = item["error"]
+        if item["error"] is None:
+            for model_type in MODEL_TYPES:
+                prediction = predictions[model_type][position]
+                row[f"{model_type}_label"] = prediction.label
+                row[f"{model_type}_confidence"] = prediction.confidence
+            row["extraction_ms"] = item["extraction_ms"]
+            position += 1
+        rows.append(row)
+    return rows
+
+
+def score(
+    paths: Iterable[str],
+    writer: ResultWriter,
+    checkpoint: Checkpoint,
+    workers: int,
+    chunk_size: int,
+    progress_every: int = 1000,
+) -> dict:
+    """Menjalankan skoring dan mengembalikan ringkasan run."""
+    PredictService._load_models()
+
+    max_in_flight = workers * 4
+    summary = {"scored": 0, "failed": 0, "skipped": 0}
+    pending_rows: List[dict] = []
+    start = time.perf_counter()
+
+    def flush():
+        rows = _infer_chunk(pending_rows)
+        writer.write(rows)
+        checkpoint.mark(row["path"] for row in rows)
+        summary["scored"] += sum(row["error"] is None for row in rows)
+        summary["failed"] += sum(row["error"] is not None for row in rows)
+        pending_rows.clear()
+
+    def collect(done_futures):
+        for future in done_futures:
+            pending_rows.append(future.result())
+            if len(pending_rows) < chunk_size:
+                continue
+
+            before = summary["scored"] + summary["failed"]
+            flush()
+            processed = summary["scored"] + summary["failed"]
+            if before // progress_every != processed // progress_every:
+                rate = processed / (time.perf_counter() - start)
+                print(f"{processed} gambar, {rate:.1f} img/s", file=sys.stderr)
+
+    # spawn + initializer yang sama dengan backend `process` di API
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_warm_up_worker,
+    ) as executor:
+        in_flight = set()
+        for path in paths:
+            if path in checkpoint.done:
+                summary["skipped"] += 1
+                continue
+
+            in_flight.add(executor.submit(_score_path, path))
+            if len(in_flight) >= max_in_flight:
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                collect(done)
+
+        done, _ = wait(in_flight)
+        collect(done)
+
+    flush()
+    summary["seconds"] = round(time.perf_counter() - start, 2)
+    return summary
+
+
+# ==================== CLI ====================
+
+
+def _parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m app.cli.bulk_score",
+        description="Skoring offline gambar cabai dengan model SVM & KNN.",
+    )
+    parser.add_argument(
+        "source", type=Path, help="Folder gambar atau file manifest (.txt / .csv)."
+    )
+    parser.add_argument(
+        "--output", "-o", type=Path, required=True, help="File hasil skoring."
+    )
+    parser.add_argument(
+        "--format",
+        choices=FORMATS,
+        help="Format output (default: dari ekstensi --output, fallback csv).",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Jumlah proses ekstraksi fitur (default: jumlah core).",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=256,
+        help="Jumlah gambar per inferensi batch & penulisan output.",
+    )
+    parser.add_argument(
+        "--checkpoint",
+        type=Path,
+        help="File checkpoint (default: <output>.checkpoint).",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Lewati path yang sudah tercatat di checkpoint.",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = _parse_args(argv)
+
+    output_format = args.format or args.output.suffix.lstrip(".").lower()
+    if output_format not in FORMATS:
+        output_format = "csv"
+
+    if args.source.is_dir():
+        paths = iter_directory(args.source)
+    elif args.source.is_file():
+        paths = iter_manifest(args.source)
+    else:
+        print(f"Sumber tidak ditemukan: {args.source}", file=sys.stderr)
+        return 2
+
+    checkpoint_path = args.checkpoint or args.output.with_name(
+        args.output.name + ".checkpoint"
+    )
+    if not args.resume and args.output.exists() and output_format != "parquet":
+        # Run baru menimpa output lama agar baris tidak tercampur
+        args.output.unlink()
+
+    checkpoint = Checkpoint(checkpoint_path, resume=args.resume)
+    writer = ResultWriter(args.output, output_format)
+    try:
+        summary = score(
+            paths,
+            writer,
+            checkpoint,
+            workers=max(1, args.workers),
+            chunk_size=max(1, args.chunk_size),
+        )
+    finally:
+        writer.close()
+        checkpoint.close()
+
+    print(json.dumps({"output": str(writer.output), **summary}), file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
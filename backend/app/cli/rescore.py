@@ -0,0 +1,190 @@
+# app/cli/rescore.py
+"""Skoring ulang vektor fitur tersimpan dengan model (versi) lain.
+
+Vektor dibaca dari feature store (memmap, tanpa decode/preprocessing gambar)
+lalu dialirkan per batch besar ke scaler, PCA, dan classifier versi model
+yang dipilih. Hasil per stored filename ditulis ke CSV / JSONL / Parquet,
+sehingga bisa di-join ke `predict_history.image_url`.
+
+Jalankan dari folder backend:
+    python -m app.cli.rescore --output rescored.csv --model-version 2026-11-02
+"""
+
+import argparse
+import json
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from app.cli.bulk_score import FORMATS, MODEL_TYPES, ResultWriter
+from app.configs import settings
+from app.services.feature_store import FeatureStore
+from app.services.predict_service import PredictService
+
+COLUMNS = ["key", "svm_label", "svm_confidence", "knn_label", "knn_confidence"]
+
+
+def _load_models(version: str) -> dict:
+    """Artefak satu versi model dari registry (tanpa mengubah model aktif)."""
+    registry = PredictService._REGISTRY
+    return PredictService._read_model_artifacts(registry.version_dir(version))
+
+
+def _check_dimension(models: dict, dim: int) -> None:
+    for model_type, artifacts in models.items():
+        expected = getattr(artifacts["scaler"], "n_features_in_", dim)
+        if expected != dim:
+            raise SystemExit(
+                f"Model {model_type.upper()} butuh {expected} fitur, "
+                f"vektor tersimpan berdimensi {dim}."
+            )
+
+
+def rescore(
+    store: FeatureStore,
+    pipeline_version: str,
+    models: dict,
+    writer: ResultWriter,
+    batch_size: int,
+) -> dict:
+    """Menjalankan skoring ulang dan mengembalikan ringkasan run."""
+    summary = {"scored": 0, "labels": {model_type: Counter() for model_type in models}}
+    start = time.perf_counter()
+
+    for keys, vectors in store.iter_batches(pipeline_version, batch_size):
+        if summary["scored"] == 0:
+            _check_dimension(models, vectors.shape[1])
+
+        predictions: Dict[str, list] = {
+            model_type: PredictService._infer_batch(vectors, model_type, models)
+            for model_type in models
+        }
+        rows = []
+        for position, key in enumerate(keys):
+            row = dict.fromkeys(COLUMNS)
+            row["key"] = key
+            for model_type, results in predictions.items():
+                row[f"{model_type}_label"] = results[position].label
+                row[f"{model_type}_confidence"] = results[position].confidence
+                summary["labels"][model_type][results[position].label] += 1
+            rows.append(row)
+
+        writer.write(rows)
+        summary["scored"] += len(rows)
+
+    summary["seconds"] = round(time.perf_counter() - start, 2)
+    summary["labels"] = {
+        model_type: dict(counts) for model_type, counts in summary["labels"].items()
+    }
+    return summary
+
+
+# ==================== CLI ====================
+
+
+def _parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m app.cli.rescore",
+        description="Skoring ulang vektor fitur tersimpan dengan versi model lain.",
+    )
+    parser.add_argument(
+        "--output", "-o", type=Path, required=True, help="File hasil skoring."
+    )
+    parser.add_argument(
+        "--format",
+        choices=FORMATS,
+        help="Format output (default: dari ekstensi --output, fallback csv).",
+    )
+    parser.add_argument(
+        "--store-dir",
+        type=Path,
+        help="Folder feature store (default: FEATURE_STORE_DIR).",
+    )
+    parser.add_argument(
+        "--model-version",
+        help="Versi model di registry (default: versi aktif).",
+    )
+    parser.add_argument(
+        "--pipeline-version",
+        help="Versi pipeline fitur (default: sesuai konfigurasi & model).",
+    )
+    parser.add_argument(
+        "--models",
+        nargs="+",
+        choices=MODEL_TYPES,
+        default=list(MODEL_TYPES),
+        help="Model yang dijalankan.",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=8192,
+        help="Jumlah vektor per inferensi batch & penulisan output.",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = _parse_args(argv)
+
+    output_format = args.format or args.output.suffix.lstrip(".").lower()
+    if output_format not in FORMATS:
+        output_format = "csv"
+
+    version = args.model_version or PredictService._REGISTRY.resolve_active(
+        settings.MODEL_VERSION
+    )
+    models = _load_models(version)
+    models = {model_type: models[model_type] for model_type in args.models}
+    pipeline_version = args.pipeline_version or (
+        PredictService.feature_pipeline_version(
+            PredictService._model_ccd_points(models)
+        )
+    )
+
+    if args.store_dir:
+        store = FeatureStore(args.store_dir)
+    else:
+        store = PredictService._get_feature_store()
+    if store is None:
+        print(
+            "Feature store nonaktif: isi FEATURE_STORE_DIR atau --store-dir.",
+            file=sys.stderr,
+        )
+        return 2
+    if pipeline_version not in store.versions():
+        print(
+            f"Tidak ada vektor fitur versi {pipeline_version} di {store.root} "
+            f"(tersedia: {', '.join(store.versions()) or '-'})",
+            file=sys.stderr,
+        )
+        return 2
+
+    if args.output.exists() and output_format != "parquet":
+        args.output.unlink()
+    writer = ResultWriter(args.output, output_format, COLUMNS)
+    try:
+        summary = rescore(
+            store, pipeline_version, models, writer, max(1, args.batch_size)
+        )
+    finally:
+        writer.close()
+
+    print(
+        json.dumps(
+            {
+                "output": str(writer.output),
+                "model_version": version,
+                "pipeline_version": pipeline_version,
+                **summary,
+            }
+        ),
+        file=sys.stderr,
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -13,10 +13,143 @@ class Settings:
     SUPABASE_KEY: str = os.getenv("SUPABASE_KEY", "")
     SUPABASE_BUCKET: str = os.getenv("SUPABASE_BUCKET", "default-bucket")
 
+    # Verifikasi JWT lokal: secret HS256 proyek dan/atau JWKS (key asimetris)
+    SUPABASE_JWT_SECRET: str = os.getenv("SUPABASE_JWT_SECRET", "")
+    SUPABASE_JWKS_URL: str = os.getenv("SUPABASE_JWKS_URL", "")
+    SUPABASE_JWT_AUDIENCE: str = os.getenv("SUPABASE_JWT_AUDIENCE", "authenticated")
+
+    # Cache token terverifikasi (TTL tetap dibatasi klaim exp token)
+    AUTH_CACHE_SIZE: int = int(os.getenv("AUTH_CACHE_SIZE", "1024"))
+    AUTH_CACHE_TTL_SECONDS: int = int(os.getenv("AUTH_CACHE_TTL_SECONDS", "300"))
+
+    # Thread untuk panggilan jaringan Supabase (storage upload, insert DB)
+    SUPABASE_IO_WORKERS: int = int(os.getenv("SUPABASE_IO_WORKERS", "16"))
+
+    # Antrean persistensi tertunda (/predict?defer=true)
+    PERSIST_QUEUE_SIZE: int = int(os.getenv("PERSIST_QUEUE_SIZE", "1000"))
+    PERSIST_WORKERS: int = int(os.getenv("PERSIST_WORKERS", "4"))
+    PERSIST_MAX_RETRIES: int = int(os.getenv("PERSIST_MAX_RETRIES", "3"))
+    PERSIST_RETRY_BACKOFF_SECONDS: float = float(
+        os.getenv("PERSIST_RETRY_BACKOFF_SECONDS", "1.0")
+    )
+    PERSIST_FLUSH_TIMEOUT_SECONDS: float = float(
+        os.getenv("PERSIST_FLUSH_TIMEOUT_SECONDS", "30")
+    )
+
+    # Job prediksi asinkron (/predict/jobs): backend antrean, worker, retensi hasil
+    JOB_BACKEND: str = os.getenv("JOB_BACKEND", "memory")
+    JOB_QUEUE_SIZE: int = int(os.getenv("JOB_QUEUE_SIZE", "32"))
+    JOB_WORKERS: int = int(os.getenv("JOB_WORKERS", "2"))
+    JOB_RESULT_TTL_SECONDS: int = int(os.getenv("JOB_RESULT_TTL_SECONDS", "3600"))
+    # Webhook callback_url: timeout, retry, secret HMAC, dan daftar host yang boleh
+    JOB_CALLBACK_TIMEOUT_SECONDS: float = float(
+        os.getenv("JOB_CALLBACK_TIMEOUT_SECONDS", "10")
+    )
+    JOB_CALLBACK_RETRIES: int = int(os.getenv("JOB_CALLBACK_RETRIES", "3"))
+    JOB_CALLBACK_SECRET: str = os.getenv("JOB_CALLBACK_SECRET", "")
+    JOB_CALLBACK_ALLOWED_HOSTS: str = os.getenv("JOB_CALLBACK_ALLOWED_HOSTS", "")
+
+    # Cache prediksi per hash konten gambar (TTL 0 = tanpa kedaluwarsa)
+    PREDICTION_CACHE_SIZE: int = int(os.getenv("PREDICTION_CACHE_SIZE", "512"))
+    PREDICTION_CACHE_TTL_SECONDS: int = int(
+        os.getenv("PREDICTION_CACHE_TTL_SECONDS", "0")
+    )
+    # Cache path objek storage per hash konten (upload ulang dilewati)
+    UPLOAD_CACHE_SIZE: int = int(os.getenv("UPLOAD_CACHE_SIZE", "2048"))
+    # Cache halaman/statistik /history per user (diinvalidasi saat insert baru)
+    HISTORY_CACHE_SIZE: int = int(os.getenv("HISTORY_CACHE_SIZE", "1024"))
+    HISTORY_CACHE_TTL_SECONDS: int = int(os.getenv("HISTORY_CACHE_TTL_SECONDS", "30"))
+
+    # Model dimuat & di-warm-up saat startup, bukan di request pertama
+    MODEL_WARMUP: bool = os.getenv("MODEL_WARMUP", "true").lower() == "true"
+    # Memory-map array model (joblib mmap_mode="c") agar page dibagi antar worker
+    MODEL_MMAP: bool = os.getenv("MODEL_MMAP", "false").lower() == "true"
+    # Registry model: versi aktif (kosong = file models/ACTIVE), interval polling
+    # pointer (0 = tanpa hot reload), dan versi shadow + fraksi request sampelnya
+    MODEL_VERSION: str = os.getenv("MODEL_VERSION", "")
+    MODEL_POLL_SECONDS: float = float(os.getenv("MODEL_POLL_SECONDS", "30"))
+    MODEL_SHADOW_VERSION: str = os.getenv("MODEL_SHADOW_VERSION", "")
+    MODEL_SHADOW_SAMPLE_RATE: float = float(
+        os.getenv("MODEL_SHADOW_SAMPLE_RATE", "0.1")
+    )
+
+    # Inferensi gabungan (proyeksi scaler+PCA + satu evaluasi classifier)
+    FUSED_INFERENCE: bool = os.getenv("FUSED_INFERENCE", "true").lower() == "true"
+    # Indeks tetangga KNN: "auto", "brute" (terblok), atau "kdtree"
+    KNN_INDEX: str = os.getenv("KNN_INDEX", "auto")
+
+    # Batas upload: ukuran file (byte) dan resolusi (megapiksel) per gambar
+    MAX_UPLOAD_BYTES: int = int(os.getenv("MAX_UPLOAD_BYTES", str(15 * 1024 * 1024)))
+    MAX_IMAGE_MEGAPIXELS: float = float(os.getenv("MAX_IMAGE_MEGAPIXELS", "50"))
+
+    # Mode kaskade /predict?cascade=true: model pertama dijalankan dulu, model
+    # kedua hanya jika confidence model pertama di bawah threshold
+    CASCADE_FIRST_MODEL: str = os.getenv("CASCADE_FIRST_MODEL", "knn")
+    CASCADE_THRESHOLD: float = float(os.getenv("CASCADE_THRESHOLD", "0.8"))
+
+    # Kebijakan objek storage: "original" (default, bytes upload apa adanya)
+    # atau re-encode ke "jpeg"/"webp" dengan sisi terpanjang & kualitas terbatas.
+    # Re-encode lossy mengubah gambar asli yang dipakai untuk ekstraksi ulang.
+    STORAGE_IMAGE_FORMAT: str = os.getenv("STORAGE_IMAGE_FORMAT", "original")
+    STORAGE_MAX_SIDE: int = int(os.getenv("STORAGE_MAX_SIDE", "2048"))
+    STORAGE_QUALITY: int = int(os.getenv("STORAGE_QUALITY", "85"))
+    # Simpan juga bytes asli di prefix originals/ saat re-encode aktif
+    STORAGE_KEEP_ORIGINAL: bool = (
+        os.getenv("STORAGE_KEEP_ORIGINAL", "false").lower() == "true"
+    )
+    # Thumbnail riwayat di prefix thumbnails/ (0 = tanpa thumbnail)
+    THUMBNAIL_MAX_SIDE: int = int(os.getenv("THUMBNAIL_MAX_SIDE", "320"))
+    THUMBNAIL_QUALITY: int = int(os.getenv("THUMBNAIL_QUALITY", "75"))
+
+    # Ukuran halaman /history (default & maksimum per request)
+    HISTORY_PAGE_SIZE: int = int(os.getenv("HISTORY_PAGE_SIZE", "20"))
+    HISTORY_MAX_PAGE_SIZE: int = int(os.getenv("HISTORY_MAX_PAGE_SIZE", "100"))
+
+    # Batas jumlah gambar untuk endpoint /predict/batch
+    MAX_BATCH_SIZE: int = int(os.getenv("MAX_BATCH_SIZE", "50"))
+
+    # Executor ekstraksi fitur: "thread" atau "process" (melewati GIL)
+    FEATURE_EXECUTOR_BACKEND: str = os.getenv("FEATURE_EXECUTOR_BACKEND", "thread")
+    FEATURE_EXECUTOR_WORKERS: int = int(
+        os.getenv("FEATURE_EXECUTOR_WORKERS", str(os.cpu_count() or 1))
+    )
+    FEATURE_EXECUTOR_QUEUE_SIZE: int = int(
+        os.getenv("FEATURE_EXECUTOR_QUEUE_SIZE", "32")
+    )
+
+    # Admission control prediksi (unit = gambar yang perlu ekstraksi fitur).
+    # 0 = nonaktif. Target latensi 0 = limit statis, >0 = limit adaptif (AIMD)
+    ADMISSION_MAX_CONCURRENCY: int = int(
+        os.getenv("ADMISSION_MAX_CONCURRENCY", str(2 * (os.cpu_count() or 1)))
+    )
+    ADMISSION_MIN_CONCURRENCY: int = int(os.getenv("ADMISSION_MIN_CONCURRENCY", "1"))
+    ADMISSION_QUEUE_SIZE: int = int(os.getenv("ADMISSION_QUEUE_SIZE", "64"))
+    ADMISSION_QUEUE_TIMEOUT_SECONDS: float = float(
+        os.getenv("ADMISSION_QUEUE_TIMEOUT_SECONDS", "10")
+    )
+    ADMISSION_TARGET_LATENCY_MS: float = float(
+        os.getenv("ADMISSION_TARGET_LATENCY_MS", "0")
+    )
+
+    # Preprocessing: "full" (resolusi asli) atau "downscale" (resolusi kerja terbatas)
+    PREPROCESS_MODE: str = os.getenv("PREPROCESS_MODE", "full")
+    PREPROCESS_MAX_SIDE: int = int(os.getenv("PREPROCESS_MAX_SIDE", "1024"))
+    # Lean: buffer kerja per worker dipakai ulang (hasil identik dengan non-lean)
+    PREPROCESS_LEAN: bool = os.getenv("PREPROCESS_LEAN", "true").lower() == "true"
+    PREPROCESS_SCRATCH_MAX_PIXELS: int = int(
+        os.getenv("PREPROCESS_SCRATCH_MAX_PIXELS", "4000000")
+    )
+
+    # Tingkat keabuan GLCM: 256 = kompatibel dengan model .pkl saat ini
+    GLCM_LEVELS: int = int(os.getenv("GLCM_LEVELS", "256"))
+
+    # Folder feature store (vektor fitur per stored filename), kosong = nonaktif.
+    # Path relatif diukur dari folder backend, bukan working directory proses
+    FEATURE_STORE_DIR: str = os.getenv("FEATURE_STORE_DIR", "")
+    # Batas ukuran satu file versi pipeline (MB, 0 = tanpa batas); di atasnya
+    # vektor baru dilewati sampai file dirotasi/dihapus
+    FEATURE_STORE_MAX_MB: int = int(os.getenv("FEATURE_STORE_MAX_MB", "1024"))
+
 
 # Instance Settings yang akan diimpor
 settings = Settings()
-
-# Pengecekan dasar
-if not settings.SUPABASE_URL or not settings.SUPABASE_KEY:
-    raise ValueError("SUPABASE_URL atau SUPABASE_KEY tidak ditemukan.")
@@ -1,10 +1,18 @@
 # app/db/client.py (Kode yang Diperbaiki)
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
 
 from supabase import create_client, Client
 
 # Hapus impor ClientOptions jika tidak diperlukan
 from app.configs import settings
 
+# Pengecekan dasar (dilakukan di sini agar tool offline seperti benchmark
+# tetap bisa memakai settings tanpa kredensial Supabase)
+if not settings.SUPABASE_URL or not settings.SUPABASE_KEY:
+    raise ValueError("SUPABASE_URL atau SUPABASE_KEY tidak ditemukan.")
+
 # Inisialisasi Klien Supabase
 # Cukup panggil create_client dengan URL dan Kunci
 supabase: Client = create_client(
@@ -25,3 +33,24 @@ db_client = supabase.table
 # Fungsi ini dapat dipanggil oleh service layer
 def get_supabase_clients():
     return storage_client, db_client
+
+
+# Klien supabase-py bersifat sinkron (httpx.Client ber-pool yang dipakai bersama),
+# jadi semua panggilan jaringan storage/DB dijalankan di executor I/O terbatas
+# agar tidak memblokir event loop.
+_io_executor = ThreadPoolExecutor(
+    max_workers=settings.SUPABASE_IO_WORKERS, thread_name_prefix="supabase-io"
+)
+
+
+async def run_io(func, *args, **kwargs):
+    """Menjalankan panggilan Supabase sinkron di executor I/O."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _io_executor, functools.partial(func, *args, **kwargs)
+    )
+
+
+def shutdown_io_executor():
+    """Menunggu I/O Supabase yang masih berjalan lalu menutup executor."""
+    _io_executor.shutdown(wait=True)
@@ -1,7 +1,46 @@
 # app/main.py
+import asyncio
+import contextlib
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.routes import predict
+from app.configs import settings
+from app.db.client import shutdown_io_executor
+from app.middlewares.auth import close_http_client
+from app.middlewares.metrics import metrics_middleware
+from app.routes import history, metrics, predict
+from app.services.persistence_queue import persistence_queue
+from app.services.predict_service import PredictService
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Menyiapkan dan menutup resource aplikasi."""
+    if settings.MODEL_WARMUP:
+        # Load model + satu prediksi sintetis sebelum menerima request
+        await PredictService.warm_up()
+    # Versi model aktif/shadow dari registry, dicek ulang tiap MODEL_POLL_SECONDS
+    model_watcher = asyncio.create_task(
+        PredictService.watch_model_registry(settings.MODEL_POLL_SECONDS)
+    )
+    yield
+    model_watcher.cancel()
+    with contextlib.suppress(asyncio.CancelledError):
+        await model_watcher
+    # Selesaikan job prediksi yang sudah diterima sebelum antrean persistensi ditutup
+    await predict.job_runner.stop(timeout=settings.PERSIST_FLUSH_TIMEOUT_SECONDS)
+    # Flush job persistensi tertunda selagi executor & klien masih terbuka
+    await persistence_queue.stop(timeout=settings.PERSIST_FLUSH_TIMEOUT_SECONDS)
+    # Vektor fitur yang masih ditulis di background
+    await PredictService.flush_feature_store(
+        timeout=settings.PERSIST_FLUSH_TIMEOUT_SECONDS
+    )
+    # Tutup pool ekstraksi fitur (termasuk proses worker jika backend=process)
+    PredictService.shutdown()
+    await close_http_client()
+    shutdown_io_executor()
+
 
 # Inisialisasi Aplikasi FastAPI
 app = FastAPI(
@@ -10,6 +49,7 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/docs",  # Swagger UI akan tersedia di http://127.0.0.1:8000/docs
     redoc_url="/redoc",  # ReDoc akan tersedia di http://127.0.0.1:8000/redoc
+    lifespan=lifespan,
 )
 
 app.add_middleware(
@@ -20,8 +60,13 @@ app.add_middleware(
     allow_headers=["*"],  # izinkan semua header
 )
 
+# Durasi request per route + header Server-Timing opsional (?trace=true)
+app.middleware("http")(metrics_middleware)
+
 # Memasukkan semua Routes/Controllers ke dalam aplikasi
 app.include_router(predict.router)
+app.include_router(history.router)
+app.include_router(metrics.router)
 
 if __name__ == "__main__":
     import uvicorn
@@ -1,9 +1,34 @@
+import asyncio
+import hashlib
+import time
+from typing import Optional
+
 import httpx
+import jwt
 from fastapi import Header, HTTPException, status
 
 from app.configs import settings
+from app.services import metrics
+from app.services.cache import TTLCache
 
 _SUPABASE_USER_ENDPOINT = "/auth/v1/user"
+_SUPABASE_JWKS_ENDPOINT = "/auth/v1/.well-known/jwks.json"
+_JWKS_REFRESH_SECONDS = 600
+_JWKS_MIN_REFETCH_SECONDS = 30
+_ASYMMETRIC_ALGORITHMS = ("RS256", "ES256", "EdDSA")
+
+# Token yang sudah terverifikasi, TTL per entri dibatasi klaim `exp` token
+_token_cache = TTLCache(
+    maxsize=settings.AUTH_CACHE_SIZE, ttl=settings.AUTH_CACHE_TTL_SECONDS
+)
+_verification_counts = {"local": 0, "remote": 0}
+
+# Satu AsyncClient ber-pool untuk Supabase Auth (hindari handshake TLS per request)
+_http_client: Optional[httpx.AsyncClient] = None
+
+_jwks_keys: dict = {}
+_jwks_fetched_at = float("-inf")
+_jwks_lock = asyncio.Lock()
 
 
 def _extract_bearer_token(authorization: str) -> str:
@@ -23,21 +48,115 @@ def _extract_bearer_token(authorization: str) -> str:
     return token.strip()
 
 
-async def verify_supabase_token(authorization: str = Header(...)) -> dict:
-    """Memastikan token Supabase valid dengan memanggil endpoint Auth."""
-    token = _extract_bearer_token(authorization)
+def _invalid_token() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Token Supabase tidak valid atau kedaluwarsa.",
+    )
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """AsyncClient bersama untuk memanggil Supabase Auth."""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(base_url=settings.SUPABASE_URL, timeout=10.0)
+    return _http_client
+
+
+async def close_http_client() -> None:
+    """Menutup AsyncClient bersama; dipanggil saat aplikasi berhenti."""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+
+def token_cache_stats() -> dict:
+    """Statistik cache token dan jumlah verifikasi lokal/remote."""
+    return {
+        **_token_cache.stats(),
+        "local_verifications": _verification_counts["local"],
+        "remote_verifications": _verification_counts["remote"],
+    }
+
+
+def _jwks_needs_fetch(kid: Optional[str]) -> bool:
+    age = time.monotonic() - _jwks_fetched_at
+    if kid in _jwks_keys:
+        return age > _JWKS_REFRESH_SECONDS
+    # kid belum dikenal (mis. rotasi key): fetch ulang, tapi dibatasi
+    return age > _JWKS_MIN_REFETCH_SECONDS
+
+
+async def _get_jwks_key(kid: Optional[str]):
+    """Public key JWKS proyek untuk `kid` (di-cache, None jika tidak tersedia)."""
+    global _jwks_keys, _jwks_fetched_at
+
+    if _jwks_needs_fetch(kid):
+        async with _jwks_lock:
+            # Cek ulang: request lain mungkin sudah memperbarui JWKS
+            if _jwks_needs_fetch(kid):
+                try:
+                    response = await get_http_client().get(
+                        settings.SUPABASE_JWKS_URL or _SUPABASE_JWKS_ENDPOINT,
+                        headers={"apikey": settings.SUPABASE_KEY},
+                    )
+                    response.raise_for_status()
+                    _jwks_keys = {
+                        jwk.get("kid"): jwt.PyJWK(jwk).key
+                        for jwk in response.json().get("keys", [])
+                    }
+                except (httpx.HTTPError, ValueError, jwt.PyJWTError):
+                    pass
+                _jwks_fetched_at = time.monotonic()
+
+    return _jwks_keys.get(kid)
+
+
+async def _verify_locally(token: str) -> Optional[dict]:
+    """Validasi signature + expiry JWT tanpa round trip ke Supabase Auth.
+
+    Mengembalikan klaim jika valid, None jika verifikasi lokal tidak bisa
+    dilakukan (tidak ada secret/JWKS yang cocok) sehingga perlu fallback remote.
+    Token yang jelas tidak valid langsung ditolak dengan 401.
+    """
+    try:
+        header = jwt.get_unverified_header(token)
+    except jwt.PyJWTError:
+        raise _invalid_token()
 
+    algorithm = header.get("alg")
+    if algorithm == "HS256" and settings.SUPABASE_JWT_SECRET:
+        key = settings.SUPABASE_JWT_SECRET
+    elif algorithm in _ASYMMETRIC_ALGORITHMS:
+        key = await _get_jwks_key(header.get("kid"))
+        if key is None:
+            return None
+    else:
+        return None
+
+    try:
+        return jwt.decode(
+            token,
+            key,
+            algorithms=[algorithm],
+            audience=settings.SUPABASE_JWT_AUDIENCE,
+            options={"require": ["exp", "sub"]},
+        )
+    except jwt.PyJWTError:
+        raise _invalid_token()
+
+
+async def _verify_remotely(token: str) -> dict:
+    """Memastikan token valid dengan memanggil endpoint Supabase Auth."""
     try:
-        async with httpx.AsyncClient(
-            base_url=settings.SUPABASE_URL, timeout=10.0
-        ) as client:
-            response = await client.get(
-                _SUPABASE_USER_ENDPOINT,
-                headers={
-                    "Authorization": f"Bearer {token}",
-                    "apikey": settings.SUPABASE_KEY,
-                },
-            )
+        response = await get_http_client().get(
+            _SUPABASE_USER_ENDPOINT,
+            headers={
+                "Authorization": f"Bearer {token}",
+                "apikey": settings.SUPABASE_KEY,
+            },
+        )
     except httpx.HTTPError as exc:
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
@@ -45,15 +164,58 @@ async def verify_supabase_token(authorization: str = Header(...)) -> dict:
         ) from exc
 
     if response.status_code != status.HTTP_200_OK:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Token Supabase tidak valid atau kedaluwarsa.",
-        )
+        raise _invalid_token()
 
-    user_data = response.json()
+    return response.json()
 
-    return {
-        "user_id": user_data["id"],
-        "email": user_data.get("email"),
-        "raw": user_data,
-    }
+
+def _cache_ttl(token: str) -> Optional[float]:
+    """Sisa umur token (detik) dari klaim `exp`, dibatasi AUTH_CACHE_TTL_SECONDS."""
+    try:
+        claims = jwt.decode(token, options={"verify_signature": False})
+    except jwt.PyJWTError:
+        return None
+    expires_in = claims.get("exp", 0) - time.time()
+    return min(expires_in, settings.AUTH_CACHE_TTL_SECONDS)
+
+
+async def verify_supabase_token(authorization: str = Header(...)) -> dict:
+    """Memastikan token Supabase valid.
+
+    Urutan: cache token terverifikasi -> validasi JWT lokal (secret/JWKS) ->
+    fallback ke endpoint Supabase Auth memakai AsyncClient ber-pool.
+    """
+    with metrics.stage_timer("auth"):
+        return await _resolve_user(authorization)
+
+
+async def _resolve_user(authorization: str) -> dict:
+    token = _extract_bearer_token(authorization)
+    cache_key = hashlib.sha256(token.encode()).hexdigest()
+
+    user = _token_cache.get(cache_key)
+    if user is not None:
+        return user
+
+    claims = await _verify_locally(token)
+    if claims is not None:
+        _verification_counts["local"] += 1
+        user = {
+            "user_id": claims["sub"],
+            "email": claims.get("email"),
+            "raw": claims,
+        }
+    else:
+        _verification_counts["remote"] += 1
+        user_data = await _verify_remotely(token)
+        user = {
+            "user_id": user_data["id"],
+            "email": user_data.get("email"),
+            "raw": user_data,
+        }
+
+    ttl = _cache_ttl(token)
+    if ttl is not None:
+        _token_cache.set(cache_key, user, ttl=ttl)
+
+    return user
@@ -0,0 +1,42 @@
+# app/middlewares/metrics.py
+import time
+
+from fastapi import Request
+
+from app.services import metrics
+
+_TRUTHY = ("1", "true", "yes")
+
+
+def _trace_requested(request: Request) -> bool:
+    """Trace dilampirkan jika `?trace=true` atau header `X-Trace: 1`."""
+    flag = request.query_params.get("trace") or request.headers.get("x-trace") or ""
+    return flag.lower() in _TRUTHY
+
+
+async def metrics_middleware(request: Request, call_next):
+    """Mengukur durasi request per route dan (opsional) melampirkan trace tahap.
+
+    Trace dikirim sebagai header `Server-Timing`, jadi skema respons JSON tidak
+    berubah dan bisa dibaca langsung di DevTools browser.
+    """
+    trace = metrics.start_trace()
+    start = time.perf_counter()
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+    finally:
+        elapsed = time.perf_counter() - start
+        route = request.scope.get("route")
+        metrics.REQUEST_SECONDS.observe(
+            elapsed,
+            request.method,
+            getattr(route, "path", "unmatched"),
+            str(status_code),
+        )
+
+    if _trace_requested(request):
+        trace["total"] = elapsed * 1000
+        response.headers["Server-Timing"] = metrics.server_timing_header(trace)
+    return response
@@ -0,0 +1,61 @@
+# app/routes/history.py
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from app.configs import settings
+from app.middlewares.auth import verify_supabase_token
+from app.schemas import BaseResponse, HistoryPage, HistoryStats
+from app.services import history
+
+router = APIRouter(tags=["History"])
+
+
+@router.get("/history", response_model=BaseResponse[HistoryPage])
+async def list_history(
+    limit: int = Query(
+        settings.HISTORY_PAGE_SIZE, ge=1, le=settings.HISTORY_MAX_PAGE_SIZE
+    ),
+    cursor: Optional[str] = Query(
+        None, description="`next_cursor` dari halaman sebelumnya."
+    ),
+    user: dict = Depends(verify_supabase_token),
+):
+    """Riwayat prediksi user, terbaru dulu, dengan pagination cursor."""
+    try:
+        items, next_cursor = await history.get_history_page(
+            user["user_id"], limit, cursor
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    return BaseResponse[HistoryPage](
+        success=True,
+        message="Riwayat prediksi berhasil diambil.",
+        data=HistoryPage(items=items, next_cursor=next_cursor),
+    )
+
+
+@router.get("/history/stats", response_model=BaseResponse[HistoryStats])
+async def history_stats(
+    start: Optional[datetime] = Query(None, description="Awal rentang (inklusif)."),
+    end: Optional[datetime] = Query(None, description="Akhir rentang (eksklusif)."),
+    user: dict = Depends(verify_supabase_token),
+):
+    """Jumlah prediksi per label untuk tiap model dalam rentang waktu."""
+    if start and end and start >= end:
+        raise HTTPException(status_code=400, detail="`start` harus sebelum `end`.")
+
+    try:
+        stats = await history.get_history_stats(user["user_id"], start, end)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    return BaseResponse[HistoryStats](
+        success=True,
+        message="Statistik riwayat berhasil dihitung.",
+        data=HistoryStats(**stats),
+    )
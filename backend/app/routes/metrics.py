@@ -0,0 +1,105 @@
+# app/routes/metrics.py
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.routes import predict
+from app.services.metrics import registry
+from app.services.persistence_queue import persistence_queue
+from app.services.predict_service import PredictService
+
+router = APIRouter(tags=["Monitoring"])
+
+
+def _executor_value(attribute: str) -> float:
+    executor = PredictService._EXECUTOR
+    return getattr(executor, attribute) if executor is not None else 0
+
+
+registry.gauge(
+    "chili_feature_executor_in_flight",
+    "Job ekstraksi fitur yang sedang berjalan atau antre di pool.",
+    lambda: _executor_value("in_flight"),
+)
+registry.gauge(
+    "chili_feature_executor_waiting",
+    "Job ekstraksi fitur yang menunggu slot executor (antrean penuh).",
+    lambda: _executor_value("waiting"),
+)
+registry.gauge(
+    "chili_persistence_queue_depth",
+    "Job persistensi tertunda (/predict?defer=true) di antrean.",
+    persistence_queue.qsize,
+)
+registry.counter(
+    "chili_persistence_failed_total",
+    "Job persistensi yang gagal setelah semua retry.",
+    lambda: persistence_queue.failed,
+)
+
+registry.gauge(
+    "chili_prediction_jobs_queued",
+    "Job prediksi asinkron (/predict/jobs) yang menunggu worker.",
+    lambda: predict.job_runner.qsize(),
+)
+registry.gauge(
+    "chili_prediction_jobs_running",
+    "Job prediksi asinkron yang sedang diproses.",
+    lambda: predict.job_runner.running,
+)
+registry.counter(
+    "chili_prediction_jobs_failed_total",
+    "Job prediksi asinkron yang berakhir dengan status failed.",
+    lambda: predict.job_runner.failed,
+)
+
+
+registry.counter(
+    "chili_model_shadow_compared_total",
+    "Prediksi yang dibandingkan dengan versi model shadow saat ini.",
+    lambda: PredictService._SHADOW_STATS.totals()["compared"],
+)
+registry.counter(
+    "chili_model_shadow_agreed_total",
+    "Prediksi versi shadow yang labelnya sama dengan versi aktif.",
+    lambda: PredictService._SHADOW_STATS.totals()["agreed"],
+)
+
+
+def _admission_value(attribute: str) -> float:
+    admission = PredictService._ADMISSION
+    return getattr(admission, attribute) if admission is not None else 0
+
+
+registry.gauge(
+    "chili_admission_limit",
+    "Limit konkurensi prediksi saat ini (gambar), adaptif jika target latensi diisi.",
+    lambda: _admission_value("limit"),
+)
+registry.gauge(
+    "chili_admission_in_flight",
+    "Gambar yang sedang diproses setelah lolos admission control.",
+    lambda: _admission_value("in_flight"),
+)
+registry.gauge(
+    "chili_admission_queued",
+    "Gambar yang menunggu slot admission control.",
+    lambda: _admission_value("queued"),
+)
+registry.counter(
+    "chili_admission_rejected_queue_full_total",
+    "Request ditolak 429 karena antrean admission penuh.",
+    lambda: _admission_value("rejected_queue_full"),
+)
+registry.counter(
+    "chili_admission_rejected_deadline_total",
+    "Request ditolak 503 karena tenggat antrean terlampaui/diperkirakan terlampaui.",
+    lambda: _admission_value("rejected_deadline"),
+)
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def export_metrics():
+    """Metrik latensi per tahap & gauge antrean dalam format teks Prometheus."""
+    return PlainTextResponse(
+        registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
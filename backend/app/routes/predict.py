@@ -1,24 +1,51 @@
 import asyncio
-import random
-import time
-from fastapi import APIRouter, UploadFile, File, HTTPException, Depends
+from datetime import datetime, timezone
+from typing import List, Literal, Optional, Tuple
+from fastapi import (
+    APIRouter,
+    UploadFile,
+    File,
+    HTTPException,
+    Depends,
+    Query,
+    Response,
+)
 import uuid
-import cv2
-import numpy as np
-from app.db.client import get_supabase_clients
-from app.services import storage
+from app.configs import settings
+from app.db.client import get_supabase_clients, run_io
+from app.services import history, ingest, metrics, storage
 from app.schemas import (
-    UploadResult,
     HealthCheck,
-    ModelPrediction,
     PredictHistory,
     BaseResponse,
+    PredictionJob,
+    PredictionResult,
+)
+from app.middlewares.auth import token_cache_stats, verify_supabase_token
+from app.services.cache import content_hash
+from app.services.admission import AdmissionRejected
+from app.services.persistence_queue import persistence_queue
+from app.services.prediction_jobs import (
+    JobQueueFull,
+    PredictionJobRunner,
+    create_backend,
+    public_job,
 )
-from app.middlewares.auth import verify_supabase_token
 from app.services.predict_service import PredictService
 
 router = APIRouter(tags=["Upload & Health"])
 
+ModelSelection = Literal["svm", "knn", "both"]
+if settings.CASCADE_FIRST_MODEL not in ("svm", "knn"):
+    raise ValueError(
+        f"CASCADE_FIRST_MODEL '{settings.CASCADE_FIRST_MODEL}' tidak dikenal, "
+        "pilih salah satu: svm, knn"
+    )
+CASCADE_DESCRIPTION = (
+    "Hanya untuk models=both: model kedua dijalankan jika confidence model "
+    "pertama di bawah CASCADE_THRESHOLD."
+)
+
 _, db_client = get_supabase_clients()
 
 
@@ -28,6 +55,26 @@ async def check_health():
     return {"status": "OK"}
 
 
+@router.get("/health/cache")
+async def check_cache_stats():
+    """Statistik cache (ukuran, hit/miss) untuk monitoring."""
+    return {
+        "auth": token_cache_stats(),
+        "prediction": PredictService.cache_stats(),
+        "upload": storage.upload_cache_stats(),
+        "history": history.history_cache_stats(),
+    }
+
+
+@router.get("/health/models")
+async def check_model_versions():
+    """Versi model aktif, shadow beserta agreement-nya, versi tersedia, feature store."""
+    return {
+        **PredictService.model_info(),
+        "feature_store": PredictService.feature_store_stats(),
+    }
+
+
 # @router.post(
 #     "/upload",
 #     response_model=UploadResult,
@@ -57,67 +104,391 @@ async def check_health():
 #         )
 
 
+def _upload_target(filename: str, image_hash: str) -> dict:
+    """Objek storage untuk konten ini: upload yang sudah ada, atau nama baru.
+
+    `stored_filename`-nya dipakai sebagai key feature store, jadi harus sama
+    dengan objek yang dirujuk baris riwayat (`upload_image` juga memakai
+    upload ter-cache untuk hash yang sama).
+    """
+    return storage.get_cached_upload(image_hash) or storage.prepare_upload(
+        filename, image_hash
+    )
+
+
+def _build_history_row(
+    user_id: str, upload_data: dict, result: PredictionResult
+) -> dict:
+    """Menyusun baris predict_history dari hasil prediksi model yang dijalankan."""
+    predictions = result.predictions
+    statistics = {
+        model_type: {
+            "confidence": prediction.confidence,
+            "duration_ms": prediction.duration_ms,
+        }
+        for model_type, prediction in predictions.items()
+    }
+    statistics["extraction_ms"] = result.extraction_ms
+    statistics["models_run"] = list(predictions)
+    if result.cached:
+        statistics["cached"] = True
+
+    row = {
+        "user_id": user_id,
+        "image_url": upload_data["public_url"],
+        "svm_result": predictions["svm"].label if "svm" in predictions else None,
+        "knn_result": predictions["knn"].label if "knn" in predictions else None,
+        "statistics": statistics,
+    }
+    # Kolom thumbnail hanya diisi jika thumbnail aktif (THUMBNAIL_MAX_SIDE > 0)
+    if upload_data.get("thumbnail_url"):
+        row["thumbnail_url"] = upload_data["thumbnail_url"]
+    return row
+
+
+def _model_plan(models: str, cascade: bool) -> Tuple[Tuple[str, ...], Optional[float]]:
+    """(urutan model, threshold kaskade) dari parameter `models` & `cascade`."""
+    if models != "both":
+        return (models,), None
+    if not cascade:
+        return ("knn", "svm"), None
+
+    first = settings.CASCADE_FIRST_MODEL
+    second = "svm" if first == "knn" else "knn"
+    return (first, second), settings.CASCADE_THRESHOLD
+
+
+async def _persist_prediction(
+    upload_data: dict,
+    image_bytes: bytes,
+    image_hash: str,
+    content_type: str,
+    row: dict,
+):
+    """Job persistensi tertunda: upload gambar lalu simpan riwayat (idempoten)."""
+    if storage.get_cached_upload(image_hash) is None:
+        await storage.store_upload(upload_data, image_bytes, content_type, image_hash)
+    with metrics.stage_timer("history_insert"):
+        await run_io(db_client("predict_history").upsert(row).execute)
+    history.invalidate_user(row["user_id"])
+
+
+async def _predict_and_save(
+    filename: str,
+    upload: ingest.IngestedImage,
+    image_hash: str,
+    user_id: str,
+    model_types: Tuple[str, ...],
+    cascade_threshold: Optional[float],
+) -> PredictHistory:
+    """Prediksi + upload paralel, lalu simpan satu baris riwayat."""
+    image_bytes = upload.data
+
+    # Nama objek storage = key vektor fitur di feature store
+    feature_key = _upload_target(filename, image_hash)["stored_filename"]
+
+    # Upload ke storage dan inferensi (CPU) saling independen, jadi paralel
+    result, upload_data = await asyncio.gather(
+        PredictService.predict_all(
+            image_bytes, model_types, image_hash, cascade_threshold, feature_key
+        ),
+        storage.upload_image(filename, image_bytes, image_hash, upload.content_type),
+    )
+
+    with metrics.stage_timer("history_insert"):
+        save_to_db = await run_io(
+            db_client("predict_history")
+            .insert(_build_history_row(user_id, upload_data, result))
+            .execute
+        )
+    history.invalidate_user(user_id)
+    return PredictHistory(**save_to_db.data[0])
+
+
 @router.post(
     "/predict",
     response_model=BaseResponse[PredictHistory],
     dependencies=[Depends(verify_supabase_token)],
 )
 async def run_prediction(
-    file: UploadFile = File(...), user: dict = Depends(verify_supabase_token)
+    file: UploadFile = File(...),
+    defer: bool = Query(
+        False,
+        description="Kembalikan hasil prediksi segera; upload & simpan riwayat di background.",
+    ),
+    models: ModelSelection = Query("both", description="Model yang dijalankan."),
+    cascade: bool = Query(False, description=CASCADE_DESCRIPTION),
+    user: dict = Depends(verify_supabase_token),
 ):
-    """Unggah gambar cabai asli lalu prediksi KNN & SVM."""
+    """Unggah gambar cabai asli lalu prediksi dengan KNN, SVM, atau keduanya."""
+    # Validasi ukuran/tipe/resolusi dari header sebelum upload & inferensi paralel
+    upload = await ingest.read_image_upload(file)
+    # Hash konten dihitung sekali untuk cache prediksi & dedup storage
+    image_hash = content_hash(upload.data)
+
     try:
-        # Baca gambar dari upload
-        image_bytes = await file.read()
-        nparr = np.frombuffer(image_bytes, np.uint8)
-        img_bgr = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-
-        if img_bgr is None:
-            raise HTTPException(
-                status_code=400,
-                detail="Gagal membaca gambar. Pastikan file adalah gambar yang valid.",
+        model_types, cascade_threshold = _model_plan(models, cascade)
+        # Server jenuh: tolak sebelum upload/encode ikut membebani, kecuali
+        # hasilnya sudah ada di cache prediksi
+        PredictService.check_admission(
+            PredictService.uncached_count([image_hash], model_types, cascade_threshold)
+        )
+
+        if defer:
+            return await _run_deferred_prediction(
+                file, upload, image_hash, user, model_types, cascade_threshold
             )
 
-        # Upload gambar ke storage
-        await file.seek(0)  # Reset file pointer untuk upload
-        upload_data = await storage.upload_file_to_supabase(file)
+        return BaseResponse[PredictHistory](
+            success=True,
+            message="Prediksi berhasil dijalankan.",
+            data=await _predict_and_save(
+                file.filename,
+                upload,
+                image_hash,
+                user["user_id"],
+                model_types,
+                cascade_threshold,
+            ),
+        )
+
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
-        # Prediksi dengan kedua model secara paralel
-        knn_prediction, svm_prediction = await asyncio.gather(
-            PredictService.predict_knn(img_bgr),
-            PredictService.predict_svm(img_bgr),
+
+async def _run_deferred_prediction(
+    file: UploadFile,
+    upload: ingest.IngestedImage,
+    image_hash: str,
+    user: dict,
+    model_types: Tuple[str, ...],
+    cascade_threshold: Optional[float],
+):
+    """Prediksi lalu serahkan upload + insert riwayat ke antrean background."""
+    image_bytes = upload.data
+    upload_data = _upload_target(file.filename, image_hash)
+    result = await PredictService.predict_all(
+        image_bytes,
+        model_types,
+        image_hash,
+        cascade_threshold,
+        upload_data["stored_filename"],
+    )
+
+    # id & created_at dibuat di sini agar respons sama dengan baris yang disimpan
+    row = {
+        "id": str(uuid.uuid4()),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        **_build_history_row(user["user_id"], upload_data, result),
+    }
+
+    async def persist():
+        await _persist_prediction(
+            upload_data, image_bytes, image_hash, upload.content_type, row
         )
 
-        save_to_db = (
-            db_client("predict_history")
-            .insert(
-                {
-                    "user_id": user["user_id"],
-                    "image_url": upload_data["public_url"],
-                    "svm_result": svm_prediction.label,
-                    "knn_result": knn_prediction.label,
-                    "statistics": {
-                        "svm": {
-                            "confidence": svm_prediction.confidence,
-                            "duration_ms": svm_prediction.duration_ms,
-                        },
-                        "knn": {
-                            "confidence": knn_prediction.confidence,
-                            "duration_ms": knn_prediction.duration_ms,
-                        },
-                    },
-                }
-            )
-            .execute()
+    if not persistence_queue.submit(persist):
+        # Antrean penuh: simpan langsung agar data tidak hilang
+        await persist()
+
+    return BaseResponse[PredictHistory](
+        success=True,
+        message="Prediksi berhasil dijalankan, riwayat disimpan di background.",
+        data=PredictHistory(**row),
+    )
+
+
+@router.post(
+    "/predict/batch",
+    response_model=BaseResponse[List[PredictHistory]],
+    dependencies=[Depends(verify_supabase_token)],
+)
+async def run_batch_prediction(
+    files: List[UploadFile] = File(...),
+    models: ModelSelection = Query("both", description="Model yang dijalankan."),
+    cascade: bool = Query(False, description=CASCADE_DESCRIPTION),
+    user: dict = Depends(verify_supabase_token),
+):
+    """Unggah banyak gambar cabai sekaligus lalu prediksi per gambar."""
+    if len(files) > settings.MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Maksimal {settings.MAX_BATCH_SIZE} gambar per batch.",
         )
 
-        print(save_to_db)
+    try:
+        ingested = [await ingest.read_image_upload(file) for file in files]
+        images_bytes = [item.data for item in ingested]
+        image_hashes = [content_hash(image_bytes) for image_bytes in images_bytes]
+        model_types, cascade_threshold = _model_plan(models, cascade)
+        # Hanya gambar yang belum ada di cache prediksi yang dihitung admission
+        PredictService.check_admission(
+            PredictService.uncached_count(image_hashes, model_types, cascade_threshold)
+        )
+        feature_keys = [
+            _upload_target(file.filename, image_hash)["stored_filename"]
+            for file, image_hash in zip(files, image_hashes)
+        ]
 
-        return BaseResponse[PredictHistory](
+        # Inferensi batch berjalan bersamaan dengan upload semua gambar
+        results, uploads = await asyncio.gather(
+            PredictService.predict_batch(
+                images_bytes,
+                model_types,
+                image_hashes,
+                cascade_threshold,
+                feature_keys,
+            ),
+            asyncio.gather(
+                *(
+                    storage.upload_file_to_supabase(
+                        file, item.data, image_hash, item.content_type
+                    )
+                    for file, item, image_hash in zip(files, ingested, image_hashes)
+                )
+            ),
+        )
+
+        # Simpan semua riwayat dengan satu kali insert
+        with metrics.stage_timer("history_insert"):
+            save_to_db = await run_io(
+                db_client("predict_history")
+                .insert(
+                    [
+                        _build_history_row(user["user_id"], upload_data, result)
+                        for upload_data, result in zip(uploads, results)
+                    ]
+                )
+                .execute
+            )
+        history.invalidate_user(user["user_id"])
+
+        return BaseResponse[List[PredictHistory]](
             success=True,
-            message="Prediksi berhasil dijalankan.",
-            data=PredictHistory(**save_to_db.data[0]),
+            message=f"Prediksi {len(save_to_db.data)} gambar berhasil dijalankan.",
+            data=[PredictHistory(**row) for row in save_to_db.data],
         )
 
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+# ==================== JOB PREDIKSI ASINKRON ====================
+
+# Percobaan ulang job saat admission control menolak (server sedang jenuh)
+_JOB_ADMISSION_ATTEMPTS = 3
+
+
+async def _run_prediction_job(job: dict, payload: bytes) -> dict:
+    """Handler job: sama dengan /predict, hasilnya disimpan sebagai dict JSON."""
+    params = job["params"]
+    upload = ingest.IngestedImage(
+        payload, params["content_type"], params["width"], params["height"]
+    )
+    image_hash = content_hash(payload)
+    for attempt in range(_JOB_ADMISSION_ATTEMPTS):
+        try:
+            saved = await _predict_and_save(
+                params["filename"],
+                upload,
+                image_hash,
+                job["user_id"],
+                tuple(params["models"]),
+                params["cascade_threshold"],
+            )
+            return saved.model_dump()
+        except AdmissionRejected as e:
+            if attempt == _JOB_ADMISSION_ATTEMPTS - 1:
+                raise
+            await asyncio.sleep(int(e.headers["Retry-After"]))
+
+
+job_runner = PredictionJobRunner(
+    backend=create_backend(settings.JOB_BACKEND),
+    handler=_run_prediction_job,
+    workers=settings.JOB_WORKERS,
+    callback_timeout=settings.JOB_CALLBACK_TIMEOUT_SECONDS,
+    callback_retries=settings.JOB_CALLBACK_RETRIES,
+    callback_secret=settings.JOB_CALLBACK_SECRET,
+    callback_hosts=tuple(
+        host.strip()
+        for host in settings.JOB_CALLBACK_ALLOWED_HOSTS.split(",")
+        if host.strip()
+    ),
+)
+
+
+@router.post(
+    "/predict/jobs",
+    status_code=202,
+    response_model=BaseResponse[PredictionJob],
+    dependencies=[Depends(verify_supabase_token)],
+)
+async def create_prediction_job(
+    response: Response,
+    file: UploadFile = File(...),
+    models: ModelSelection = Query("both", description="Model yang dijalankan."),
+    cascade: bool = Query(False, description=CASCADE_DESCRIPTION),
+    callback_url: Optional[str] = Query(
+        None, description="Webhook yang menerima status akhir job (POST JSON)."
+    ),
+    user: dict = Depends(verify_supabase_token),
+):
+    """Terima gambar lalu proses di background; pantau lewat GET /predict/jobs/{id}."""
+    upload = await ingest.read_image_upload(file)
+    model_types, cascade_threshold = _model_plan(models, cascade)
+
+    params = {
+        "filename": file.filename,
+        "content_type": upload.content_type,
+        "width": upload.width,
+        "height": upload.height,
+        "models": list(model_types),
+        "cascade_threshold": cascade_threshold,
+    }
+    try:
+        job = await job_runner.submit(
+            user["user_id"], upload.data, params, callback_url
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except JobQueueFull:
+        raise HTTPException(
+            status_code=429,
+            detail="Antrean job prediksi penuh, coba lagi nanti.",
+            headers={"Retry-After": "5"},
+        )
+
+    response.headers["Location"] = f"/predict/jobs/{job['id']}"
+    return BaseResponse[PredictionJob](
+        success=True,
+        message="Job prediksi diterima.",
+        data=PredictionJob(**public_job(job)),
+    )
+
+
+@router.get(
+    "/predict/jobs/{job_id}",
+    response_model=BaseResponse[PredictionJob],
+    dependencies=[Depends(verify_supabase_token)],
+)
+async def get_prediction_job(job_id: str, user: dict = Depends(verify_supabase_token)):
+    """Status job prediksi; `result` berisi riwayat tersimpan saat selesai."""
+    job = await job_runner.get(job_id)
+    # Job milik user lain diperlakukan sama dengan job yang tidak ada
+    if job is None or job["user_id"] != user["user_id"]:
+        raise HTTPException(status_code=404, detail="Job prediksi tidak ditemukan.")
+
+    return BaseResponse[PredictionJob](
+        success=True,
+        message=f"Status job: {job['status']}.",
+        data=PredictionJob(**public_job(job)),
+    )
@@ -1,5 +1,6 @@
 # app/schemas.py
-from typing import Generic, TypeVar, Optional, List
+from datetime import datetime
+from typing import Dict, Generic, Literal, TypeVar, Optional, List
 
 from pydantic import BaseModel
 
@@ -24,6 +25,15 @@ class ModelPrediction(BaseModel):
     duration_ms: int
 
 
+class PredictionResult(BaseModel):
+    """Hasil prediksi semua model dari satu kali ekstraksi fitur."""
+
+    predictions: Dict[str, ModelPrediction]
+    extraction_ms: int
+    # True jika dijawab dari cache prediksi (tanpa ekstraksi & inferensi)
+    cached: bool = False
+
+
 T = TypeVar("T")
 
 
@@ -39,15 +49,49 @@ class ModelStats(BaseModel):
 
 
 class PredictionStatistics(BaseModel):
-    knn: ModelStats
-    svm: ModelStats
+    knn: Optional[ModelStats] = None
+    svm: Optional[ModelStats] = None
+    extraction_ms: Optional[int] = None
+    # Model yang benar-benar dijalankan (urutan eksekusi); None pada baris lama
+    models_run: Optional[List[str]] = None
+    # True jika hasil diambil dari cache prediksi; waktu di atas bernilai 0
+    cached: Optional[bool] = None
 
 
 class PredictHistory(BaseModel):
     id: str
     user_id: str
     image_url: str
-    svm_result: str
-    knn_result: str
+    thumbnail_url: Optional[str] = None
+    svm_result: Optional[str] = None
+    knn_result: Optional[str] = None
     statistics: PredictionStatistics
     created_at: str
+
+
+class HistoryPage(BaseModel):
+    """Satu halaman riwayat; `next_cursor` None berarti halaman terakhir."""
+
+    items: List[PredictHistory]
+    next_cursor: Optional[str] = None
+
+
+class HistoryStats(BaseModel):
+    """Jumlah prediksi per label untuk tiap model dalam rentang waktu."""
+
+    total: int
+    svm: Dict[str, int]
+    knn: Dict[str, int]
+    start: Optional[datetime] = None
+    end: Optional[datetime] = None
+
+
+class PredictionJob(BaseModel):
+    """Status job prediksi asinkron; `result` terisi saat status `succeeded`."""
+
+    id: str
+    status: Literal["queued", "running", "succeeded", "failed"]
+    created_at: str
+    updated_at: str
+    result: Optional[PredictHistory] = None
+    error: Optional[str] = None
@@ -0,0 +1,221 @@
+# app/services/admission.py
+"""Admission control untuk jalur prediksi (CPU-bound).
+
+Setiap prediksi yang perlu ekstraksi fitur harus mendapat slot sebelum masuk
+ke executor. Slot dihitung per gambar (batch memakai beberapa slot, dibatasi
+limit saat ini). Jika slot habis, request menunggu di antrean FIFO terbatas
+dengan tenggat waktu:
+
+- antrean penuh                         -> 429 + Retry-After
+- estimasi waktu tunggu > tenggat       -> 503 + Retry-After (langsung)
+- tenggat habis saat menunggu           -> 503 + Retry-After
+
+Estimasi memakai waktu layanan terukur (EWMA) dan hukum Little:
+`tunggu ~ unit di depan x waktu layanan / limit`. Jika target latensi diisi,
+limit konkurensi disesuaikan AIMD: turun 10% saat latensi di atas target
+(maksimal sekali per periode waktu layanan), naik 1/limit saat di bawahnya.
+"""
+
+import asyncio
+import math
+import time
+from collections import deque
+from typing import Optional
+
+from fastapi import HTTPException, status
+
+from app.services import metrics
+
+# Bobot sampel baru pada EWMA waktu layanan
+_EWMA_ALPHA = 0.2
+_DECREASE_FACTOR = 0.9
+
+
+class AdmissionRejected(HTTPException):
+    """Request ditolak karena server jenuh (429/503 dengan header Retry-After)."""
+
+    def __init__(self, status_code: int, detail: str, retry_after: float):
+        super().__init__(
+            status_code=status_code,
+            detail=detail,
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+        )
+
+
+class AdmissionController:
+    """Membatasi konkurensi prediksi dengan antrean terbatas dan tenggat waktu."""
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        queue_size: int,
+        queue_timeout: float,
+        target_latency: float = 0.0,
+        min_concurrency: int = 1,
+    ):
+        self.max_concurrency = max(1, max_concurrency)
+        self.min_concurrency = max(1, min(min_concurrency, self.max_concurrency))
+        self.queue_size = max(0, queue_size)
+        self.queue_timeout = queue_timeout
+        self.target_latency = target_latency
+        self.limit = float(self.max_concurrency)
+
+        self.in_flight = 0
+        self.queued = 0
+        self.service_time: Optional[float] = None
+        self.rejected_queue_full = 0
+        self.rejected_deadline = 0
+        self._waiters: "deque[list]" = deque()
+        self._last_decrease = 0.0
+
+    # ==================== ESTIMASI ====================
+
+    def _capacity(self) -> int:
+        return max(1, int(self.limit))
+
+    def estimated_wait(self, cost: int = 1) -> float:
+        """Perkiraan waktu tunggu (detik) untuk `cost` unit yang baru datang."""
+        if self.service_time is None:
+            return 0.0
+        ahead = self.queued + max(0, self.in_flight + cost - self._capacity())
+        return ahead * self.service_time / self._capacity()
+
+    def _retry_after(self) -> float:
+        # Waktu sampai antrean + pekerjaan berjalan selesai
+        if self.service_time is None:
+            return 1.0
+        return (self.queued + self.in_flight) * self.service_time / self._capacity()
+
+    def check(self, cost: int = 1) -> None:
+        """Menolak lebih awal (tanpa reservasi) jika request pasti tidak diterima.
+
+        Dipanggil sebelum pekerjaan lain (upload, encode) dimulai agar request
+        yang akan ditolak tidak membebani server yang sudah jenuh.
+        """
+        cost = min(cost, self._capacity())
+        if not self._waiters and self.in_flight + cost <= self._capacity():
+            return
+        if self.queued + cost > self.queue_size:
+            self.rejected_queue_full += 1
+            raise AdmissionRejected(
+                status.HTTP_429_TOO_MANY_REQUESTS,
+                "Server sedang sibuk, antrean prediksi penuh.",
+                self._retry_after(),
+            )
+        if self.estimated_wait(cost) > self.queue_timeout:
+            self.rejected_deadline += 1
+            raise AdmissionRejected(
+                status.HTTP_503_SERVICE_UNAVAILABLE,
+                "Server sedang sibuk, perkiraan waktu tunggu melebihi batas.",
+                self._retry_after(),
+            )
+
+    # ==================== SLOT ====================
+
+    async def acquire(self, cost: int = 1) -> int:
+        """Menunggu slot untuk `cost` unit; mengembalikan unit yang dipakai."""
+        cost = min(cost, self._capacity())
+        self.check(cost)
+        if not self._waiters and self.in_flight + cost <= self._capacity():
+            self.in_flight += cost
+            return cost
+
+        loop = asyncio.get_running_loop()
+        waiter = [loop.create_future(), cost]
+        self._waiters.append(waiter)
+        self.queued += cost
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter[0]), self.queue_timeout)
+        except asyncio.TimeoutError:
+            if not waiter[0].done():
+                self._waiters.remove(waiter)
+                self.queued -= cost
+                self.rejected_deadline += 1
+                raise AdmissionRejected(
+                    status.HTTP_503_SERVICE_UNAVAILABLE,
+                    "Server sedang sibuk, batas waktu antrean prediksi habis.",
+                    self._retry_after(),
+                )
+        except asyncio.CancelledError:
+            if waiter[0].done():
+                # Slot sudah diberikan tepat sebelum batal: kembalikan
+                self.release(cost)
+            else:
+                self._waiters.remove(waiter)
+                self.queued -= cost
+            raise
+        finally:
+            metrics.record_stage("admission_wait", time.perf_counter() - start)
+        return cost
+
+    def release(self, cost: int, elapsed: Optional[float] = None) -> None:
+        """Mengembalikan slot; `elapsed` (detik) memperbarui estimasi."""
+        self.in_flight -= cost
+        if elapsed is not None:
+            self._observe(elapsed)
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        while self._waiters:
+            future, cost = self._waiters[0]
+            if self.in_flight + cost > self._capacity():
+                break
+            self._waiters.popleft()
+            self.queued -= cost
+            self.in_flight += cost
+            future.set_result(None)
+
+    def _observe(self, elapsed: float) -> None:
+        if self.service_time is None:
+            self.service_time = elapsed
+        else:
+            self.service_time += _EWMA_ALPHA * (elapsed - self.service_time)
+
+        if self.target_latency <= 0:
+            return
+        now = time.monotonic()
+        if self.service_time > self.target_latency:
+            # Turunkan paling sering sekali per waktu layanan agar tidak anjlok
+            if now - self._last_decrease >= self.service_time:
+                self.limit = max(self.min_concurrency, self.limit * _DECREASE_FACTOR)
+                self._last_decrease = now
+        else:
+            self.limit = min(self.max_concurrency, self.limit + 1 / self.limit)
+
+    def slot(self, cost: int = 1) -> "_Slot":
+        """Context manager: `async with controller.slot(n): ...`"""
+        return _Slot(self, cost)
+
+    def stats(self) -> dict:
+        return {
+            "limit": round(self.limit, 2),
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "service_time_ms": (
+                round(self.service_time * 1000, 2) if self.service_time else None
+            ),
+            "rejected_queue_full": self.rejected_queue_full,
+            "rejected_deadline": self.rejected_deadline,
+        }
+
+
+class _Slot:
+    def __init__(self, controller: AdmissionController, cost: int):
+        self._controller = controller
+        self._cost = cost
+        self._start = 0.0
+
+    async def __aenter__(self):
+        self._cost = await self._controller.acquire(self._cost)
+        self._start = time.perf_counter()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        # Setiap unit menempati slot selama `elapsed`, jadi batch dihitung sama
+        # seperti request tunggal; hanya admission yang selesai normal dipakai
+        elapsed = None
+        if exc_type is None:
+            elapsed = time.perf_counter() - self._start
+        self._controller.release(self._cost, elapsed)
+        return False
@@ -0,0 +1,95 @@
+# app/services/cache.py
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+
+def content_hash(data: bytes) -> str:
+    """Hash SHA-256 isi file, dipakai sebagai kunci cache untuk konten identik."""
+    return hashlib.sha256(data).hexdigest()
+
+
+class TTLCache:
+    """Cache LRU terbatas dengan masa berlaku (TTL) per entri.
+
+    Aman dipakai dari event loop maupun thread executor. Entri yang kedaluwarsa
+    dibuang saat dibaca; entri paling lama tidak dipakai dibuang saat penuh.
+    `ttl=None` berarti entri hanya dibatasi oleh ukuran cache.
+    """
+
+    def __init__(self, maxsize: int, ttl: Optional[float] = None):
+        self.maxsize = max(0, maxsize)
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Mengambil nilai dan menandainya sebagai baru dipakai."""
+        with self._lock:
+            entry = self._data.get(key)
+            if (
+                entry is not None
+                and entry[1] is not None
+                and entry[1] <= time.monotonic()
+            ):
+                del self._data[key]
+                entry = None
+
+            if entry is None:
+                self.misses += 1
+                return default
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def contains(self, key: Hashable) -> bool:
+        """Apakah key ada & belum kedaluwarsa, tanpa mengubah statistik/urutan LRU."""
+        with self._lock:
+            entry = self._data.get(key)
+        return entry is not None and (entry[1] is None or entry[1] > time.monotonic())
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """Menyimpan nilai; `ttl` per entri menimpa TTL default cache."""
+        if self.maxsize == 0:
+            return
+
+        ttl = self.ttl if ttl is None else ttl
+        if ttl is not None and ttl <= 0:
+            return
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """Menghapus satu entri (mis. untuk invalidasi)."""
+        with self._lock:
+            entry = self._data.pop(key, None)
+        return default if entry is None else entry[0]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict:
+        """Ukuran dan rasio hit cache untuk monitoring."""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
@@ -0,0 +1,108 @@
+# app/services/feature_executor.py
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import (
+    BrokenExecutor,
+    Executor,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+)
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+_BACKENDS = ("thread", "process")
+
+
+class FeatureExecutor:
+    """Executor terbatas untuk pekerjaan CPU-heavy (ekstraksi fitur).
+
+    Backend `thread` memakai ThreadPoolExecutor biasa, sedangkan backend
+    `process` memakai ProcessPoolExecutor sehingga bagian Python murni tidak
+    lagi tertahan GIL. Jumlah job yang boleh berjalan + mengantre dibatasi
+    `max_workers + queue_size`; pemanggil berikutnya menunggu slot kosong.
+
+    Jika satu proses worker mati (OOM-kill, segfault di cv2), pool menjadi
+    rusak untuk semua job. Pool itu dibuang dan dibuat ulang saat job berikutnya,
+    dan job yang gagal karena kerusakan tersebut dicoba sekali lagi.
+    """
+
+    def __init__(
+        self,
+        backend: str,
+        max_workers: int,
+        queue_size: int,
+        initializer: Optional[Callable[[], None]] = None,
+    ):
+        if backend not in _BACKENDS:
+            raise ValueError(
+                f"Backend executor '{backend}' tidak dikenal, pilih salah satu: "
+                f"{', '.join(_BACKENDS)}"
+            )
+
+        self.backend = backend
+        self.max_workers = max(1, max_workers)
+        self.queue_size = max(0, queue_size)
+        self._initializer = initializer
+        self._executor: Optional[Executor] = None
+        self._slots = asyncio.Semaphore(self.max_workers + self.queue_size)
+        # Untuk gauge: job di dalam pool (berjalan + antre) dan yang menunggu slot
+        self.in_flight = 0
+        self.waiting = 0
+
+    def start(self) -> Executor:
+        """Membuat pool jika belum ada (dipanggil otomatis saat job pertama)."""
+        if self._executor is not None:
+            return self._executor
+
+        if self.backend == "process":
+            # spawn agar proses worker tidak mewarisi thread/event loop uvicorn
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=self._initializer,
+            )
+        else:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix="feature-extractor",
+            )
+        return self._executor
+
+    async def run(self, func: Callable, *args):
+        """Menjalankan `func(*args)` di pool tanpa memblokir event loop."""
+        self.waiting += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self.waiting -= 1
+
+        self.in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            for attempt in range(2):
+                executor = self.start()
+                try:
+                    return await loop.run_in_executor(executor, func, *args)
+                except BrokenExecutor:
+                    self._discard(executor)
+                    if attempt:
+                        raise
+                    logger.warning("Pool ekstraksi fitur rusak, job dicoba ulang.")
+        finally:
+            self.in_flight -= 1
+            self._slots.release()
+
+    def _discard(self, executor: Executor) -> None:
+        """Membuang pool yang rusak (sekali saja walau banyak job gagal bersamaan)."""
+        if self._executor is executor:
+            logger.error("Worker ekstraksi fitur mati; pool dibuat ulang.")
+            self._executor = None
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Menutup pool; dipanggil saat aplikasi berhenti."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=not wait)
+            self._executor = None
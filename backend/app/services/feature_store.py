@@ -0,0 +1,225 @@
+# app/services/feature_store.py
+"""Penyimpanan vektor fitur agar riwayat bisa diskor ulang tanpa memproses gambar.
+
+Satu file per versi pipeline ekstraksi (`<root>/<versi>.features`): header 16
+byte (magic, revisi format, dimensi) lalu record ukuran tetap
+`(key S96, created_at f8, vector f4[dim])`. File hanya di-append dan dibaca
+sebagai `np.memmap` terstruktur, sehingga kolom `vector` langsung menjadi
+matriks float32 Nxdim tanpa parsing yang bisa dialirkan per batch.
+
+Key adalah stored filename objek di storage (berbasis hash konten). Penulis
+memegang `flock` eksklusif selama memeriksa ukuran, memperbaiki record yang
+terpotong, dan menulis, sehingga beberapa worker uvicorn boleh menulis ke file
+yang sama. Tanpa `fcntl` (Windows) hanya satu proses yang boleh menulis. Key
+ganda antar worker dibiarkan dan record terakhir yang dipakai saat dibaca.
+
+Store tidak menghapus apa pun sendiri. Jika `max_bytes` diisi, file yang sudah
+mencapai batas tidak ditambah lagi; rotasi dilakukan dengan memindahkan atau
+menghapus file (penulis membuka path ulang di setiap append).
+"""
+
+import logging
+import os
+import re
+import struct
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: tanpa lock antar proses
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+_MAGIC = b"CHFV"
+_FORMAT_REVISION = 1
+_HEADER = struct.Struct("<4sII4x")
+KEY_BYTES = 96
+SUFFIX = ".features"
+
+_VERSION_PATTERN = re.compile(r"^[A-Za-z0-9][A-Za-z0-9._-]*$")
+
+
+def record_dtype(dim: int) -> np.dtype:
+    """Layout satu record untuk vektor berdimensi `dim`."""
+    return np.dtype(
+        [
+            ("key", f"S{KEY_BYTES}"),
+            ("created_at", "<f8"),
+            ("vector", "<f4", (dim,)),
+        ]
+    )
+
+
+class FeatureStore:
+    """File vektor fitur append-only per versi pipeline, dibaca via memmap."""
+
+    def __init__(self, root: Path, max_bytes: int = 0):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # versi -> key yang sudah tersimpan, dimuat saat pertama dipakai
+        self._indexes: Dict[str, Set[bytes]] = {}
+
+    def path(self, version: str) -> Path:
+        if not _VERSION_PATTERN.match(version):
+            raise ValueError(f"Versi pipeline fitur tidak valid: {version!r}")
+        return self.root / f"{version}{SUFFIX}"
+
+    def versions(self) -> List[str]:
+        """Versi pipeline yang punya file fitur."""
+        if not self.root.is_dir():
+            return []
+        return sorted(path.stem for path in self.root.glob(f"*{SUFFIX}"))
+
+    # ==================== BACA ====================
+
+    def _read_header(self, path: Path) -> int:
+        with open(path, "rb") as handle:
+            header = handle.read(_HEADER.size)
+        if len(header) < _HEADER.size:
+            raise ValueError(f"Header file fitur tidak lengkap: {path}")
+        magic, revision, dim = _HEADER.unpack(header)
+        if magic != _MAGIC or revision != _FORMAT_REVISION:
+            raise ValueError(f"Bukan file fitur yang didukung: {path}")
+        return dim
+
+    def open(self, version: str) -> Optional[np.ndarray]:
+        """Semua record versi ini sebagai memmap read-only, None jika belum ada.
+
+        Record terakhir yang belum selesai ditulis (ukuran tidak utuh) diabaikan.
+        """
+        path = self.path(version)
+        # Belum ada, atau header baru sedang ditulis penulis pertama
+        if not path.exists() or path.stat().st_size < _HEADER.size:
+            return None
+        dtype = record_dtype(self._read_header(path))
+        count = (path.stat().st_size - _HEADER.size) // dtype.itemsize
+        if count == 0:
+            return np.empty(0, dtype)
+        return np.memmap(
+            path, dtype=dtype, mode="r", offset=_HEADER.size, shape=(count,)
+        )
+
+    def _index(self, version: str) -> Set[bytes]:
+        index = self._indexes.get(version)
+        if index is None:
+            records = self.open(version)
+            index = set(records["key"]) if records is not None else set()
+            self._indexes[version] = index
+        return index
+
+    def get(self, version: str, key: str) -> Optional[np.ndarray]:
+        """Vektor terakhir untuk `key`, None jika belum tersimpan."""
+        records = self.open(version)
+        if records is None:
+            return None
+        matches = np.flatnonzero(records["key"] == key.encode())
+        return np.array(records["vector"][matches[-1]]) if len(matches) else None
+
+    def iter_batches(
+        self, version: str, batch_size: int
+    ) -> Iterator[Tuple[List[str], np.ndarray]]:
+        """(key, matriks float32) per batch; hanya record terakhir tiap key.
+
+        Vektor diambil langsung dari memmap, jadi memori yang dipakai sebanding
+        dengan `batch_size`, bukan ukuran file.
+        """
+        records = self.open(version)
+        if records is None or len(records) == 0:
+            return
+        keys = records["key"]
+        # Indeks kemunculan terakhir tiap key, diurutkan sesuai urutan tulis
+        unique_keys, last_reversed = np.unique(keys[::-1], return_index=True)
+        keep = np.sort((len(keys) - 1 - last_reversed)[unique_keys != b""])
+
+        for start in range(0, len(keep), batch_size):
+            rows = keep[start : start + batch_size]
+            batch = np.asarray(records[rows])
+            yield [key.decode() for key in batch["key"]], batch["vector"]
+
+    # ==================== TULIS ====================
+
+    def append(self, version: str, keys: List[str], vectors: np.ndarray) -> int:
+        """Menambahkan vektor (NxD) untuk `keys`; key yang sudah ada dilewati.
+
+        Mengembalikan jumlah record yang benar-benar ditulis (0 juga bila file
+        sudah mencapai `max_bytes`).
+        """
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(len(keys), -1)
+        dim = vectors.shape[1]
+        encoded = [key.encode() for key in keys]
+        if any(len(key) > KEY_BYTES for key in encoded):
+            raise ValueError(f"Key fitur melebihi {KEY_BYTES} byte.")
+
+        path = self.path(version)
+        with self._lock:
+            index = self._index(version)
+            fresh = []
+            for i, key in enumerate(encoded):
+                if key not in index:
+                    index.add(key)
+                    fresh.append(i)
+            if not fresh:
+                return 0
+
+            self.root.mkdir(parents=True, exist_ok=True)
+            dtype = record_dtype(dim)
+            records = np.zeros(len(fresh), dtype)
+            records["key"] = [encoded[i] for i in fresh]
+            records["created_at"] = time.time()
+            records["vector"] = vectors[fresh]
+
+            fd = None
+            try:
+                fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+                if fcntl is not None:
+                    # Dilepas otomatis saat fd ditutup
+                    fcntl.flock(fd, fcntl.LOCK_EX)
+                size = os.fstat(fd).st_size
+                if size < _HEADER.size:
+                    # File baru (atau header terpotong): header ditulis ulang
+                    os.ftruncate(fd, 0)
+                    os.write(fd, _HEADER.pack(_MAGIC, _FORMAT_REVISION, dim))
+                    size = _HEADER.size
+                elif self._read_header(path) != dim:
+                    raise ValueError(
+                        f"Dimensi fitur {dim} berbeda dengan file {path.name}."
+                    )
+                torn = (size - _HEADER.size) % dtype.itemsize
+                if torn:
+                    # Sisa record dari proses yang mati saat menulis; aman
+                    # dipotong karena penulis lain menunggu lock yang sama
+                    os.ftruncate(fd, size - torn)
+                data = memoryview(records.tobytes())
+                if self.max_bytes and size - torn + len(data) > self.max_bytes:
+                    logger.warning(
+                        "File fitur %s mencapai batas %d byte, %d vektor dilewati.",
+                        path.name,
+                        self.max_bytes,
+                        len(fresh),
+                    )
+                    index.difference_update(encoded[i] for i in fresh)
+                    return 0
+                while data:
+                    data = data[os.write(fd, data) :]
+            except Exception:
+                index.difference_update(encoded[i] for i in fresh)
+                raise
+            finally:
+                if fd is not None:
+                    os.close(fd)
+            return len(fresh)
+
+    def stats(self) -> dict:
+        """Jumlah record per versi pipeline (untuk monitoring)."""
+        result = {}
+        for version in self.versions():
+            records = self.open(version)
+            result[version] = 0 if records is None else len(records)
+        return result
@@ -0,0 +1,251 @@
+# app/services/fused_inference.py
+"""Kernel inferensi gabungan: scaler -> PCA sebagai satu proyeksi affine, lalu
+classifier dievaluasi sekali untuk label sekaligus probabilitas.
+
+StandardScaler dan PCA sama-sama affine, jadi
+    ((x - mean) / scale - pca_mean) @ components.T
+dapat dipra-hitung menjadi `x @ W + b`. Classifier kemudian dijalankan langsung
+dengan NumPy tanpa validasi input scikit-learn di setiap pemanggilan:
+
+- SVC (kernel rbf, probability=True): nilai keputusan one-vs-one dihitung
+  sekali dari kernel, label diambil dari voting (sama seperti `predict` libsvm)
+  dan probabilitas dari pairwise coupling libsvm (`predict_proba`).
+- KNeighborsClassifier (euclidean): satu pencarian tetangga (brute force
+  terblok atau KDTree) dipakai untuk label dan probabilitas berbobot.
+
+Model lain tidak didukung; `build_fused_classifier` mengembalikan None dan
+pemanggil memakai jalur scikit-learn biasa.
+"""
+
+from typing import Optional, Tuple
+
+import numpy as np
+from sklearn.neighbors import KDTree, KNeighborsClassifier
+from sklearn.svm import SVC
+
+# Konstanta dari libsvm (svm.cpp: svm_predict_probability, multiclass_probability)
+_LIBSVM_MIN_PROB = 1e-7
+
+KNN_INDEXES = ("auto", "brute", "kdtree")
+# Di bawah ukuran ini brute force (satu matmul) lebih cepat dari KDTree
+KNN_TREE_MIN_SIZE = 4096
+_KDTREE_LEAF_SIZE = 40
+# Maksimum elemen matriks jarak sementara per blok query brute force (~32 MB)
+_BRUTE_BLOCK_ELEMENTS = 4_000_000
+
+
+def affine_projection(scaler, pca) -> Tuple[np.ndarray, np.ndarray]:
+    """Matriks W (D x K) dan bias b (K,) sehingga x @ W + b == pca(scaler(x))."""
+    n_features = pca.components_.shape[1]
+    mean = scaler.mean_ if scaler.mean_ is not None else np.zeros(n_features)
+    scale = scaler.scale_ if scaler.scale_ is not None else np.ones(n_features)
+    pca_mean = pca.mean_ if pca.mean_ is not None else np.zeros(n_features)
+
+    components = pca.components_
+    if pca.whiten:
+        components = components / np.sqrt(pca.explained_variance_)[:, None]
+
+    weights = (components / scale).T
+    bias = -(mean / scale + pca_mean) @ components.T
+    return np.ascontiguousarray(weights), bias
+
+
+class FusedSVC:
+    """Evaluasi SVC rbf multikelas dengan satu perhitungan kernel."""
+
+    def __init__(self, model: SVC):
+        self.n_classes = len(model.classes_)
+        self.gamma = float(model._gamma)
+        self.support_vectors = np.ascontiguousarray(model.support_vectors_)
+        self.sv_sq_norms = np.einsum(
+            "ij,ij->i", self.support_vectors, self.support_vectors
+        )
+        self.prob_a = np.asarray(model._probA)
+        self.prob_b = np.asarray(model._probB)
+
+        # Koefisien per pasangan kelas (i < j) dirangkai menjadi satu matriks
+        # (n_SV x n_pasangan) sehingga semua nilai keputusan = K @ coef + intercept
+        n_support = np.asarray(model._n_support)
+        starts = np.concatenate([[0], np.cumsum(n_support)])
+        dual_coef = np.asarray(model._dual_coef_)
+        pairs = [
+            (i, j) for i in range(self.n_classes) for j in range(i + 1, self.n_classes)
+        ]
+        coef = np.zeros((len(self.support_vectors), len(pairs)))
+        for index, (i, j) in enumerate(pairs):
+            coef[starts[i] : starts[i + 1], index] = dual_coef[
+                j - 1, starts[i] : starts[i + 1]
+            ]
+            coef[starts[j] : starts[j + 1], index] = dual_coef[
+                i, starts[j] : starts[j + 1]
+            ]
+        self.pairs = np.asarray(pairs)
+        self.pair_coef = coef
+        self.intercept = np.asarray(model._intercept_)
+
+    def decision_values(self, z: np.ndarray) -> np.ndarray:
+        """Nilai keputusan one-vs-one (N x n_pasangan), urutan pasangan libsvm."""
+        sq_dist = (
+            np.einsum("ij,ij->i", z, z)[:, None]
+            - 2.0 * (z @ self.support_vectors.T)
+            + self.sv_sq_norms
+        )
+        np.maximum(sq_dist, 0.0, out=sq_dist)
+        kernel = np.exp(-self.gamma * sq_dist)
+        return kernel @ self.pair_coef + self.intercept
+
+    def predict(self, z: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Indeks kelas (voting) dan probabilitas (pairwise coupling) per baris."""
+        decision = self.decision_values(z)
+
+        # Voting libsvm: dec > 0 -> kelas i, selain itu kelas j; seri -> indeks kecil
+        winners = np.where(decision > 0, self.pairs[:, 0], self.pairs[:, 1])
+        votes = np.zeros((len(z), self.n_classes), dtype=int)
+        for column in range(winners.shape[1]):
+            votes[np.arange(len(z)), winners[:, column]] += 1
+        labels = votes.argmax(axis=1)
+
+        pairwise = self._sigmoid(decision * self.prob_a + self.prob_b)
+        np.clip(pairwise, _LIBSVM_MIN_PROB, 1 - _LIBSVM_MIN_PROB, out=pairwise)
+        proba = np.vstack([self._couple(row) for row in pairwise])
+        return labels, proba
+
+    @staticmethod
+    def _sigmoid(f_apb: np.ndarray) -> np.ndarray:
+        """sigmoid_predict libsvm (bentuk stabil untuk kedua tanda)."""
+        positive = f_apb >= 0
+        exp_term = np.exp(-np.abs(f_apb))
+        return np.where(positive, exp_term / (1.0 + exp_term), 1.0 / (1.0 + exp_term))
+
+    def _couple(self, pairwise_row: np.ndarray) -> np.ndarray:
+        """multiclass_probability libsvm untuk satu sampel."""
+        k = self.n_classes
+        r = np.zeros((k, k))
+        for (i, j), value in zip(self.pairs, pairwise_row):
+            r[i, j] = value
+            r[j, i] = 1.0 - value
+
+        q = -r.T * r
+        np.fill_diagonal(q, (r**2).sum(axis=0) - np.diag(r) ** 2)
+
+        p = np.full(k, 1.0 / k)
+        eps = 0.005 / k
+        for _ in range(max(100, k)):
+            qp = q @ p
+            p_qp = p @ qp
+            if np.abs(qp - p_qp).max() < eps:
+                break
+            for t in range(k):
+                diff = (-qp[t] + p_qp) / q[t, t]
+                p[t] += diff
+                p_qp = (p_qp + diff * (diff * q[t, t] + 2 * qp[t])) / (1 + diff) ** 2
+                qp = (qp + diff * q[t]) / (1 + diff)
+                p /= 1 + diff
+        return p
+
+
+class FusedKNN:
+    """KNN euclidean berbobot jarak dengan satu pencarian tetangga.
+
+    Pencarian tetangga memakai salah satu indeks yang dibangun sekali saat load:
+    - `brute`: matriks latih contiguous + norma kuadrat pra-hitung, jarak
+      dihitung per blok query agar memori tetap terbatas (linear terhadap N).
+    - `kdtree`: KDTree scikit-learn di ruang PCA (sub-linear untuk data latih
+      yang besar dan berkelompok).
+    - `auto`: `kdtree` jika data latih >= KNN_TREE_MIN_SIZE, selain itu `brute`.
+    """
+
+    def __init__(self, model: KNeighborsClassifier, index: str = "auto"):
+        if index not in KNN_INDEXES:
+            raise ValueError(
+                f"Indeks KNN '{index}' tidak dikenal, pilih salah satu: "
+                f"{', '.join(KNN_INDEXES)}"
+            )
+
+        self.n_neighbors = model.n_neighbors
+        self.n_classes = len(model.classes_)
+        self.fit_x = np.ascontiguousarray(model._fit_X, dtype=np.float64)
+        self.fit_y = np.asarray(model._y)
+        self.distance_weights = model.weights == "distance"
+
+        if index == "auto":
+            index = "kdtree" if len(self.fit_x) >= KNN_TREE_MIN_SIZE else "brute"
+        self.index = index
+
+        self.fit_sq_norms = None
+        self.tree = None
+        if index == "kdtree":
+            self.tree = KDTree(self.fit_x, leaf_size=_KDTREE_LEAF_SIZE)
+        else:
+            self.fit_sq_norms = np.einsum("ij,ij->i", self.fit_x, self.fit_x)
+
+    def kneighbors(self, z: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Jarak dan indeks k tetangga terdekat per baris (tidak harus terurut)."""
+        k = min(self.n_neighbors, len(self.fit_x))
+        if self.tree is not None:
+            return self.tree.query(z, k=k)
+
+        # Blok query dibatasi agar matriks jarak sementara tidak terlalu besar
+        block = max(1, _BRUTE_BLOCK_ELEMENTS // len(self.fit_x))
+        neighbors = np.empty((len(z), k), dtype=np.intp)
+        for begin in range(0, len(z), block):
+            chunk = z[begin : begin + block]
+            sq_dist = (
+                np.einsum("ij,ij->i", chunk, chunk)[:, None]
+                - 2.0 * (chunk @ self.fit_x.T)
+                + self.fit_sq_norms
+            )
+            neighbors[begin : begin + block] = np.argpartition(sq_dist, k - 1, axis=1)[
+                :, :k
+            ]
+
+        # Jarak tetangga terpilih dihitung ulang secara langsung agar titik yang
+        # identik dengan data latih benar-benar berjarak nol (tanpa galat pembulatan)
+        distances = np.linalg.norm(z[:, None, :] - self.fit_x[neighbors], axis=2)
+        return distances, neighbors
+
+    def predict(self, z: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Indeks kelas dan probabilitas berbobot per baris."""
+        distances, neighbors = self.kneighbors(z)
+        rows = np.arange(len(z))[:, None]
+
+        if self.distance_weights:
+            # Sama seperti scikit-learn: jarak nol -> hanya tetangga identik dihitung
+            with np.errstate(divide="ignore"):
+                weights = 1.0 / distances
+            exact = np.isinf(weights)
+            exact_rows = exact.any(axis=1)
+            weights[exact_rows] = exact[exact_rows]
+        else:
+            weights = np.ones_like(distances)
+
+        proba = np.zeros((len(z), self.n_classes))
+        np.add.at(
+            proba,
+            (np.broadcast_to(rows, neighbors.shape), self.fit_y[neighbors]),
+            weights,
+        )
+        proba /= proba.sum(axis=1, keepdims=True)
+        return proba.argmax(axis=1), proba
+
+
+def build_fused_classifier(model, knn_index: str = "auto") -> Optional[object]:
+    """Kernel gabungan untuk model yang didukung, None jika tidak didukung."""
+    if (
+        isinstance(model, SVC)
+        and model.kernel == "rbf"
+        and model.probability
+        and len(model.classes_) > 2
+        and not model.break_ties
+    ):
+        return FusedSVC(model)
+
+    if (
+        isinstance(model, KNeighborsClassifier)
+        and model.effective_metric_ == "euclidean"
+        and model.weights in ("uniform", "distance")
+        and not model.outputs_2d_
+    ):
+        return FusedKNN(model, index=knn_index)
+
+    return None
@@ -0,0 +1,170 @@
+# app/services/glcm.py
+"""Ekstraksi fitur tekstur GLCM (Gray Level Co-occurrence Matrix) tervektorisasi.
+
+Semua pasangan jarak/sudut dihitung dalam satu kali `np.bincount`, lalu
+contrast, correlation, energy, dan homogeneity dihitung bersama dari matriks
+yang sudah dinormalisasi sekali.
+
+- Mode exact (levels=256) mereplikasi urutan operasi floating point
+  `skimage.feature.graycomatrix` + `graycoprops` sehingga vektor 48 fitur
+  identik dengan pipeline lama dan model `.pkl` tetap valid.
+- Mode cepat (mis. levels=32/64) mengkuantisasi gray level lebih dulu dan
+  memakai marginal bersama; hasilnya berbeda sehingga butuh model yang
+  dilatih ulang dengan levels yang sama.
+"""
+
+import math
+from typing import Sequence
+
+import numpy as np
+
+DISTANCES = (1, 2, 3)
+ANGLES = (0, np.pi / 4, np.pi / 2, 3 * np.pi / 4)
+PROPS = ("contrast", "correlation", "energy", "homogeneity")
+
+
+def _round_half_away(value: float) -> int:
+    """Pembulatan seperti `round` di C (yang dipakai loop GLCM skimage)."""
+    return int(math.copysign(math.floor(abs(value) + 0.5), value))
+
+
+def quantize(gray_img: np.ndarray, levels: int) -> np.ndarray:
+    """Mengkuantisasi gambar uint8 (0-255) menjadi `levels` tingkat keabuan."""
+    if levels == 256:
+        return gray_img
+    return ((gray_img.astype(np.uint32) * levels) >> 8).astype(np.uint8)
+
+
+def cooccurrence_counts(
+    image: np.ndarray,
+    levels: int,
+    distances: Sequence[int] = DISTANCES,
+    angles: Sequence[float] = ANGLES,
+) -> np.ndarray:
+    """Menghitung GLCM (belum simetris) untuk semua jarak/sudut sekaligus.
+
+    Hasil berbentuk (jumlah_jarak * jumlah_sudut, levels, levels) dengan
+    urutan jarak-mayor, sama seperti `graycomatrix(...)[:, :, d, a]`.
+    """
+    rows, cols = image.shape
+    image = image.astype(np.int64, copy=False)
+    pair_indices = []
+
+    for pair, (distance, angle) in enumerate((d, a) for d in distances for a in angles):
+        offset_row = _round_half_away(math.sin(angle) * distance)
+        offset_col = _round_half_away(math.cos(angle) * distance)
+
+        row_start, row_end = max(0, -offset_row), min(rows, rows - offset_row)
+        col_start, col_end = max(0, -offset_col), min(cols, cols - offset_col)
+        if row_start >= row_end or col_start >= col_end:
+            continue
+
+        reference = image[row_start:row_end, col_start:col_end]
+        neighbour = image[
+            row_start + offset_row : row_end + offset_row,
+            col_start + offset_col : col_end + offset_col,
+        ]
+        offset = pair * levels * levels
+        pair_indices.append((offset + reference * levels + neighbour).ravel())
+
+    num_pairs = len(distances) * len(angles)
+    if pair_indices:
+        counts = np.bincount(
+            np.concatenate(pair_indices), minlength=num_pairs * levels * levels
+        )
+    else:
+        counts = np.zeros(num_pairs * levels * levels, dtype=np.int64)
+    return counts.reshape(num_pairs, levels, levels)
+
+
+def _exact_props(counts: np.ndarray, num_dist: int, num_angle: int) -> np.ndarray:
+    """Properti GLCM dengan urutan operasi yang sama persis dengan skimage."""
+    levels = counts.shape[-1]
+
+    # Layout (levels, levels, jarak, sudut) C-contiguous seperti graycomatrix
+    P = np.ascontiguousarray(
+        counts.astype(np.uint32)
+        .reshape(num_dist, num_angle, levels, levels)
+        .transpose(2, 3, 0, 1)
+    )
+    P = P + np.transpose(P, (1, 0, 2, 3))
+
+    # graycomatrix(normed=True) lalu graycoprops menormalisasi ulang
+    P = P.astype(np.float64)
+    for _ in range(2):
+        glcm_sums = np.sum(P, axis=(0, 1), keepdims=True)
+        glcm_sums[glcm_sums == 0] = 1
+        P /= glcm_sums
+
+    I, J = np.ogrid[0:levels, 0:levels]
+    diff_sq = ((I - J) ** 2).reshape((levels, levels, 1, 1))
+    contrast = np.sum(P * diff_sq, axis=(0, 1))
+    homogeneity_weights = (1.0 / (1.0 + (I - J) ** 2)).reshape((levels, levels, 1, 1))
+    homogeneity = np.sum(P * homogeneity_weights, axis=(0, 1))
+    energy = np.sqrt(np.sum(P**2, axis=(0, 1)))
+
+    correlation = np.zeros((num_dist, num_angle), dtype=np.float64)
+    I = np.array(range(levels)).reshape((levels, 1, 1, 1))
+    J = np.array(range(levels)).reshape((1, levels, 1, 1))
+    diff_i = I - np.sum(I * P, axis=(0, 1))
+    diff_j = J - np.sum(J * P, axis=(0, 1))
+    std_i = np.sqrt(np.sum(P * (diff_i) ** 2, axis=(0, 1)))
+    std_j = np.sqrt(np.sum(P * (diff_j) ** 2, axis=(0, 1)))
+    cov = np.sum(P * (diff_i * diff_j), axis=(0, 1))
+    mask_0 = std_i < 1e-15
+    mask_0[std_j < 1e-15] = True
+    correlation[mask_0] = 1
+    mask_1 = ~mask_0
+    correlation[mask_1] = cov[mask_1] / (std_i[mask_1] * std_j[mask_1])
+
+    return np.concatenate(
+        [prop.flatten() for prop in (contrast, correlation, energy, homogeneity)]
+    )
+
+
+def _fast_props(counts: np.ndarray) -> np.ndarray:
+    """Properti GLCM dari matriks simetris ternormalisasi + marginal bersama."""
+    levels = counts.shape[-1]
+    P = (counts + counts.transpose(0, 2, 1)).astype(np.float64)
+    sums = P.sum(axis=(1, 2), keepdims=True)
+    sums[sums == 0] = 1
+    P /= sums
+
+    gray_levels = np.arange(levels, dtype=np.float64)
+    diff_sq = (gray_levels[:, None] - gray_levels[None, :]) ** 2
+
+    # GLCM simetris: marginal baris == marginal kolom
+    marginal = P.sum(axis=2)
+    mean = marginal @ gray_levels
+    variance = marginal @ gray_levels**2 - mean**2
+    joint = np.einsum("kij,i,j->k", P, gray_levels, gray_levels)
+
+    contrast = np.einsum("kij,ij->k", P, diff_sq)
+    homogeneity = np.einsum("kij,ij->k", P, 1.0 / (1.0 + diff_sq))
+    energy = np.sqrt(np.einsum("kij,kij->k", P, P))
+    correlation = np.ones_like(mean)
+    valid = variance >= 1e-30
+    correlation[valid] = (joint[valid] - mean[valid] ** 2) / variance[valid]
+
+    return np.concatenate([contrast, correlation, energy, homogeneity])
+
+
+def glcm_features(
+    gray_img: np.ndarray,
+    levels: int = 256,
+    distances: Sequence[int] = DISTANCES,
+    angles: Sequence[float] = ANGLES,
+) -> np.ndarray:
+    """Vektor fitur GLCM (contrast, correlation, energy, homogeneity).
+
+    `levels=256` memakai mode exact (kompatibel dengan model lama), nilai lain
+    memakai mode cepat terkuantisasi.
+    """
+    image = quantize(gray_img, levels)
+    counts = cooccurrence_counts(image, levels, distances, angles)
+
+    if levels == 256:
+        props = _exact_props(counts, len(distances), len(angles))
+    else:
+        props = _fast_props(counts)
+    return props.astype(np.float32)
@@ -0,0 +1,157 @@
+# app/services/history.py
+"""Jalur baca riwayat prediksi: pagination keyset, agregat, dan cache per user.
+
+Halaman diurutkan `(created_at DESC, id DESC)` dan cursor berisi pasangan
+(created_at, id) baris terakhir, sehingga setiap halaman adalah satu range scan
+pada indeks `(user_id, created_at, id)` tanpa OFFSET yang makin lambat.
+
+Cache per user memakai token generasi: insert riwayat baru mengganti token
+user tersebut sehingga semua entri lamanya tidak pernah terbaca lagi (dan
+terbuang sendiri lewat LRU/TTL). Cache bersifat per proses; pada beberapa
+worker uvicorn, TTL pendek membatasi data basi dari worker lain.
+"""
+
+import base64
+import binascii
+import itertools
+import uuid
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+from app.configs import settings
+from app.db.client import get_supabase_clients, run_io, supabase
+from app.services.cache import TTLCache
+
+_, db_client = get_supabase_clients()
+
+# Kolom yang dikirim ke aplikasi (tanpa kolom internal/tambahan di tabel)
+HISTORY_COLUMNS = (
+    "id,user_id,image_url,thumbnail_url,svm_result,knn_result,statistics,created_at"
+)
+STATS_FUNCTION = "predict_history_stats"
+
+_history_cache = TTLCache(
+    maxsize=settings.HISTORY_CACHE_SIZE,
+    ttl=settings.HISTORY_CACHE_TTL_SECONDS or None,
+)
+# user_id -> token generasi; token baru tidak pernah dipakai ulang
+_generations = TTLCache(maxsize=max(1, settings.HISTORY_CACHE_SIZE))
+_generation_counter = itertools.count(1)
+
+
+def history_cache_stats() -> dict:
+    """Statistik cache riwayat (ukuran & hit rate)."""
+    return _history_cache.stats()
+
+
+def _generation(user_id: str) -> int:
+    token = _generations.get(user_id)
+    if token is None:
+        token = next(_generation_counter)
+        _generations.set(user_id, token)
+    return token
+
+
+def invalidate_user(user_id: str) -> None:
+    """Menandai semua cache riwayat user sebagai basi (dipanggil setelah insert)."""
+    _generations.set(user_id, next(_generation_counter))
+
+
+def encode_cursor(row: dict) -> str:
+    """Cursor opaque dari baris terakhir halaman."""
+    raw = f"{row['created_at']}|{row['id']}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    """(created_at, id) dari cursor; ValueError jika cursor tidak valid.
+
+    Kedua nilai di-parse lalu diformat ulang karena disisipkan ke filter
+    PostgREST; isi cursor dari klien tidak pernah dipakai mentah-mentah.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = base64.urlsafe_b64decode(padded).decode().split("|")
+        created_at = datetime.fromisoformat(created_at).isoformat()
+        row_id = str(uuid.UUID(row_id))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError("Cursor riwayat tidak valid.")
+    return created_at, row_id
+
+
+def _fetch_page(
+    user_id: str, limit: int, after: Optional[Tuple[str, str]]
+) -> Tuple[list, Optional[str]]:
+    query = (
+        db_client("predict_history")
+        .select(HISTORY_COLUMNS)
+        .eq("user_id", user_id)
+        .order("created_at", desc=True)
+        .order("id", desc=True)
+        # Satu baris ekstra untuk mengetahui ada halaman berikutnya atau tidak
+        .limit(limit + 1)
+    )
+    if after is not None:
+        created_at, row_id = after
+        query = query.or_(
+            f'created_at.lt."{created_at}",'
+            f'and(created_at.eq."{created_at}",id.lt."{row_id}")'
+        )
+
+    rows = query.execute().data
+    next_cursor = encode_cursor(rows[limit - 1]) if len(rows) > limit else None
+    return rows[:limit], next_cursor
+
+
+async def get_history_page(
+    user_id: str, limit: int, cursor: Optional[str] = None
+) -> Tuple[list, Optional[str]]:
+    """Satu halaman riwayat user (terbaru dulu) beserta cursor halaman berikutnya."""
+    after = decode_cursor(cursor) if cursor else None
+    key = (user_id, _generation(user_id), "page", cursor, limit)
+
+    page = _history_cache.get(key)
+    if page is None:
+        page = await run_io(_fetch_page, user_id, limit, after)
+        _history_cache.set(key, page)
+    return page
+
+
+def _fetch_stats(
+    user_id: str, start: Optional[datetime], end: Optional[datetime]
+) -> Tuple[int, Dict[str, Dict[str, int]]]:
+    params = {
+        "p_user_id": user_id,
+        "p_from": start.isoformat() if start else None,
+        "p_to": end.isoformat() if end else None,
+    }
+    rows = supabase.rpc(STATS_FUNCTION, params).execute().data or []
+
+    counts: Dict[str, Dict[str, int]] = {"svm": {}, "knn": {}}
+    total = 0
+    for row in rows:
+        if row["model"] == "all":
+            total = int(row["total"])
+        else:
+            counts.setdefault(row["model"], {})[row["label"]] = int(row["total"])
+    return total, counts
+
+
+async def get_history_stats(
+    user_id: str, start: Optional[datetime] = None, end: Optional[datetime] = None
+) -> dict:
+    """Jumlah prediksi per label per model dalam rentang waktu (dihitung di DB)."""
+    key = (user_id, _generation(user_id), "stats", start, end)
+
+    stats = _history_cache.get(key)
+    if stats is None:
+        total, counts = await run_io(_fetch_stats, user_id, start, end)
+        stats = {
+            "total": total,
+            "svm": counts["svm"],
+            "knn": counts["knn"],
+            "start": start,
+            "end": end,
+        }
+        _history_cache.set(key, stats)
+    return stats
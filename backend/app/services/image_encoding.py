@@ -0,0 +1,142 @@
+# app/services/image_encoding.py
+"""Re-encode gambar upload sebelum disimpan ke storage.
+
+Fungsi di sini murni CPU (decode, resize, encode) dan dijalankan di executor
+ekstraksi fitur, jadi tidak boleh mengimpor klien Supabase agar aman dipakai
+worker proses (`spawn`).
+"""
+
+import io
+from typing import Dict, NamedTuple, Optional, Tuple
+
+import cv2
+import numpy as np
+from PIL import Image
+
+# format -> (ekstensi, MIME type, flag kualitas OpenCV)
+STORAGE_FORMATS = {
+    "jpeg": (".jpg", "image/jpeg", cv2.IMWRITE_JPEG_QUALITY),
+    "webp": (".webp", "image/webp", cv2.IMWRITE_WEBP_QUALITY),
+}
+
+# Faktor decode tereduksi (dipilih lewat `reduced_decode_flag`)
+REDUCED_DECODE_FLAGS = (
+    (8, cv2.IMREAD_REDUCED_COLOR_8),
+    (4, cv2.IMREAD_REDUCED_COLOR_4),
+    (2, cv2.IMREAD_REDUCED_COLOR_2),
+)
+
+
+class EncodedImage(NamedTuple):
+    data: bytes
+    content_type: str
+
+
+def probe_image_size(image_bytes: bytes) -> Optional[Tuple[int, int]]:
+    """(lebar, tinggi) dari header gambar tanpa decode piksel, None jika gagal.
+
+    Dipakai validasi upload, decode fitur, dan encode storage sehingga batas
+    decode ketiganya sama. `Image.DecompressionBombError` diteruskan: gambar
+    sebesar itu tidak boleh di-decode penuh sebagai fallback.
+    """
+    try:
+        with Image.open(io.BytesIO(image_bytes)) as img:
+            return img.size
+    except Image.DecompressionBombError:
+        raise
+    except Exception:
+        return None
+
+
+def reduced_decode_flag(size: Optional[Tuple[int, int]], min_side: int) -> int:
+    """Flag `cv2.imdecode` terkecil (1/8, 1/4, 1/2) yang sisi terpanjangnya
+    masih >= `min_side`; IMREAD_COLOR jika ukuran tidak diketahui/terlalu kecil.
+    """
+    if size is not None and min_side > 0:
+        for factor, reduced_flag in REDUCED_DECODE_FLAGS:
+            if max(size) // factor >= min_side:
+                return reduced_flag
+    return cv2.IMREAD_COLOR
+
+
+def _decode_bounded(
+    image_bytes: bytes, max_side: int
+) -> Tuple[Optional[np.ndarray], int]:
+    """Decode pada skala 1/2-1/8 selama sisi terpanjang tetap >= `max_side`.
+
+    Mengembalikan (gambar BGR atau None, sisi terpanjang gambar asli).
+    """
+    size = probe_image_size(image_bytes)
+    flag = reduced_decode_flag(size, max_side)
+    img = cv2.imdecode(np.frombuffer(image_bytes, np.uint8), flag)
+
+    longest = max(size) if size is not None else 0
+    if img is not None and not longest:
+        longest = max(img.shape[:2])
+    return img, longest
+
+
+def _fit(img: np.ndarray, max_side: int) -> np.ndarray:
+    height, width = img.shape[:2]
+    scale = max_side / max(height, width)
+    if max_side <= 0 or scale >= 1:
+        return img
+    size = (max(1, round(width * scale)), max(1, round(height * scale)))
+    return cv2.resize(img, size, interpolation=cv2.INTER_AREA)
+
+
+def _encode(img: np.ndarray, image_format: str, quality: int) -> EncodedImage:
+    extension, content_type, quality_flag = STORAGE_FORMATS[image_format]
+    ok, buffer = cv2.imencode(extension, img, [quality_flag, quality])
+    if not ok:
+        raise ValueError(f"Gagal meng-encode gambar ke {image_format}.")
+    return EncodedImage(buffer.tobytes(), content_type)
+
+
+def encode_for_storage(
+    image_bytes: bytes,
+    content_type: str,
+    image_format: str,
+    max_side: int,
+    quality: int,
+    thumbnail_side: int,
+    thumbnail_quality: int,
+) -> Dict[str, EncodedImage]:
+    """Membuat varian objek storage dari bytes upload (dijalankan di worker).
+
+    Mengembalikan dict `image` (gambar utama dibatasi `max_side`) dan, jika
+    `thumbnail_side` > 0, `thumbnail`. Pada format `original` gambar utama
+    adalah bytes asli. Bytes asli juga dipakai bila gambar sudah dalam batas
+    resolusi & format yang sama dan hasil re-encode tidak lebih kecil.
+    """
+    original = EncodedImage(image_bytes, content_type)
+    if image_format == "original" and thumbnail_side <= 0:
+        return {"image": original}
+
+    decode_side = max_side if image_format != "original" else thumbnail_side
+    img, longest = _decode_bounded(image_bytes, decode_side)
+    if img is None:
+        raise ValueError(
+            "Gagal membaca gambar. Pastikan file adalah gambar yang valid."
+        )
+
+    variants = {"image": original}
+    thumbnail_format = "jpeg" if image_format == "original" else image_format
+
+    if image_format != "original":
+        fitted = _fit(img, max_side)
+        encoded = _encode(fitted, image_format, quality)
+        keep_original = (
+            (max_side <= 0 or longest <= max_side)
+            and content_type == encoded.content_type
+            and len(image_bytes) <= len(encoded.data)
+        )
+        if not keep_original:
+            variants["image"] = encoded
+        img = fitted
+
+    if thumbnail_side > 0:
+        variants["thumbnail"] = _encode(
+            _fit(img, thumbnail_side), thumbnail_format, thumbnail_quality
+        )
+    return variants
@@ -0,0 +1,119 @@
+# app/services/ingest.py
+"""Ingestion upload gambar: baca sekali, batasi ukuran, validasi header lebih dulu.
+
+Urutan pemeriksaan dibuat dari yang paling murah:
+1. `UploadFile.size` (diisi parser multipart) dibandingkan MAX_UPLOAD_BYTES,
+   sehingga payload raksasa ditolak tanpa dibaca sama sekali.
+2. Potongan header kecil dibaca untuk magic bytes (tipe file) dan dimensi
+   (lebar x tinggi) via PIL tanpa decode piksel -> 415 / 413.
+3. Seluruh isi dibaca sekali menjadi satu objek `bytes` (dengan batas
+   MAX_UPLOAD_BYTES jika ukuran tidak diketahui). Buffer yang sama dipakai
+   untuk hash, `cv2.imdecode`, dan upload storage tanpa salinan tambahan.
+"""
+
+from typing import NamedTuple, Optional, Tuple
+
+from fastapi import HTTPException, UploadFile, status
+from PIL import Image
+
+from app.configs import settings
+from app.services.image_encoding import probe_image_size
+
+# Header JPEG bisa memuat EXIF + thumbnail sebelum marker SOF; 64 KB cukup
+# untuk hampir semua foto ponsel. Jika tidak cukup, dimensi dicek dari buffer penuh.
+_HEADER_BYTES = 64 * 1024
+
+_SIGNATURES = (
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"BM", "image/bmp"),
+    (b"II*\x00", "image/tiff"),
+    (b"MM\x00*", "image/tiff"),
+)
+
+
+class IngestedImage(NamedTuple):
+    """Isi upload yang sudah divalidasi (satu buffer untuk semua konsumen)."""
+
+    data: bytes
+    content_type: str
+    width: int
+    height: int
+
+
+def _too_large(detail: str) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=detail
+    )
+
+
+def sniff_image_type(header: bytes) -> Optional[str]:
+    """MIME type dari magic bytes, None jika bukan format gambar yang didukung."""
+    if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+        return "image/webp"
+    for signature, content_type in _SIGNATURES:
+        if header.startswith(signature):
+            return content_type
+    return None
+
+
+def read_image_size(data: bytes) -> Optional[Tuple[int, int]]:
+    """(lebar, tinggi) dari header gambar tanpa decode piksel, None jika gagal."""
+    try:
+        return probe_image_size(data)
+    except Image.DecompressionBombError:
+        # PIL sendiri menolak ukuran ini; pasti di atas batas megapiksel
+        raise _too_large("Resolusi gambar melebihi batas.")
+
+
+def _check_megapixels(size: Tuple[int, int]) -> None:
+    width, height = size
+    megapixels = width * height / 1_000_000
+    if megapixels > settings.MAX_IMAGE_MEGAPIXELS:
+        raise _too_large(
+            f"Resolusi gambar {width}x{height} ({megapixels:.1f} MP) melebihi "
+            f"batas {settings.MAX_IMAGE_MEGAPIXELS} MP."
+        )
+
+
+async def read_image_upload(file: UploadFile) -> IngestedImage:
+    """Membaca dan memvalidasi satu upload gambar.
+
+    Raises:
+        HTTPException 413: ukuran file atau jumlah piksel melebihi batas.
+        HTTPException 415: bukan gambar dengan format yang didukung.
+        HTTPException 400: header gambar rusak / dimensi tidak terbaca.
+    """
+    max_bytes = settings.MAX_UPLOAD_BYTES
+    max_mb = max_bytes / (1024 * 1024)
+    if file.size is not None and file.size > max_bytes:
+        raise _too_large(f"Ukuran file melebihi batas {max_mb:.0f} MB.")
+
+    header = await file.read(_HEADER_BYTES)
+    content_type = sniff_image_type(header)
+    if content_type is None:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="File bukan gambar yang didukung (JPEG, PNG, WebP, BMP, TIFF).",
+        )
+
+    size = read_image_size(header)
+    if size is not None:
+        _check_megapixels(size)
+
+    # Baca ulang dari awal sekaligus: satu buffer penuh, header hanya sementara
+    await file.seek(0)
+    data = await file.read(max_bytes + 1)
+    if len(data) > max_bytes:
+        raise _too_large(f"Ukuran file melebihi batas {max_mb:.0f} MB.")
+
+    if size is None:
+        size = read_image_size(data)
+        if size is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Gagal membaca gambar. Pastikan file adalah gambar yang valid.",
+            )
+        _check_megapixels(size)
+
+    return IngestedImage(data, content_type, size[0], size[1])
@@ -0,0 +1,231 @@
+# app/services/metrics.py
+"""Metrik latensi per tahap dalam format teks Prometheus.
+
+Implementasi kecil tanpa dependensi tambahan: histogram berlabel serta gauge
+dan counter berbasis callback yang dirender oleh endpoint `/metrics`.
+
+Selain histogram global, setiap request dapat membawa trace (dict tahap ->
+durasi ms) lewat contextvar. Trace diisi oleh `stage_timer` / `record_stage`
+dan dapat dilampirkan ke respons sebagai header `Server-Timing`.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# Batas bucket (detik), dari sub-milidetik (inferensi) sampai detik (upload)
+DEFAULT_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+_current_trace: ContextVar[Optional[Dict[str, float]]] = ContextVar(
+    "current_trace", default=None
+)
+
+
+def _escape_label(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labelnames: Iterable[str], values: Iterable[str]) -> str:
+    pairs = [
+        f'{name}="{_escape_label(value)}"' for name, value in zip(labelnames, values)
+    ]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if value != float("inf") else "+Inf"
+
+
+class Histogram:
+    """Histogram kumulatif berlabel, aman dipakai dari banyak thread."""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Tuple[str, ...] = (),
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labelvalues: str) -> None:
+        """Mencatat satu observasi (detik) untuk kombinasi label tertentu."""
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labelvalues)
+            if series is None:
+                # [jumlah per bucket (+Inf di akhir), total, count]
+                series = [[0] * (len(self.buckets) + 1), 0.0, 0]
+                self._series[labelvalues] = series
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> List[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} histogram",
+        ]
+        with self._lock:
+            snapshot = {
+                key: (list(counts), total, count)
+                for key, (counts, total, count) in self._series.items()
+            }
+
+        for labelvalues, (counts, total, count) in sorted(snapshot.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                labels = _format_labels(
+                    self.labelnames + ("le",), labelvalues + (_format_value(bound),)
+                )
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, labelvalues)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class Gauge:
+    """Gauge tanpa label; nilainya dibaca dari callback saat dirender."""
+
+    metric_type = "gauge"
+
+    def __init__(self, name: str, documentation: str, callback: Callable[[], float]):
+        self.name = name
+        self.documentation = documentation
+        self.callback = callback
+
+    def render(self) -> List[str]:
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.metric_type}",
+            f"{self.name} {_format_value(self.callback())}",
+        ]
+
+
+class Counter(Gauge):
+    """Counter tanpa label dari callback; nilainya hanya naik (atau reset ke 0)."""
+
+    metric_type = "counter"
+
+
+class Registry:
+    """Kumpulan metrik yang dirender bersama untuk `/metrics`."""
+
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+
+    def register(self, metric):
+        self._metrics[metric.name] = metric
+        return metric
+
+    def gauge(self, name: str, documentation: str, callback: Callable[[], float]):
+        return self.register(Gauge(name, documentation, callback))
+
+    def counter(self, name: str, documentation: str, callback: Callable[[], float]):
+        return self.register(Counter(name, documentation, callback))
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+STAGE_SECONDS = registry.register(
+    Histogram(
+        "chili_stage_duration_seconds",
+        "Durasi per tahap pipeline (decode, preprocessing, fitur, inferensi, I/O).",
+        ("stage",),
+    )
+)
+REQUEST_SECONDS = registry.register(
+    Histogram(
+        "chili_http_request_duration_seconds",
+        "Durasi request HTTP per route.",
+        ("method", "route", "status"),
+    )
+)
+
+
+# ==================== TRACE PER REQUEST ====================
+
+
+def start_trace() -> Dict[str, float]:
+    """Memulai trace baru untuk konteks (request) saat ini."""
+    trace: Dict[str, float] = {}
+    _current_trace.set(trace)
+    return trace
+
+
+def record_stage(stage: str, seconds: float) -> None:
+    """Mencatat durasi tahap ke histogram dan ke trace request aktif."""
+    STAGE_SECONDS.observe(seconds, stage)
+    trace = _current_trace.get()
+    if trace is not None:
+        trace[stage] = trace.get(stage, 0.0) + seconds * 1000
+
+
+def record_stages(timings: Dict[str, float]) -> None:
+    """Mencatat banyak tahap sekaligus (mis. timing dari worker executor)."""
+    for stage, seconds in timings.items():
+        record_stage(stage, seconds)
+
+
+@contextmanager
+def stage_timer(stage: str):
+    """Context manager untuk mengukur satu tahap di event loop / thread utama."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(stage, time.perf_counter() - start)
+
+
+@contextmanager
+def timed(timings: Optional[Dict[str, float]], stage: str):
+    """Mengukur tahap ke dict `timings` (detik); tanpa efek jika `timings` None.
+
+    Dipakai di dalam worker executor: timing dikembalikan bersama hasil lalu
+    dicatat di proses utama, sehingga histogram juga lengkap untuk backend
+    `process`.
+    """
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[stage] = timings.get(stage, 0.0) + time.perf_counter() - start
+
+
+def server_timing_header(trace: Dict[str, float]) -> str:
+    """Format trace sebagai header `Server-Timing` (durasi dalam ms)."""
+    return ", ".join(f"{stage};dur={ms:.2f}" for stage, ms in trace.items())
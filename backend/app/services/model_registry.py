@@ -0,0 +1,150 @@
+# app/services/model_registry.py
+"""Registry versi model di `backend/models` dan statistik evaluasi shadow.
+
+Layout yang dikenali:
+
+    models/
+        ACTIVE                     # nama versi aktif (opsional)
+        SHADOW                     # nama versi kandidat untuk shadow (opsional)
+        svm_model.pkl, knn_model.pkl   # layout lama = versi `default`
+        2026-10-18/svm_model.pkl, knn_model.pkl
+        ...
+
+Versi aktif dipilih dari MODEL_VERSION, lalu isi file ACTIVE, lalu `default`,
+lalu versi dengan nama terbesar. Pointer ditulis atomik (file sementara lalu
+rename) sehingga worker yang mem-polling tidak pernah membaca isi setengah
+jadi. Folder versi dianggap immutable: perbaikan model = versi baru.
+
+Modul ini tidak memuat model; pemuatan & swap dilakukan PredictService.
+"""
+
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional
+
+MODEL_FILES = ("svm_model.pkl", "knn_model.pkl")
+DEFAULT_VERSION = "default"
+ACTIVE_POINTER = "ACTIVE"
+SHADOW_POINTER = "SHADOW"
+
+_VERSION_PATTERN = re.compile(r"^[A-Za-z0-9][A-Za-z0-9._-]*$")
+
+
+class ModelRegistry:
+    """Discovery versi model dan pembacaan/penulisan pointer ACTIVE & SHADOW."""
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+
+    def version_dir(self, version: str) -> Path:
+        """Folder artefak sebuah versi; ValueError jika nama versi tidak valid."""
+        if version == DEFAULT_VERSION:
+            return self.root
+        if not _VERSION_PATTERN.match(version):
+            raise ValueError(f"Nama versi model tidak valid: {version!r}")
+        return self.root / version
+
+    def has_version(self, version: str) -> bool:
+        model_dir = self.version_dir(version)
+        return all((model_dir / filename).is_file() for filename in MODEL_FILES)
+
+    def versions(self) -> List[str]:
+        """Semua versi lengkap (berisi semua MODEL_FILES), urut nama."""
+        found = []
+        if self.root.is_dir():
+            for path in sorted(self.root.iterdir()):
+                if path.is_dir() and _VERSION_PATTERN.match(path.name):
+                    if self.has_version(path.name):
+                        found.append(path.name)
+        if self.has_version(DEFAULT_VERSION):
+            found.insert(0, DEFAULT_VERSION)
+        return found
+
+    def read_pointer(self, name: str) -> Optional[str]:
+        """Isi pointer (`ACTIVE`/`SHADOW`), None jika tidak ada atau kosong."""
+        try:
+            version = (self.root / name).read_text().strip()
+        except FileNotFoundError:
+            return None
+        return version or None
+
+    def write_pointer(self, name: str, version: Optional[str]) -> None:
+        """Mengganti pointer secara atomik; `version=None` menghapus pointer."""
+        path = self.root / name
+        if version is None:
+            path.unlink(missing_ok=True)
+            return
+        if not self.has_version(version):
+            raise FileNotFoundError(f"Versi model {version!r} tidak lengkap.")
+        tmp_path = path.with_name(f".{name}.tmp")
+        tmp_path.write_text(version + "\n")
+        os.replace(tmp_path, path)
+
+    def resolve_active(self, pinned: str = "") -> str:
+        """Versi yang harus aktif menurut MODEL_VERSION / ACTIVE / isi folder."""
+        version = pinned or self.read_pointer(ACTIVE_POINTER)
+        if version:
+            return version
+        versions = self.versions()
+        if not versions:
+            raise FileNotFoundError(f"Tidak ada model di: {self.root}")
+        return DEFAULT_VERSION if DEFAULT_VERSION in versions else versions[-1]
+
+    def resolve_shadow(self, pinned: str = "") -> Optional[str]:
+        """Versi kandidat shadow menurut MODEL_SHADOW_VERSION / SHADOW."""
+        return pinned or self.read_pointer(SHADOW_POINTER)
+
+
+class ShadowStats:
+    """Agreement & latensi versi shadow per model sejak versi itu dipasang."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset(None)
+
+    def reset(self, version: Optional[str]) -> None:
+        with self._lock:
+            self.version = version
+            self._models: Dict[str, Dict[str, float]] = {}
+
+    def record(
+        self,
+        model_type: str,
+        agreed: bool,
+        confidence_delta: float,
+        shadow_ms: float,
+    ) -> None:
+        with self._lock:
+            entry = self._models.setdefault(
+                model_type,
+                {"compared": 0, "agreed": 0, "delta_sum": 0.0, "ms_sum": 0.0},
+            )
+            entry["compared"] += 1
+            entry["agreed"] += int(agreed)
+            entry["delta_sum"] += confidence_delta
+            entry["ms_sum"] += shadow_ms
+
+    def totals(self) -> Dict[str, int]:
+        """Jumlah perbandingan & yang setuju untuk semua model (metrik)."""
+        with self._lock:
+            return {
+                "compared": sum(e["compared"] for e in self._models.values()),
+                "agreed": sum(e["agreed"] for e in self._models.values()),
+            }
+
+    def stats(self) -> dict:
+        with self._lock:
+            models = {
+                model_type: {
+                    "compared": entry["compared"],
+                    "agreement": round(entry["agreed"] / entry["compared"], 4),
+                    "mean_confidence_delta": round(
+                        entry["delta_sum"] / entry["compared"], 4
+                    ),
+                    "shadow_mean_ms": round(entry["ms_sum"] / entry["compared"], 3),
+                }
+                for model_type, entry in self._models.items()
+            }
+        return {"version": self.version, "models": models}
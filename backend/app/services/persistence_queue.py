@@ -0,0 +1,118 @@
+# app/services/persistence_queue.py
+import asyncio
+import contextvars
+import logging
+from typing import Awaitable, Callable, List, Optional
+
+from app.configs import settings
+
+logger = logging.getLogger(__name__)
+
+PersistJob = Callable[[], Awaitable[None]]
+
+
+class PersistenceQueue:
+    """Antrean background terbatas untuk upload storage + insert riwayat.
+
+    Job adalah fungsi async tanpa argumen yang harus idempoten karena dapat
+    dijalankan ulang (retry dengan backoff eksponensial). Saat aplikasi berhenti,
+    `stop()` menunggu antrean kosong lebih dulu (flush).
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        workers: int,
+        max_retries: int,
+        retry_backoff: float,
+    ):
+        self.maxsize = maxsize
+        self.workers = max(1, workers)
+        self.max_retries = max(0, max_retries)
+        self.retry_backoff = retry_backoff
+        self.failed = 0
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+
+    def start(self) -> None:
+        """Menjalankan worker di event loop aktif (otomatis saat submit pertama)."""
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue(maxsize=self.maxsize)
+        # Konteks kosong: worker tidak mewarisi contextvar (mis. trace) request
+        # yang kebetulan memicu start()
+        self._tasks = [
+            contextvars.Context().run(
+                asyncio.create_task,
+                self._worker(),
+                name=f"persistence-worker-{index}",
+            )
+            for index in range(self.workers)
+        ]
+
+    def submit(self, job: PersistJob) -> bool:
+        """Memasukkan job tanpa menunggu; False jika antrean penuh."""
+        self.start()
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            return False
+        return True
+
+    def qsize(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def _run_with_retry(self, job: PersistJob) -> None:
+        for attempt in range(self.max_retries + 1):
+            try:
+                await job()
+                return
+            except Exception as exc:
+                if attempt == self.max_retries:
+                    self.failed += 1
+                    logger.error(
+                        "Persistensi gagal setelah %d percobaan: %s", attempt + 1, exc
+                    )
+                    return
+                delay = self.retry_backoff * (2**attempt)
+                logger.warning(
+                    "Persistensi gagal (percobaan %d), ulangi dalam %.1fs: %s",
+                    attempt + 1,
+                    delay,
+                    exc,
+                )
+                await asyncio.sleep(delay)
+
+    async def _worker(self) -> None:
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._run_with_retry(job)
+            finally:
+                self._queue.task_done()
+
+    async def stop(self, timeout: Optional[float] = None) -> None:
+        """Flush antrean (menunggu semua job selesai) lalu menghentikan worker."""
+        if not self._tasks:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.error(
+                "Flush antrean persistensi timeout, %d job tidak tersimpan.",
+                self.qsize(),
+            )
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
+
+
+# Instance bersama; dihentikan (flush) lewat lifespan aplikasi
+persistence_queue = PersistenceQueue(
+    maxsize=settings.PERSIST_QUEUE_SIZE,
+    workers=settings.PERSIST_WORKERS,
+    max_retries=settings.PERSIST_MAX_RETRIES,
+    retry_backoff=settings.PERSIST_RETRY_BACKOFF_SECONDS,
+)
@@ -1,12 +1,28 @@
-from app.schemas import ModelPrediction
+from app.configs import settings
+from app.schemas import ModelPrediction, PredictionResult
+from app.services import glcm, metrics
+from app.services.admission import AdmissionController
+from app.services.fused_inference import affine_projection, build_fused_classifier
+from app.services.cache import TTLCache, content_hash
+from app.services.feature_executor import FeatureExecutor
+from app.services.feature_store import FeatureStore
+from app.services.image_encoding import probe_image_size, reduced_decode_flag
+from app.services.model_registry import ModelRegistry, ShadowStats
 import asyncio
+import contextlib
+import contextvars
+import logging
+import random
+import threading
 import time
 from pathlib import Path
+from typing import Dict, List, Optional, Tuple
 import cv2
 import joblib
 import numpy as np
 from skimage import measure
-from skimage.feature import graycomatrix, graycoprops
+
+logger = logging.getLogger(__name__)
 
 
 class PredictService:
@@ -14,35 +30,544 @@ class PredictService:
 
     _MODELS = {}
     _MODEL_DIR = Path(__file__).parent.parent.parent / "models"
+    _REGISTRY = ModelRegistry(_MODEL_DIR)
+    _MODEL_VERSION: Optional[str] = None
+    # Versi kandidat {"version", "models"} yang dievaluasi diam-diam (shadow)
+    _SHADOW: Optional[dict] = None
+    _SHADOW_STATS = ShadowStats()
+    _SHADOW_TASKS: set = set()
+    # Batas evaluasi shadow yang berjalan bersamaan; sampel di atasnya dilewati
+    _SHADOW_MAX_PENDING = 4
+    # Versi yang gagal dimuat tidak dicoba ulang setiap polling
+    _FAILED_VERSIONS: set = set()
+    _SWAP_LOCK: Optional[asyncio.Lock] = None
+    # Naikkan jika perubahan kode ekstraksi mengubah nilai fitur
+    _FEATURE_PIPELINE_REVISION = 1
+    _FEATURE_STORE: Optional[FeatureStore] = None
+    # Penulisan feature store di background; di atas batas ini vektor dilewati
+    _STORE_TASKS: set = set()
+    _STORE_MAX_PENDING = 64
     _IMG_SIZE = (224, 224)
     _CLAHE = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
+    _CCD_POINTS = 32
+    # Kernel morfologi mask dibuat sekali, bukan per gambar
+    _MORPH_KERNEL = np.ones((7, 7), np.uint8)
+    # Buffer kerja preprocessing lean, terpisah per thread worker executor
+    _SCRATCH = threading.local()
     _INITIALIZED = False
+    _LOAD_LOCK = threading.Lock()
+    # Artefak preprocessing yang identik antar model hanya disimpan satu kali
+    _SHARED_ARTIFACTS = ("scaler", "pca", "label_encoder")
+    _EXECUTOR = None
+    _ADMISSION = None
+    # Hasil prediksi per (hash konten, model) untuk upload ulang gambar yang sama
+    _PREDICTION_CACHE = TTLCache(
+        maxsize=settings.PREDICTION_CACHE_SIZE,
+        ttl=settings.PREDICTION_CACHE_TTL_SECONDS or None,
+    )
 
     @classmethod
     def _load_models(cls):
-        """Load model SVM dan KNN saat pertama kali digunakan"""
+        """Load model SVM dan KNN sekali (aman dipanggil bersamaan dari banyak thread)"""
         if cls._INITIALIZED:
             return
 
+        with cls._LOAD_LOCK:
+            # Cek ulang: thread lain mungkin sudah selesai memuat
+            if cls._INITIALIZED:
+                return
+            version = cls._REGISTRY.resolve_active(settings.MODEL_VERSION)
+            models = cls._read_model_artifacts(cls._REGISTRY.version_dir(version))
+            cls._CCD_POINTS = cls._model_ccd_points(models)
+            cls._MODELS, cls._MODEL_VERSION = models, version
+            cls._INITIALIZED = True
+
+    @classmethod
+    def _read_model_artifacts(cls, model_dir: Optional[Path] = None) -> dict:
+        """Membaca semua file model dan menyatukan artefak preprocessing yang sama"""
+        model_dir = model_dir or cls._MODEL_DIR
+        # copy-on-write: page file dibagi antar proses, libsvm tetap dapat buffer writable
+        mmap_mode = "c" if settings.MODEL_MMAP else None
+        models = {}
+        shared = {}
+
         for model_type in ["svm", "knn"]:
-            model_path = cls._MODEL_DIR / f"{model_type}_model.pkl"
+            model_path = model_dir / f"{model_type}_model.pkl"
 
             if not model_path.exists():
                 raise FileNotFoundError(
                     f"Model {model_type.upper()} tidak ditemukan di: {model_path}"
                 )
 
-            model_artifacts = joblib.load(model_path)
+            model_artifacts = joblib.load(model_path, mmap_mode=mmap_mode)
 
-            cls._MODELS[model_type] = {
+            entry = {
                 "model": model_artifacts["model"],
-                "scaler": model_artifacts["scaler"],
-                "pca": model_artifacts["pca"],
-                "label_encoder": model_artifacts["label_encoder"],
                 "class_names": model_artifacts["class_names"],
+                "ccd_points": cls._artifact_ccd_points(model_artifacts),
             }
+            for name in cls._SHARED_ARTIFACTS:
+                # Objek dengan isi sama (hash joblib) dipakai bersama antar model
+                key = (name, joblib.hash(model_artifacts[name]))
+                entry[name] = shared.setdefault(key, model_artifacts[name])
+
+            if settings.FUSED_INFERENCE:
+                entry["fused"] = cls._build_fused(entry)
+            models[model_type] = entry
+
+        cls._model_ccd_points(models)
+        return models
+
+    @staticmethod
+    def _model_ccd_points(models: dict) -> int:
+        """Jumlah titik CCD satu set model (harus sama untuk semua model)"""
+        # Fitur diekstraksi sekali untuk semua model, jadi resolusi CCD harus sama
+        ccd_points = {artifacts["ccd_points"] for artifacts in models.values()}
+        if len(ccd_points) != 1:
+            raise ValueError(
+                f"Semua model harus memakai jumlah titik CCD yang sama: {ccd_points}"
+            )
+        return ccd_points.pop()
+
+    @staticmethod
+    def _build_fused(entry: dict) -> Optional[dict]:
+        """Proyeksi scaler+PCA gabungan dan kernel classifier, None jika tidak didukung"""
+        classifier = build_fused_classifier(
+            entry["model"], knn_index=settings.KNN_INDEX
+        )
+        if classifier is None:
+            return None
+
+        weights, bias = affine_projection(entry["scaler"], entry["pca"])
+        return {
+            "weights": weights,
+            "bias": bias,
+            "classifier": classifier,
+            # Indeks kelas classifier -> nama label asli
+            "labels": entry["label_encoder"].classes_[entry["model"].classes_],
+        }
+
+    @classmethod
+    async def warm_up(cls):
+        """Memuat model lalu menjalankan satu prediksi pada gambar sintetis.
+
+        Dipanggil dari lifespan aplikasi agar request pertama tidak menanggung
+        biaya load model, inisialisasi OpenCV/BLAS, dan start worker executor.
+        Hasil warm-up tidak dimasukkan ke cache prediksi.
+        """
+        await asyncio.to_thread(cls._load_models)
+
+        features, _ = await cls._extract_features_async(cls._synthetic_image())
+        for model_type in cls._MODELS:
+            cls._infer(features, model_type)
+
+    @staticmethod
+    def _synthetic_image() -> bytes:
+        """JPEG kecil berisi bentuk cabai merah di latar terang untuk warm-up"""
+        img = np.full((480, 640, 3), 235, dtype=np.uint8)
+        cv2.ellipse(img, (320, 240), (220, 60), 15, 0, 360, (30, 30, 200), -1)
+        return cv2.imencode(".jpg", img)[1].tobytes()
+
+    # ==================== MODEL REGISTRY ====================
+
+    @classmethod
+    async def _load_version(cls, version: str) -> dict:
+        """Memuat satu versi di thread terpisah lalu warm-up inferensinya.
+
+        Versi dengan jumlah titik CCD berbeda ditolak: ekstraksi fitur (juga di
+        worker proses) tetap memakai resolusi CCD versi yang dimuat saat start.
+        """
+        model_dir = cls._REGISTRY.version_dir(version)
+        models = await asyncio.to_thread(cls._read_model_artifacts, model_dir)
+        ccd_points = cls._model_ccd_points(models)
+        if ccd_points != cls._CCD_POINTS:
+            raise ValueError(
+                f"Versi {version} memakai {ccd_points} titik CCD, versi berjalan "
+                f"{cls._CCD_POINTS}; butuh restart worker."
+            )
+
+        features, _ = await cls._extract_features_async(cls._synthetic_image())
+        await asyncio.to_thread(
+            cls._infer_models, features, tuple(models), None, models
+        )
+        return models
+
+    @classmethod
+    def _swap_lock(cls) -> asyncio.Lock:
+        if cls._SWAP_LOCK is None:
+            cls._SWAP_LOCK = asyncio.Lock()
+        return cls._SWAP_LOCK
+
+    @classmethod
+    async def activate_model_version(cls, version: str) -> None:
+        """Memuat `version` di background lalu menukarnya dengan versi aktif.
+
+        Request yang sedang berjalan menyelesaikan inferensinya dengan snapshot
+        model lama; request berikutnya langsung memakai versi baru. Cache
+        prediksi dikosongkan karena hasilnya milik versi lama.
+        """
+        async with cls._swap_lock():
+            await asyncio.to_thread(cls._load_models)
+            if version == cls._MODEL_VERSION:
+                return
+            models = await cls._load_version(version)
+            previous = cls._MODEL_VERSION
+            cls._MODELS, cls._MODEL_VERSION = models, version
+            cls._PREDICTION_CACHE.clear()
+            logger.info("Model versi %s aktif (sebelumnya %s).", version, previous)
+
+    @classmethod
+    async def set_shadow_version(cls, version: Optional[str]) -> None:
+        """Memasang (atau melepas, `None`) versi kandidat untuk evaluasi shadow"""
+        async with cls._swap_lock():
+            current = cls._SHADOW["version"] if cls._SHADOW else None
+            if version == current:
+                return
+            shadow = None
+            if version is not None:
+                shadow = {
+                    "version": version,
+                    "models": await cls._load_version(version),
+                }
+            cls._SHADOW = shadow
+            cls._SHADOW_STATS.reset(version)
+            logger.info("Versi shadow: %s (sebelumnya %s).", version, current)
+
+    @classmethod
+    async def sync_model_versions(cls) -> None:
+        """Menyamakan versi aktif & shadow dengan pointer registry (satu kali).
+
+        Versi yang gagal dimuat dicatat dan tidak dicoba lagi (folder versi
+        immutable); versi yang sedang berjalan tetap melayani request.
+        """
+        await asyncio.to_thread(cls._load_models)
+        await cls._apply_version(
+            cls.activate_model_version,
+            cls._REGISTRY.resolve_active(settings.MODEL_VERSION),
+        )
+
+        shadow = cls._REGISTRY.resolve_shadow(settings.MODEL_SHADOW_VERSION)
+        if shadow == cls._MODEL_VERSION:
+            # Kandidat sudah dipromosikan, tidak perlu dibandingkan dengan dirinya
+            shadow = None
+        await cls._apply_version(cls.set_shadow_version, shadow)
+
+    @classmethod
+    async def _apply_version(cls, apply, version: Optional[str]) -> None:
+        if version in cls._FAILED_VERSIONS:
+            return
+        try:
+            await apply(version)
+        except Exception:
+            cls._FAILED_VERSIONS.add(version)
+            logger.exception("Gagal memuat model versi %s.", version)
+
+    @classmethod
+    async def watch_model_registry(cls, interval: float) -> None:
+        """Polling pointer registry setiap `interval` detik (task background).
+
+        `interval` <= 0 hanya menyinkronkan sekali (mis. memasang shadow).
+        """
+        while True:
+            try:
+                await cls.sync_model_versions()
+            except Exception:
+                logger.exception("Sinkronisasi registry model gagal.")
+            if interval <= 0:
+                return
+            await asyncio.sleep(interval)
+
+    @classmethod
+    def model_info(cls) -> dict:
+        """Versi aktif, versi shadow + statistiknya, dan versi yang tersedia"""
+        return {
+            "active": cls._MODEL_VERSION,
+            "shadow": cls._SHADOW_STATS.stats() if cls._SHADOW else None,
+            "shadow_sample_rate": settings.MODEL_SHADOW_SAMPLE_RATE,
+            "available": cls._REGISTRY.versions(),
+            "failed": sorted(cls._FAILED_VERSIONS),
+        }
+
+    @classmethod
+    def _maybe_shadow(
+        cls,
+        version: Optional[str],
+        features: np.ndarray,
+        rows: List[Dict[str, ModelPrediction]],
+    ) -> None:
+        """Menjadwalkan inferensi versi shadow untuk sampel baris, tanpa ditunggu.
+
+        `version` adalah versi aktif yang menghasilkan `rows` (untuk log).
+        """
+        shadow = cls._SHADOW
+        rate = settings.MODEL_SHADOW_SAMPLE_RATE
+        if shadow is None or rate <= 0:
+            return
+        if len(cls._SHADOW_TASKS) >= cls._SHADOW_MAX_PENDING:
+            return
+        sampled = [index for index in range(len(rows)) if random.random() < rate]
+        if not sampled:
+            return
+
+        # Konteks kosong: waktu shadow tidak masuk trace/Server-Timing request
+        task = contextvars.Context().run(
+            asyncio.create_task,
+            cls._run_shadow(
+                shadow, version, features[sampled], [rows[i] for i in sampled]
+            ),
+        )
+        cls._SHADOW_TASKS.add(task)
+        task.add_done_callback(cls._SHADOW_TASKS.discard)
+
+    @classmethod
+    async def _run_shadow(
+        cls,
+        shadow: dict,
+        version: Optional[str],
+        features: np.ndarray,
+        rows: List[Dict[str, ModelPrediction]],
+    ) -> None:
+        """Membandingkan prediksi versi shadow dengan prediksi yang sudah dikirim.
+
+        Shadow menjalankan semua model yang dipakai baris mana pun (tanpa
+        kaskade); perbandingan hanya untuk baris yang punya prediksi model itu.
+        """
+        model_types = tuple(
+            model_type
+            for model_type in shadow["models"]
+            if any(model_type in row for row in rows)
+        )
+        start = time.perf_counter()
+        try:
+            shadow_rows = await asyncio.to_thread(
+                cls._infer_models,
+                features,
+                model_types,
+                None,
+                shadow["models"],
+                "shadow",
+            )
+        except Exception:
+            logger.exception("Inferensi shadow versi %s gagal.", shadow["version"])
+            return
+        if cls._SHADOW is not shadow:
+            # Shadow sudah diganti selama inferensi; statistiknya milik versi lain
+            return
+        shadow_ms = (time.perf_counter() - start) * 1000 / len(rows)
+
+        for model_type in model_types:
+            compared = agreed = 0
+            for row, shadow_row in zip(rows, shadow_rows):
+                if model_type not in row:
+                    continue
+                primary, candidate = row[model_type], shadow_row[model_type]
+                compared += 1
+                agreed += primary.label == candidate.label
+                cls._SHADOW_STATS.record(
+                    model_type,
+                    primary.label == candidate.label,
+                    abs(primary.confidence - candidate.confidence),
+                    shadow_ms,
+                )
+            logger.info(
+                "Shadow %s vs %s (%s): setuju %d/%d, %.2f ms/gambar",
+                shadow["version"],
+                version,
+                model_type,
+                agreed,
+                compared,
+                shadow_ms,
+            )
+
+    # ==================== FEATURE STORE ====================
+
+    @classmethod
+    def feature_pipeline_version(cls, ccd_points: Optional[int] = None) -> str:
+        """Versi pipeline ekstraksi: fitur dengan versi sama saling kompatibel.
+
+        Mencakup semua pengaturan yang mengubah nilai fitur (PREPROCESS_LEAN
+        tidak, karena hasilnya identik). `ccd_points` default dari model aktif.
+        """
+        mode = settings.PREPROCESS_MODE
+        if mode == "downscale":
+            mode = f"downscale{settings.PREPROCESS_MAX_SIDE}"
+        return (
+            f"r{cls._FEATURE_PIPELINE_REVISION}-{mode}"
+            f"-g{settings.GLCM_LEVELS}-c{ccd_points or cls._CCD_POINTS}"
+        )
+
+    @classmethod
+    def _get_feature_store(cls) -> Optional[FeatureStore]:
+        """Feature store sesuai FEATURE_STORE_DIR, None jika nonaktif"""
+        if cls._FEATURE_STORE is None and settings.FEATURE_STORE_DIR:
+            root = Path(settings.FEATURE_STORE_DIR)
+            if not root.is_absolute():
+                root = cls._MODEL_DIR.parent / root
+            cls._FEATURE_STORE = FeatureStore(
+                root, max_bytes=settings.FEATURE_STORE_MAX_MB * 2**20
+            )
+        return cls._FEATURE_STORE
+
+    @classmethod
+    def _schedule_feature_store(cls, keys: List[str], features: np.ndarray) -> None:
+        """Menjadwalkan penyimpanan vektor fitur tanpa ditunggu respons."""
+        if not keys or cls._get_feature_store() is None:
+            return
+        if len(cls._STORE_TASKS) >= cls._STORE_MAX_PENDING:
+            logger.warning(
+                "Penulisan feature store tertunda penuh, %d vektor dilewati.",
+                len(keys),
+            )
+            return
+
+        # Versi pipeline diambil sekarang, bukan saat task berjalan.
+        # Konteks kosong: waktu tulis tidak masuk trace/Server-Timing request
+        task = contextvars.Context().run(
+            asyncio.create_task,
+            cls._store_features(cls.feature_pipeline_version(), keys, features),
+        )
+        cls._STORE_TASKS.add(task)
+        task.add_done_callback(cls._STORE_TASKS.discard)
+
+    @classmethod
+    async def flush_feature_store(cls, timeout: Optional[float] = None) -> None:
+        """Menunggu penulisan feature store yang tertunda (saat shutdown)."""
+        if cls._STORE_TASKS:
+            await asyncio.wait(set(cls._STORE_TASKS), timeout=timeout)
+
+    @classmethod
+    async def _store_features(
+        cls, version: str, keys: List[str], features: np.ndarray
+    ) -> None:
+        """Menyimpan vektor fitur per stored filename; gagal simpan tidak fatal"""
+        store = cls._get_feature_store()
+        try:
+            with metrics.stage_timer("feature_store"):
+                await asyncio.to_thread(store.append, version, keys, features)
+        except Exception:
+            logger.exception("Gagal menyimpan vektor fitur ke feature store.")
+
+    @classmethod
+    def feature_store_stats(cls) -> Optional[dict]:
+        store = cls._get_feature_store()
+        if store is None:
+            return None
+        return {
+            "pipeline_version": cls.feature_pipeline_version(),
+            "records": store.stats(),
+        }
+
+    @classmethod
+    def _artifact_ccd_points(cls, model_artifacts: dict) -> int:
+        """Jumlah bin CCD dari artefak model (`ccd_points` atau `feature_names`)"""
+        if "ccd_points" in model_artifacts:
+            return int(model_artifacts["ccd_points"])
+        feature_names = model_artifacts.get("feature_names") or []
+        ccd_names = [name for name in feature_names if name.startswith("ccd_")]
+        return len(ccd_names) or cls._CCD_POINTS
+
+    @classmethod
+    def _get_executor(cls) -> FeatureExecutor:
+        """Executor ekstraksi fitur sesuai konfigurasi FEATURE_EXECUTOR_*"""
+        if cls._EXECUTOR is None:
+            cls._EXECUTOR = FeatureExecutor(
+                backend=settings.FEATURE_EXECUTOR_BACKEND,
+                max_workers=settings.FEATURE_EXECUTOR_WORKERS,
+                queue_size=settings.FEATURE_EXECUTOR_QUEUE_SIZE,
+                initializer=_warm_up_worker,
+            )
+        return cls._EXECUTOR
+
+    @classmethod
+    def _get_admission(cls) -> Optional[AdmissionController]:
+        """Admission controller sesuai ADMISSION_*, None jika nonaktif"""
+        if cls._ADMISSION is None and settings.ADMISSION_MAX_CONCURRENCY > 0:
+            cls._ADMISSION = AdmissionController(
+                max_concurrency=settings.ADMISSION_MAX_CONCURRENCY,
+                queue_size=settings.ADMISSION_QUEUE_SIZE,
+                queue_timeout=settings.ADMISSION_QUEUE_TIMEOUT_SECONDS,
+                target_latency=settings.ADMISSION_TARGET_LATENCY_MS / 1000,
+                min_concurrency=settings.ADMISSION_MIN_CONCURRENCY,
+            )
+        return cls._ADMISSION
+
+    @classmethod
+    def _admit(cls, cost: int):
+        """Slot admission untuk `cost` gambar (tanpa batas jika nonaktif)"""
+        admission = cls._get_admission()
+        return admission.slot(cost) if admission else contextlib.nullcontext()
+
+    @classmethod
+    def check_admission(cls, cost: int = 1) -> None:
+        """Tolak lebih awal (429/503) sebelum upload/encode dimulai"""
+        admission = cls._get_admission()
+        if admission is not None and cost > 0:
+            admission.check(cost)
+
+    @classmethod
+    def uncached_count(
+        cls,
+        image_hashes: List[str],
+        model_types,
+        cascade_threshold: Optional[float] = None,
+    ) -> int:
+        """Jumlah gambar yang belum ada di cache prediksi (biaya admission).
+
+        Gambar yang hasilnya sudah di-cache dijawab tanpa ekstraksi, jadi tidak
+        perlu ditolak saat server jenuh.
+        """
+        return sum(
+            not cls._PREDICTION_CACHE.contains(
+                cls._cache_key(image_hash, model_types, cascade_threshold)
+            )
+            for image_hash in image_hashes
+        )
+
+    @classmethod
+    async def run_in_executor(cls, func, *args):
+        """Menjalankan pekerjaan CPU lain (mis. encode gambar) di executor fitur"""
+        return await cls._get_executor().run(func, *args)
+
+    @classmethod
+    def shutdown(cls):
+        """Menutup executor ekstraksi fitur"""
+        if cls._EXECUTOR is not None:
+            cls._EXECUTOR.shutdown()
+            cls._EXECUTOR = None
+
+    @staticmethod
+    def _cache_hit(cached: PredictionResult) -> PredictionResult:
+        """Salinan hasil cache; waktu ekstraksi & inferensi 0 karena tidak dijalankan"""
+        result = cached.model_copy(deep=True)
+        result.extraction_ms = 0
+        result.cached = True
+        for prediction in result.predictions.values():
+            prediction.duration_ms = 0
+        return result
+
+    @classmethod
+    def cache_stats(cls) -> dict:
+        """Statistik cache prediksi (ukuran & hit rate)"""
+        return cls._PREDICTION_CACHE.stats()
+
+    @classmethod
+    def _decode_image(cls, image_bytes: bytes, mode: Optional[str] = None):
+        """Decode bytes gambar menjadi array BGR, None jika gagal.
+
+        Pada mode `downscale`, gambar besar langsung di-decode pada resolusi
+        1/2, 1/4, atau 1/8 (IMREAD_REDUCED_COLOR_*) selama sisi terpanjangnya
+        masih >= PREPROCESS_MAX_SIDE, sehingga frame penuh tidak pernah dibuat.
+        """
+        mode = mode or settings.PREPROCESS_MODE
+        nparr = np.frombuffer(image_bytes, np.uint8)
+
+        flag = cv2.IMREAD_COLOR
+        if mode == "downscale":
+            flag = reduced_decode_flag(
+                probe_image_size(image_bytes), settings.PREPROCESS_MAX_SIDE
+            )
 
-        cls._INITIALIZED = True
+        return cv2.imdecode(nparr, flag)
 
     # ==================== PREPROCESSING FUNCTIONS ====================
 
@@ -57,6 +582,34 @@ class PredictService:
         balanced = np.clip(balanced, 0, 255).astype(np.uint8)
         return balanced
 
+    @staticmethod
+    def _gray_world_lut(img_bgr: np.ndarray, dst: Optional[np.ndarray] = None):
+        """Gray World lewat LUT 256 level per kanal (tanpa salinan float32 frame).
+
+        Rata-rata kanal dan perkalian tetap float32 seperti
+        _gray_world_white_balance, sehingga hasilnya identik bit-per-bit.
+        """
+        avg_bgr = img_bgr.mean(axis=(0, 1), dtype=np.float32)
+        scale = avg_bgr.mean() / (avg_bgr + 1e-6)
+        levels = np.arange(256, dtype=np.float32)[:, None] * scale
+        lut = np.clip(levels, 0, 255).astype(np.uint8).reshape(256, 1, 3)
+        return cv2.LUT(img_bgr, lut, dst=dst)
+
+    @classmethod
+    def _scratch(cls, name: str, shape: Tuple[int, ...], dtype=np.uint8):
+        """Buffer kerja milik thread ini, dipakai ulang selama ukurannya sama.
+
+        Frame di atas PREPROCESS_SCRATCH_MAX_PIXELS dialokasikan biasa (tidak
+        disimpan) agar memori yang ditahan tiap worker tetap terbatas.
+        """
+        if shape[0] * shape[1] > settings.PREPROCESS_SCRATCH_MAX_PIXELS:
+            return np.empty(shape, dtype)
+        buffers = cls._SCRATCH.__dict__.setdefault("buffers", {})
+        buffer = buffers.get(name)
+        if buffer is None or buffer.shape != shape or buffer.dtype != dtype:
+            buffer = buffers[name] = np.empty(shape, dtype)
+        return buffer
+
     @staticmethod
     def _keep_largest_component(binary_mask: np.ndarray) -> np.ndarray:
         """Mempertahankan komponen terbesar dari mask biner"""
@@ -79,12 +632,45 @@ class PredictService:
         fruit_candidate = cv2.inRange(hsv_img, (0, 40, 40), (179, 255, 255))
         mask = cv2.bitwise_and(fruit_candidate, cv2.bitwise_not(background))
 
-        kernel = np.ones((7, 7), np.uint8)
+        kernel = PredictService._MORPH_KERNEL
         mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, kernel, iterations=2)
         mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, kernel, iterations=1)
         mask = PredictService._keep_largest_component(mask)
         return mask
 
+    @classmethod
+    def _build_fruit_mask_lean(cls, hsv_img: np.ndarray) -> np.ndarray:
+        """_build_fruit_mask dengan dua buffer mask bergantian (operasi `dst=`).
+
+        Komponen terbesar dicari dengan connectedComponentsWithStats (luas
+        sudah dihitung OpenCV) ke buffer label int32 yang juga dipakai ulang.
+        Hasil adalah buffer kerja: salin/resize sebelum thread ini memproses
+        gambar berikutnya.
+        """
+        shape = hsv_img.shape[:2]
+        mask = cls._scratch("mask", shape)
+        other = cls._scratch("mask_other", shape)
+
+        cv2.inRange(hsv_img, (30, 40, 0), (90, 255, 200), dst=mask)
+        cv2.inRange(hsv_img, (5, 30, 0), (25, 200, 150), dst=other)
+        cv2.bitwise_or(mask, other, dst=mask)
+        cv2.bitwise_not(mask, dst=mask)
+        cv2.inRange(hsv_img, (0, 40, 40), (179, 255, 255), dst=other)
+        cv2.bitwise_and(other, mask, dst=mask)
+
+        kernel = cls._MORPH_KERNEL
+        cv2.morphologyEx(mask, cv2.MORPH_CLOSE, kernel, dst=other, iterations=2)
+        cv2.morphologyEx(other, cv2.MORPH_OPEN, kernel, dst=mask, iterations=1)
+
+        labels = cls._scratch("labels", shape, np.int32)
+        count, labels, stats, _ = cv2.connectedComponentsWithStats(
+            mask, labels=labels, connectivity=8, ltype=cv2.CV_32S
+        )
+        if count <= 1:
+            return mask
+        largest = 1 + int(np.argmax(stats[1:, cv2.CC_STAT_AREA]))
+        return cv2.compare(labels, largest, cv2.CMP_EQ, dst=other)
+
     @staticmethod
     def _mask_aware_crop(img: np.ndarray, mask: np.ndarray, pad_ratio: float = 0.05):
         """Crop gambar berdasarkan mask dengan padding"""
@@ -92,8 +678,26 @@ class PredictService:
         if len(xs) == 0 or len(ys) == 0:
             fallback_mask = np.ones(img.shape[:2], dtype=np.uint8) * 255
             return img.copy(), fallback_mask
-        x_min, x_max = xs.min(), xs.max()
-        y_min, y_max = ys.min(), ys.max()
+        return PredictService._pad_crop(
+            img, mask, (xs.min(), xs.max(), ys.min(), ys.max()), pad_ratio
+        )
+
+    @staticmethod
+    def _mask_aware_crop_lean(img: np.ndarray, mask: np.ndarray, pad_ratio=0.05):
+        """_mask_aware_crop dengan cv2.boundingRect (tanpa array koordinat).
+
+        Crop berupa view; fallback tanpa salinan frame karena hanya di-resize.
+        """
+        x, y, width, height = cv2.boundingRect(mask)
+        if width == 0 or height == 0:
+            return img, np.full(img.shape[:2], 255, dtype=np.uint8)
+        bounds = (x, x + width - 1, y, y + height - 1)
+        return PredictService._pad_crop(img, mask, bounds, pad_ratio)
+
+    @staticmethod
+    def _pad_crop(img: np.ndarray, mask: np.ndarray, bounds, pad_ratio: float):
+        """Crop (x_min, x_max, y_min, y_max) inklusif ditambah padding"""
+        x_min, x_max, y_min, y_max = bounds
         h, w = img.shape[:2]
         pad_x = int((x_max - x_min) * pad_ratio)
         pad_y = int((y_max - y_min) * pad_ratio)
@@ -105,35 +709,107 @@ class PredictService:
         cropped_mask = mask[y_min:y_max, x_min:x_max]
         return cropped_img, cropped_mask
 
+    @staticmethod
+    def _downscale_to_working(img_bgr: np.ndarray, max_side: int) -> np.ndarray:
+        """Memperkecil gambar (INTER_AREA) agar sisi terpanjang <= max_side"""
+        h, w = img_bgr.shape[:2]
+        scale = max_side / max(h, w)
+        if scale >= 1:
+            return img_bgr
+        working_size = (max(1, round(w * scale)), max(1, round(h * scale)))
+        return cv2.resize(img_bgr, working_size, interpolation=cv2.INTER_AREA)
+
     @classmethod
-    def _preprocess_image(cls, img_bgr: np.ndarray) -> dict:
-        """Preprocessing lengkap untuk gambar input"""
-        wb = cls._gray_world_white_balance(img_bgr)
-        denoised = cv2.bilateralFilter(wb, d=9, sigmaColor=75, sigmaSpace=75)
+    def _preprocess_image(
+        cls,
+        img_bgr: np.ndarray,
+        mode: Optional[str] = None,
+        timings: Optional[Dict[str, float]] = None,
+        lean: Optional[bool] = None,
+    ) -> dict:
+        """Preprocessing lengkap untuk gambar input
 
-        hsv = cv2.cvtColor(denoised, cv2.COLOR_BGR2HSV)
-        mask = cls._build_fruit_mask(hsv)
+        Mode `full` (default) memproses frame pada resolusi asli. Mode
+        `downscale` lebih dulu memperkecil frame ke PREPROCESS_MAX_SIDE sehingga
+        white balance, bilateral filter, mask, dan bounding box crop dihitung
+        pada resolusi kerja; crop tetap diambil dari frame kerja tersebut karena
+        hasil akhirnya hanya _IMG_SIZE.
 
-        cropped_bgr, cropped_mask = cls._mask_aware_crop(denoised, mask)
-        resized_bgr = cv2.resize(cropped_bgr, cls._IMG_SIZE)
-        resized_mask = cv2.resize(
-            cropped_mask, cls._IMG_SIZE, interpolation=cv2.INTER_NEAREST
-        )
+        `lean` (default PREPROCESS_LEAN) memakai _denoise_and_mask_lean: hasil
+        identik, tetapi frame kerja tidak dialokasikan ulang per gambar.
+
+        Jika `timings` diisi, durasi tiap tahap (detik) ditambahkan ke dict itu.
+        """
+        mode = mode or settings.PREPROCESS_MODE
+        if mode == "downscale":
+            with metrics.timed(timings, "downscale"):
+                img_bgr = cls._downscale_to_working(
+                    img_bgr, settings.PREPROCESS_MAX_SIDE
+                )
+
+        lean = settings.PREPROCESS_LEAN if lean is None else lean
+        if lean:
+            denoised, mask = cls._denoise_and_mask_lean(img_bgr, timings)
+        else:
+            with metrics.timed(timings, "white_balance"):
+                wb = cls._gray_world_white_balance(img_bgr)
+            with metrics.timed(timings, "bilateral_filter"):
+                denoised = cv2.bilateralFilter(wb, d=9, sigmaColor=75, sigmaSpace=75)
+
+            with metrics.timed(timings, "mask"):
+                hsv = cv2.cvtColor(denoised, cv2.COLOR_BGR2HSV)
+                mask = cls._build_fruit_mask(hsv)
 
-        hsv_resized = cv2.cvtColor(resized_bgr, cv2.COLOR_BGR2HSV)
-        hsv_resized[:, :, 2] = cls._CLAHE.apply(hsv_resized[:, :, 2])
-        enhanced_bgr = cv2.cvtColor(hsv_resized, cv2.COLOR_HSV2BGR)
+        with metrics.timed(timings, "crop_resize"):
+            crop = cls._mask_aware_crop_lean if lean else cls._mask_aware_crop
+            cropped_bgr, cropped_mask = crop(denoised, mask)
+            resized_bgr = cv2.resize(cropped_bgr, cls._IMG_SIZE)
+            resized_mask = cv2.resize(
+                cropped_mask, cls._IMG_SIZE, interpolation=cv2.INTER_NEAREST
+            )
 
-        gray = cv2.cvtColor(enhanced_bgr, cv2.COLOR_BGR2GRAY)
-        gray_equalized = cv2.equalizeHist(gray)
+        with metrics.timed(timings, "clahe"):
+            hsv_resized = cv2.cvtColor(resized_bgr, cv2.COLOR_BGR2HSV)
+            hsv_resized[:, :, 2] = cls._CLAHE.apply(hsv_resized[:, :, 2])
+            enhanced_bgr = cv2.cvtColor(hsv_resized, cv2.COLOR_HSV2BGR)
+
+            gray = cv2.cvtColor(enhanced_bgr, cv2.COLOR_BGR2GRAY)
 
         return {
             "mask": resized_mask,
             "enhanced": enhanced_bgr,
             "hsv": hsv_resized,
-            "gray_equalized": gray_equalized,
+            "gray": gray,
         }
 
+    @classmethod
+    def _denoise_and_mask_lean(
+        cls, img_bgr: np.ndarray, timings: Optional[Dict[str, float]] = None
+    ):
+        """White balance, bilateral filter, dan mask dengan buffer kerja per thread.
+
+        Frame kerja hanya memakai dua buffer BGR (hasil white balance lalu
+        ditimpa HSV, dan hasil bilateral filter), dua buffer mask, dan satu
+        buffer label. (denoised, mask) yang dikembalikan adalah buffer kerja.
+        """
+        shape = img_bgr.shape
+        with metrics.timed(timings, "white_balance"):
+            wb = cls._gray_world_lut(img_bgr, dst=cls._scratch("bgr", shape))
+        with metrics.timed(timings, "bilateral_filter"):
+            denoised = cv2.bilateralFilter(
+                wb,
+                d=9,
+                sigmaColor=75,
+                sigmaSpace=75,
+                dst=cls._scratch("denoised", shape),
+            )
+
+        with metrics.timed(timings, "mask"):
+            # Hasil white balance tidak dipakai lagi: buffernya diisi HSV
+            hsv = cv2.cvtColor(denoised, cv2.COLOR_BGR2HSV, dst=wb)
+            mask = cls._build_fruit_mask_lean(hsv)
+        return denoised, mask
+
     # ==================== FEATURE EXTRACTION FUNCTIONS ====================
 
     @staticmethod
@@ -166,63 +842,117 @@ class PredictService:
         radii = np.linalg.norm(vectors, axis=1)
         angles = (np.arctan2(vectors[:, 1], vectors[:, 0]) + 2 * np.pi) % (2 * np.pi)
 
+        # Binned-max tervektorisasi: searchsorted memakai batas bin yang sama
+        # (bins[i] <= sudut < bins[i + 1]), lalu maksimum radius per bin
+        # dikumpulkan sekali jalan dengan np.maximum.at
         bins = np.linspace(0, 2 * np.pi, num_points + 1)
-        descriptor = np.zeros(num_points, dtype=np.float32)
-        for i in range(num_points):
-            mask_angle = (angles >= bins[i]) & (angles < bins[i + 1])
-            if np.any(mask_angle):
-                descriptor[i] = radii[mask_angle].max()
+        bin_index = np.searchsorted(bins, angles, side="right") - 1
+        in_range = (bin_index >= 0) & (bin_index < num_points)
+        max_radii = np.zeros(num_points, dtype=np.float64)
+        np.maximum.at(max_radii, bin_index[in_range], radii[in_range])
+        descriptor = max_radii.astype(np.float32)
         if descriptor.max() > 0:
             descriptor /= descriptor.max()
         return descriptor
 
     @staticmethod
     def _extract_glcm_features(gray_img: np.ndarray, mask: np.ndarray) -> np.ndarray:
-        """Ekstraksi fitur Gray Level Co-occurrence Matrix"""
+        """Ekstraksi fitur Gray Level Co-occurrence Matrix
+
+        GLCM_LEVELS=256 (default) identik bit-per-bit dengan skimage
+        graycomatrix/graycoprops; level lain butuh model yang dilatih ulang.
+        """
         masked = cv2.bitwise_and(gray_img, gray_img, mask=mask)
-        glcm = graycomatrix(
-            masked,
-            distances=[1, 2, 3],
-            angles=[0, np.pi / 4, np.pi / 2, 3 * np.pi / 4],
-            levels=256,
-            symmetric=True,
-            normed=True,
-        )
-        props = []
-        for prop in ("contrast", "correlation", "energy", "homogeneity"):
-            props.extend(graycoprops(glcm, prop).flatten())
-        return np.array(props, dtype=np.float32)
+        return glcm.glcm_features(masked, levels=settings.GLCM_LEVELS)
 
     @classmethod
-    def _extract_features(cls, img_bgr: np.ndarray) -> np.ndarray:
+    def _extract_features(
+        cls,
+        img_bgr: np.ndarray,
+        mode: Optional[str] = None,
+        timings: Optional[Dict[str, float]] = None,
+    ) -> np.ndarray:
         """Ekstraksi semua fitur dari gambar"""
-        processed = cls._preprocess_image(img_bgr)
-        hsv_feat = cls._extract_hsv_features(processed["hsv"])
-        gray = cv2.cvtColor(processed["enhanced"], cv2.COLOR_BGR2GRAY)
-        glcm_feat = cls._extract_glcm_features(gray, processed["mask"])
-        ccd_feat = cls._extract_ccd_features(processed["mask"])
+        processed = cls._preprocess_image(img_bgr, mode, timings)
+        with metrics.timed(timings, "hsv_features"):
+            hsv_feat = cls._extract_hsv_features(processed["hsv"])
+        with metrics.timed(timings, "glcm"):
+            glcm_feat = cls._extract_glcm_features(processed["gray"], processed["mask"])
+        with metrics.timed(timings, "ccd"):
+            ccd_feat = cls._extract_ccd_features(processed["mask"], cls._CCD_POINTS)
         return np.concatenate([hsv_feat, ccd_feat, glcm_feat])
 
     # ==================== PREDICTION FUNCTIONS ====================
 
     @classmethod
-    async def _predict_with_model(
-        cls, img_bgr: np.ndarray, model_type: str
-    ) -> ModelPrediction:
-        """Melakukan prediksi menggunakan model tertentu (svm atau knn)"""
-        # Load models jika belum
-        cls._load_models()
+    async def _extract_features_async(cls, image_bytes: bytes):
+        """Decode + ekstraksi fitur di executor, mengembalikan (fitur 1xN, durasi ms)
 
+        Hanya bytes gambar yang dikirim ke executor dan hanya vektor fitur (plus
+        timing per tahap) yang kembali, sehingga aman untuk backend thread maupun
+        process. Selisih durasi total dengan kerja worker dicatat sebagai
+        `executor_wait` (antre + transfer).
+        """
         start = time.perf_counter()
 
-        # Ekstraksi fitur (operasi CPU-heavy, jadi kita run di thread pool)
-        loop = asyncio.get_event_loop()
-        features = await loop.run_in_executor(None, cls._extract_features, img_bgr)
-        features = features.reshape(1, -1)
+        # Ekstraksi fitur (operasi CPU-heavy, jadi kita run di executor)
+        features, timings = await cls._get_executor().run(
+            _extract_features_from_bytes, image_bytes
+        )
+
+        elapsed = time.perf_counter() - start
+        timings["executor_wait"] = max(0.0, elapsed - sum(timings.values()))
+        metrics.record_stages(timings)
+
+        extraction_ms = int(elapsed * 1000)
+        return features.reshape(1, -1), extraction_ms
+
+    @classmethod
+    def _infer_batch(
+        cls,
+        features: np.ndarray,
+        model_type: str,
+        models: Optional[dict] = None,
+        stage: str = "inference",
+    ) -> List[ModelPrediction]:
+        """Menjalankan scaler, PCA, dan classifier sekali untuk matriks fitur NxD.
+
+        `models` (default versi aktif) memungkinkan inferensi versi lain, mis.
+        shadow. `duration_ms` tiap hasil adalah waktu inferensi batch dibagi
+        jumlah baris.
+        """
+        start = time.perf_counter()
 
         # Get model artifacts
-        artifacts = cls._MODELS[model_type]
+        artifacts = (models or cls._MODELS)[model_type]
 
+        fused = artifacts.get("fused")
+        if fused is not None:
+            # Satu matmul (scaler+PCA) lalu satu evaluasi classifier
+            projected = features @ fused["weights"] + fused["bias"]
+            class_indices, proba = fused["classifier"].predict(projected)
+            predicted_classes = fused["labels"][class_indices]
+            confidences = proba.max(axis=1)
+        else:
+            predicted_classes, confidences = cls._infer_sklearn(features, artifacts)
+
+        elapsed = time.perf_counter() - start
+        metrics.record_stage(f"{stage}_{model_type}", elapsed)
+        duration_ms = int(elapsed * 1000 / len(features))
+
+        return [
+            ModelPrediction(
+                model=model_type.upper(),
+                label=predicted_class,
+                confidence=round(float(confidence), 3),
+                duration_ms=duration_ms,
+            )
+            for predicted_class, confidence in zip(predicted_classes, confidences)
+        ]
+
+    @staticmethod
+    def _infer_sklearn(features: np.ndarray, artifacts: dict):
+        """Jalur scikit-learn asli: scaler, PCA, predict, predict_proba"""
         # Scaling
         features_scaled = artifacts["scaler"].transform(features)
 
@@ -230,31 +960,238 @@ class PredictService:
         features_pca = artifacts["pca"].transform(features_scaled)
 
         # Prediksi
-        prediction = artifacts["model"].predict(features_pca)[0]
-        predicted_class = artifacts["label_encoder"].inverse_transform([prediction])[0]
+        predictions = artifacts["model"].predict(features_pca)
+        predicted_classes = artifacts["label_encoder"].inverse_transform(predictions)
 
         # Probabilitas (jika model support)
         if hasattr(artifacts["model"], "predict_proba"):
-            proba = artifacts["model"].predict_proba(features_pca)[0]
-            confidence = float(proba.max())
+            proba = artifacts["model"].predict_proba(features_pca)
+            confidences = proba.max(axis=1).astype(float)
         else:
-            confidence = 1.0
+            confidences = np.ones(len(features), dtype=float)
+
+        return predicted_classes, confidences
+
+    @classmethod
+    def _infer(cls, features: np.ndarray, model_type: str) -> ModelPrediction:
+        """Menjalankan scaler, PCA, dan classifier pada vektor fitur yang sudah ada"""
+        return cls._infer_batch(features, model_type)[0]
+
+    @classmethod
+    async def _predict_with_model(
+        cls, image_bytes: bytes, model_type: str
+    ) -> ModelPrediction:
+        """Melakukan prediksi menggunakan model tertentu (svm atau knn)"""
+        # Load models jika belum
+        cls._load_models()
+
+        async with cls._admit(1):
+            features, extraction_ms = await cls._extract_features_async(image_bytes)
+            prediction = cls._infer(features, model_type)
+
+        # Untuk prediksi satu model, durasi mencakup ekstraksi + inferensi
+        prediction.duration_ms += extraction_ms
+        return prediction
+
+    @classmethod
+    def _infer_models(
+        cls,
+        features: np.ndarray,
+        model_types: Tuple[str, ...],
+        cascade_threshold: Optional[float] = None,
+        models: Optional[dict] = None,
+        stage: str = "inference",
+    ) -> List[Dict[str, ModelPrediction]]:
+        """Inferensi NxD untuk beberapa model, opsional secara kaskade.
+
+        Tanpa `cascade_threshold` semua model dijalankan untuk semua baris.
+        Dengan kaskade, model dijalankan sesuai urutan `model_types` dan baris
+        yang confidence-nya sudah >= threshold tidak diteruskan ke model
+        berikutnya. Mengembalikan dict model -> prediksi per baris.
+
+        `models` dibaca sekali di awal sehingga semua model satu request berasal
+        dari versi yang sama walau terjadi swap di tengah jalan.
+        """
+        models = models or cls._MODELS
+        rows: List[Dict[str, ModelPrediction]] = [{} for _ in range(len(features))]
+        pending = list(range(len(features)))
+
+        for model_type in model_types:
+            predictions = cls._infer_batch(features[pending], model_type, models, stage)
+            for index, prediction in zip(pending, predictions):
+                rows[index][model_type] = prediction
+
+            if cascade_threshold is not None:
+                pending = [
+                    index
+                    for index in pending
+                    if rows[index][model_type].confidence < cascade_threshold
+                ]
+                if not pending:
+                    break
+
+        return rows
+
+    @classmethod
+    async def predict_all(
+        cls,
+        image_bytes: bytes,
+        model_types=("knn", "svm"),
+        image_hash: Optional[str] = None,
+        cascade_threshold: Optional[float] = None,
+        feature_key: Optional[str] = None,
+    ) -> PredictionResult:
+        """Ekstraksi fitur sekali lalu prediksi dengan model yang diminta.
 
-        duration_ms = int((time.perf_counter() - start) * 1000)
+        `duration_ms` tiap model hanya berisi waktu inferensi, sedangkan waktu
+        ekstraksi dilaporkan terpisah di `extraction_ms`. Gambar dengan isi yang
+        sama (hash SHA-256) langsung dijawab dari cache prediksi. Dengan
+        `cascade_threshold`, model berikutnya hanya dijalankan jika confidence
+        model sebelumnya di bawah threshold (lihat `_infer_models`). Sebagian
+        request (MODEL_SHADOW_SAMPLE_RATE) juga dievaluasi dengan versi shadow
+        di background. Jika `feature_key` (stored filename) diisi, vektor fitur
+        disimpan ke feature store untuk skoring ulang.
+        """
+        image_hash = image_hash or content_hash(image_bytes)
+        cached = cls._PREDICTION_CACHE.get(
+            cls._cache_key(image_hash, model_types, cascade_threshold)
+        )
+        if cached is not None:
+            return cls._cache_hit(cached)
+
+        cls._load_models()
+
+        async with cls._admit(1):
+            features, extraction_ms = await cls._extract_features_async(image_bytes)
+            # Snapshot versi aktif: swap di tengah request tidak mencampur versi
+            version, models = cls._MODEL_VERSION, cls._MODELS
+            rows = cls._infer_models(
+                features, tuple(model_types), cascade_threshold, models
+            )
 
-        return ModelPrediction(
-            model=model_type.upper(),
-            label=predicted_class,
-            confidence=round(confidence, 3),
-            duration_ms=duration_ms,
+        cls._maybe_shadow(version, features, rows)
+        if feature_key:
+            cls._schedule_feature_store([feature_key], features)
+        result = PredictionResult(predictions=rows[0], extraction_ms=extraction_ms)
+        cls._PREDICTION_CACHE.set(
+            cls._cache_key(image_hash, model_types, cascade_threshold, version),
+            result.model_copy(deep=True),
+        )
+        return result
+
+    @classmethod
+    def _cache_key(
+        cls,
+        image_hash: str,
+        model_types,
+        cascade_threshold: Optional[float],
+        version: Optional[str] = None,
+    ) -> tuple:
+        """Key cache prediksi; versi model ikut agar hasil versi lama tidak terpakai"""
+        return (
+            image_hash,
+            tuple(model_types),
+            cascade_threshold,
+            version or cls._MODEL_VERSION,
         )
 
     @classmethod
-    async def predict_knn(cls, img_bgr: np.ndarray) -> ModelPrediction:
+    async def predict_batch(
+        cls,
+        images_bytes: List[bytes],
+        model_types=("knn", "svm"),
+        image_hashes: Optional[List[str]] = None,
+        cascade_threshold: Optional[float] = None,
+        feature_keys: Optional[List[str]] = None,
+    ) -> List[PredictionResult]:
+        """Prediksi banyak gambar sekaligus.
+
+        Gambar yang hasilnya sudah ada di cache (hash konten) dilewati. Sisanya
+        diekstraksi paralel per gambar, lalu fitur ditumpuk menjadi satu matriks
+        sehingga scaler, PCA, dan classifier hanya dipanggil sekali per model
+        (pada kaskade: hanya untuk baris yang masih di bawah threshold).
+        """
+        if image_hashes is None:
+            image_hashes = [content_hash(image_bytes) for image_bytes in images_bytes]
+
+        results: List[Optional[PredictionResult]] = []
+        for image_hash in image_hashes:
+            cached = cls._PREDICTION_CACHE.get(
+                cls._cache_key(image_hash, model_types, cascade_threshold)
+            )
+            results.append(cls._cache_hit(cached) if cached else None)
+
+        # Hanya gambar yang belum ada di cache yang diekstraksi & diinferensi
+        pending = [index for index, result in enumerate(results) if result is None]
+        if not pending:
+            return results
+
+        cls._load_models()
+
+        async with cls._admit(len(pending)):
+            extracted = await asyncio.gather(
+                *(cls._extract_features_async(images_bytes[index]) for index in pending)
+            )
+            features = np.vstack([item[0] for item in extracted])
+
+            version, models = cls._MODEL_VERSION, cls._MODELS
+            batch_predictions = cls._infer_models(
+                features, tuple(model_types), cascade_threshold, models
+            )
+
+        cls._maybe_shadow(version, features, batch_predictions)
+        if feature_keys:
+            cls._schedule_feature_store(
+                [feature_keys[index] for index in pending], features
+            )
+        for index, predictions, (_, extraction_ms) in zip(
+            pending, batch_predictions, extracted
+        ):
+            result = PredictionResult(
+                predictions=predictions, extraction_ms=extraction_ms
+            )
+            cache_key = cls._cache_key(
+                image_hashes[index], model_types, cascade_threshold, version
+            )
+            cls._PREDICTION_CACHE.set(cache_key, result.model_copy(deep=True))
+            results[index] = result
+
+        return results
+
+    @classmethod
+    async def predict_knn(cls, image_bytes: bytes) -> ModelPrediction:
         """Prediksi menggunakan model KNN"""
-        return await cls._predict_with_model(img_bgr, "knn")
+        return await cls._predict_with_model(image_bytes, "knn")
 
     @classmethod
-    async def predict_svm(cls, img_bgr: np.ndarray) -> ModelPrediction:
+    async def predict_svm(cls, image_bytes: bytes) -> ModelPrediction:
         """Prediksi menggunakan model SVM"""
-        return await cls._predict_with_model(img_bgr, "svm")
+        return await cls._predict_with_model(image_bytes, "svm")
+
+
+# ==================== EXECUTOR WORKER FUNCTIONS ====================
+# Fungsi level modul agar bisa di-pickle oleh ProcessPoolExecutor.
+
+
+def _warm_up_worker():
+    """Initializer proses worker: batasi thread OpenCV lalu muat model & CLAHE"""
+    cv2.setNumThreads(1)
+    PredictService._load_models()
+
+
+def _extract_features_from_bytes(
+    image_bytes: bytes,
+) -> Tuple[np.ndarray, Dict[str, float]]:
+    """Decode bytes gambar lalu ekstraksi fitur di dalam worker.
+
+    Mengembalikan (fitur, timing per tahap dalam detik); timing dicatat ke
+    metrik oleh pemanggil di proses utama.
+    """
+    timings: Dict[str, float] = {}
+    with metrics.timed(timings, "decode"):
+        img_bgr = PredictService._decode_image(image_bytes)
+    if img_bgr is None:
+        raise ValueError(
+            "Gagal membaca gambar. Pastikan file adalah gambar yang valid."
+        )
+    return PredictService._extract_features(img_bgr, timings=timings), timings
@@ -0,0 +1,355 @@
+# app/services/prediction_jobs.py
+"""Job prediksi asinkron: antrean pluggable, worker pool, polling & webhook.
+
+`POST /predict/jobs` hanya memvalidasi upload lalu memasukkan job ke antrean
+sehingga koneksi HTTP langsung dilepas. Worker di event loop yang sama
+menjalankan handler (prediksi + upload + insert riwayat), menyimpan hasilnya
+untuk `GET /predict/jobs/{id}`, dan mengirim webhook jika `callback_url` diisi.
+
+Penyimpanan job & antrean dipisah lewat `JobBackend` agar backend lain (mis.
+Redis) bisa ditambahkan tanpa mengubah runner. Record job harus berupa dict
+yang bisa diserialisasi JSON; bytes gambar dikirim terpisah sebagai payload.
+"""
+
+import asyncio
+import contextvars
+import hashlib
+import hmac
+import ipaddress
+import json
+import logging
+import socket
+import uuid
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, List, Optional, Tuple, Union
+from urllib.parse import urlparse
+
+import httpx
+
+from app.configs import settings
+from app.services.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+JOB_STATUSES = ("queued", "running", "succeeded", "failed")
+
+# handler(job, payload) -> hasil (dict JSON) untuk job yang berhasil
+JobHandler = Callable[[dict, bytes], Awaitable[dict]]
+
+
+class JobQueueFull(Exception):
+    """Antrean job penuh; job baru harus ditolak (429)."""
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class JobBackend(ABC):
+    """Antrean job + penyimpanan status. Implementasi harus aman untuk asyncio."""
+
+    @abstractmethod
+    async def enqueue(self, job: dict, payload: bytes) -> None:
+        """Menyimpan record lalu mengantrekan job; JobQueueFull jika penuh."""
+
+    @abstractmethod
+    async def dequeue(self) -> Tuple[dict, bytes]:
+        """Menunggu job berikutnya (record terbaru + payload)."""
+
+    @abstractmethod
+    async def save(self, job: dict) -> None:
+        """Menyimpan perubahan status/hasil job."""
+
+    @abstractmethod
+    async def load(self, job_id: str) -> Optional[dict]:
+        """Record job, None jika tidak ada atau sudah kedaluwarsa."""
+
+    @abstractmethod
+    def qsize(self) -> int:
+        """Jumlah job yang belum diambil worker."""
+
+
+class InMemoryJobBackend(JobBackend):
+    """Backend lokal satu proses: asyncio.Queue terbatas + TTLCache hasil.
+
+    Cocok untuk satu worker uvicorn dan untuk pengujian; job & hasil hilang
+    saat proses berhenti dan tidak terlihat dari worker lain.
+    """
+
+    def __init__(self, maxsize: int, result_ttl: float, max_records: int = 10000):
+        self.maxsize = max(1, maxsize)
+        self._queue: Optional[asyncio.Queue] = None
+        self._records = TTLCache(maxsize=max_records, ttl=result_ttl or None)
+
+    def _get_queue(self) -> asyncio.Queue:
+        # Dibuat saat pertama dipakai agar terikat ke event loop aplikasi
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.maxsize)
+        return self._queue
+
+    async def enqueue(self, job: dict, payload: bytes) -> None:
+        try:
+            self._get_queue().put_nowait((job["id"], payload))
+        except asyncio.QueueFull:
+            raise JobQueueFull()
+        self._records.set(job["id"], dict(job))
+
+    async def dequeue(self) -> Tuple[dict, bytes]:
+        while True:
+            job_id, payload = await self._get_queue().get()
+            job = self._records.get(job_id)
+            if job is not None:
+                return dict(job), payload
+
+    async def save(self, job: dict) -> None:
+        self._records.set(job["id"], dict(job))
+
+    async def load(self, job_id: str) -> Optional[dict]:
+        job = self._records.get(job_id)
+        return dict(job) if job is not None else None
+
+    def qsize(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+
+JOB_BACKENDS = ("memory",)
+
+
+def create_backend(name: str) -> JobBackend:
+    """Backend job sesuai JOB_BACKEND (saat ini hanya `memory`)."""
+    if name == "memory":
+        return InMemoryJobBackend(
+            maxsize=settings.JOB_QUEUE_SIZE,
+            result_ttl=settings.JOB_RESULT_TTL_SECONDS,
+        )
+    raise ValueError(
+        f"JOB_BACKEND '{name}' tidak dikenal, pilih salah satu: "
+        f"{', '.join(JOB_BACKENDS)}"
+    )
+
+
+def validate_callback_url(url: str, allowed_hosts: Tuple[str, ...] = ()) -> None:
+    """ValueError jika URL webhook tidak boleh dipanggil server.
+
+    Hanya http(s) dengan host yang ada di `allowed_hosts`. Tanpa allowlist
+    webhook ditolak, karena server tidak boleh dipakai memanggil alamat
+    sembarang atas nama user (SSRF).
+    """
+    if not allowed_hosts:
+        raise ValueError(
+            "callback_url tidak diaktifkan di server (JOB_CALLBACK_ALLOWED_HOSTS)."
+        )
+    parsed = urlparse(url)
+    if parsed.scheme not in ("http", "https") or not parsed.hostname:
+        raise ValueError("callback_url harus URL http(s) yang valid.")
+    if parsed.hostname not in allowed_hosts:
+        raise ValueError(f"Host callback '{parsed.hostname}' tidak diizinkan.")
+
+
+async def resolve_callback_address(
+    url: str,
+) -> Union[ipaddress.IPv4Address, ipaddress.IPv6Address]:
+    """Alamat IP publik tujuan webhook; ValueError jika ada yang internal.
+
+    Semua hasil DNS harus alamat global (bukan loopback, privat, link-local,
+    reserved, atau multicast). Dipanggil saat submit dan lagi sebelum setiap
+    pengiriman; koneksi lalu dipaku ke IP ini sehingga DNS rebinding di antara
+    pengecekan dan koneksi tidak berpengaruh. OSError jika DNS gagal.
+    """
+    parsed = urlparse(url)
+    port = parsed.port or (443 if parsed.scheme == "https" else 80)
+    infos = await asyncio.get_running_loop().getaddrinfo(
+        parsed.hostname, port, type=socket.SOCK_STREAM
+    )
+    addresses = []
+    for info in infos:
+        address = ipaddress.ip_address(info[4][0])
+        if address.version == 6 and address.ipv4_mapped:
+            address = address.ipv4_mapped
+        if not address.is_global or address.is_multicast:
+            raise ValueError(
+                f"Host callback '{parsed.hostname}' mengarah ke alamat internal."
+            )
+        addresses.append(address)
+    if not addresses:
+        raise OSError(f"Host callback '{parsed.hostname}' tidak dapat di-resolve.")
+    return addresses[0]
+
+
+class PredictionJobRunner:
+    """Worker pool asyncio yang memproses job dari `JobBackend`."""
+
+    def __init__(
+        self,
+        backend: JobBackend,
+        handler: JobHandler,
+        workers: int,
+        callback_timeout: float = 10.0,
+        callback_retries: int = 3,
+        callback_secret: str = "",
+        callback_hosts: Tuple[str, ...] = (),
+    ):
+        self.backend = backend
+        self.handler = handler
+        self.workers = max(1, workers)
+        self.callback_timeout = callback_timeout
+        self.callback_retries = max(0, callback_retries)
+        self.callback_secret = callback_secret
+        self.callback_hosts = callback_hosts
+        self.running = 0
+        self.failed = 0
+        self._tasks: List[asyncio.Task] = []
+        self._http_client: Optional[httpx.AsyncClient] = None
+
+    def start(self) -> None:
+        """Menjalankan worker di event loop aktif (otomatis saat submit pertama)."""
+        if self._tasks:
+            return
+        # Konteks kosong: worker tidak mewarisi contextvar (trace) request pemicu
+        self._tasks = [
+            contextvars.Context().run(
+                asyncio.create_task, self._worker(), name=f"prediction-job-{index}"
+            )
+            for index in range(self.workers)
+        ]
+
+    async def submit(
+        self,
+        user_id: str,
+        payload: bytes,
+        params: dict,
+        callback_url: Optional[str] = None,
+    ) -> dict:
+        """Membuat job baru berstatus `queued`; JobQueueFull jika antrean penuh."""
+        if callback_url:
+            validate_callback_url(callback_url, self.callback_hosts)
+            try:
+                await resolve_callback_address(callback_url)
+            except OSError:
+                raise ValueError("Host callback_url tidak dapat di-resolve.")
+
+        self.start()
+        now = _now()
+        job = {
+            "id": str(uuid.uuid4()),
+            "status": "queued",
+            "user_id": user_id,
+            "params": params,
+            "callback_url": callback_url,
+            "created_at": now,
+            "updated_at": now,
+            "result": None,
+            "error": None,
+        }
+        await self.backend.enqueue(job, payload)
+        return job
+
+    async def get(self, job_id: str) -> Optional[dict]:
+        return await self.backend.load(job_id)
+
+    def qsize(self) -> int:
+        return self.backend.qsize()
+
+    async def _update(self, job: dict, **fields) -> None:
+        job.update(fields, updated_at=_now())
+        await self.backend.save(job)
+
+    async def _worker(self) -> None:
+        while True:
+            job, payload = await self.backend.dequeue()
+            self.running += 1
+            try:
+                await self._process(job, payload)
+            finally:
+                self.running -= 1
+
+    async def _process(self, job: dict, payload: bytes) -> None:
+        await self._update(job, status="running")
+        try:
+            result = await self.handler(job, payload)
+        except Exception as exc:
+            self.failed += 1
+            detail = getattr(exc, "detail", None) or str(exc)
+            logger.warning("Job prediksi %s gagal: %s", job["id"], detail)
+            await self._update(job, status="failed", error=str(detail))
+        else:
+            await self._update(job, status="succeeded", result=result)
+
+        if job.get("callback_url"):
+            await self._deliver_callback(job)
+
+    def _get_http_client(self) -> httpx.AsyncClient:
+        if self._http_client is None or self._http_client.is_closed:
+            # Redirect tidak diikuti: tujuan akhir harus lolos pengecekan alamat
+            self._http_client = httpx.AsyncClient(
+                timeout=self.callback_timeout, follow_redirects=False
+            )
+        return self._http_client
+
+    async def _deliver_callback(self, job: dict) -> None:
+        """POST status akhir job ke callback_url (retry dengan backoff)."""
+        body = json.dumps(public_job(job)).encode()
+        headers = {"Content-Type": "application/json"}
+        if self.callback_secret:
+            signature = hmac.new(
+                self.callback_secret.encode(), body, hashlib.sha256
+            ).hexdigest()
+            headers["X-Signature-SHA256"] = signature
+
+        url = httpx.URL(job["callback_url"])
+        for attempt in range(self.callback_retries + 1):
+            try:
+                address = await resolve_callback_address(job["callback_url"])
+                # Koneksi ke IP yang sudah dicek; Host & SNI tetap nama aslinya
+                response = await self._get_http_client().post(
+                    url.copy_with(host=str(address)),
+                    content=body,
+                    headers={**headers, "Host": url.netloc.decode("ascii")},
+                    extensions={"sni_hostname": url.host},
+                )
+                if response.status_code < 500:
+                    return
+            except ValueError as exc:
+                logger.error("Webhook job %s diblokir: %s", job["id"], exc)
+                return
+            except (httpx.HTTPError, OSError) as exc:
+                logger.warning("Webhook job %s gagal: %s", job["id"], exc)
+            if attempt < self.callback_retries:
+                await asyncio.sleep(2**attempt)
+        logger.error("Webhook job %s tidak terkirim ke callback_url.", job["id"])
+
+    async def stop(self, timeout: Optional[float] = None) -> None:
+        """Menunggu antrean & job berjalan selesai lalu menghentikan worker."""
+        if not self._tasks:
+            return
+
+        async def drain():
+            while self.backend.qsize() or self.running:
+                await asyncio.sleep(0.05)
+
+        try:
+            await asyncio.wait_for(drain(), timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.error(
+                "Flush job prediksi timeout, %d job belum diproses.", self.qsize()
+            )
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._http_client is not None:
+            await self._http_client.aclose()
+            self._http_client = None
+
+
+def public_job(job: dict) -> dict:
+    """Field job yang boleh dilihat pemilik (tanpa parameter internal)."""
+    return {
+        "id": job["id"],
+        "status": job["status"],
+        "created_at": job["created_at"],
+        "updated_at": job["updated_at"],
+        "result": job["result"],
+        "error": job["error"],
+    }
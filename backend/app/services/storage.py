@@ -1,53 +1,212 @@
 # app/services/storage.py
+import asyncio
 import uuid
 import os
+from typing import Optional
 from fastapi import UploadFile
-from app.db.client import get_supabase_clients
+from app.db.client import get_supabase_clients, run_io
 from app.configs import settings  # Ganti app.configs menjadi app.config
+from app.services import metrics
+from app.services.cache import TTLCache, content_hash
+from app.services.image_encoding import STORAGE_FORMATS, encode_for_storage
+from app.services.predict_service import PredictService
 
 storage_client, db_client = get_supabase_clients()
 
+if settings.STORAGE_IMAGE_FORMAT not in ("original", *STORAGE_FORMATS):
+    raise ValueError(
+        f"STORAGE_IMAGE_FORMAT '{settings.STORAGE_IMAGE_FORMAT}' tidak dikenal, "
+        f"pilih salah satu: original, {', '.join(STORAGE_FORMATS)}"
+    )
 
-async def upload_file_to_supabase(file: UploadFile):
-    """
-    Mengunggah file ke Supabase Storage, mengganti nama file menjadi UUID,
-    dan menyimpan metadata di Supabase DB.
+# Hasil upload per hash konten: gambar identik memakai objek yang sudah ada
+_upload_cache = TTLCache(maxsize=settings.UPLOAD_CACHE_SIZE)
+
+
+def upload_cache_stats() -> dict:
+    """Statistik cache upload (ukuran & hit rate)."""
+    return _upload_cache.stats()
+
+
+def get_cached_upload(image_hash: str) -> Optional[dict]:
+    """Data upload sebelumnya untuk konten yang sama, None jika belum ada."""
+    return _upload_cache.get(image_hash)
+
+
+def remember_upload(image_hash: str, upload_data: dict) -> None:
+    """Mencatat bahwa konten dengan hash ini sudah ada di storage."""
+    _upload_cache.set(image_hash, upload_data)
+
+
+def _public_url(file_path: str) -> str:
+    """URL publik objek (dibangun dari path, tanpa request jaringan)."""
+    bucket_name = settings.SUPABASE_BUCKET
+    res = storage_client.from_(bucket_name).get_public_url(file_path)
+    return res.replace(
+        f"//storage/v1/object/public/{bucket_name}",
+        f"/storage/v1/object/public/{bucket_name}",
+    )
+
+
+def prepare_upload(filename: str, image_hash: Optional[str] = None) -> dict:
     """
+    Menentukan nama file, path di bucket, dan URL publik tanpa mengunggah.
+    URL publik hanya dibangun dari path, jadi bisa dipakai sebelum upload selesai.
+    Jika `image_hash` diisi, nama file mengikuti hash konten sehingga konten
+    identik selalu menempati objek yang sama.
 
-    # Baca seluruh konten file (ini menghasilkan tipe 'bytes')
-    file_content: bytes = await file.read()
+    Ekstensi mengikuti STORAGE_IMAGE_FORMAT (ekstensi asli pada `original`);
+    path thumbnail dan salinan asli ikut ditentukan sesuai konfigurasi.
+    """
 
-    # 1. GENERASI NAMA FILE BARU (UUID)
+    # 1. GENERASI NAMA FILE BARU (hash konten atau UUID)
     # ---
     # Pisahkan nama file asli dari ekstensinya
-    original_filename, file_extension = os.path.splitext(file.filename)
+    original_filename, original_extension = os.path.splitext(filename or "")
+
+    # Buat nama unik baru
+    new_name = image_hash or uuid.uuid4()
 
-    # Buat UUID unik baru
-    new_uuid = uuid.uuid4()
+    image_format = settings.STORAGE_IMAGE_FORMAT
+    if image_format == "original":
+        file_extension = original_extension
+    else:
+        file_extension = STORAGE_FORMATS[image_format][0]
 
-    # Gabungkan UUID dengan ekstensi asli
-    new_filename = f"{new_uuid}{file_extension}"
+    # Gabungkan nama baru dengan ekstensi format penyimpanan
+    new_filename = f"{new_name}{file_extension}"
 
     # Tentukan path file di Supabase Storage menggunakan nama baru
     # (Menggunakan nama file baru di 'raw_uploads')
     file_path = f"raw_uploads/{new_filename}"
-    bucket_name = settings.SUPABASE_BUCKET
     # ---
 
-    try:
-        # 2. Unggah ke Supabase Storage
-        storage_client.from_(bucket_name).upload(
+    upload_data = {
+        "public_url": _public_url(file_path),
+        "stored_filename": new_filename,
+        "file_path": file_path,
+        "thumbnail_path": None,
+        "thumbnail_url": None,
+        "original_path": None,
+    }
+
+    if settings.THUMBNAIL_MAX_SIDE > 0:
+        thumbnail_extension = STORAGE_FORMATS.get(image_format, (".jpg",))[0]
+        thumbnail_path = f"thumbnails/{new_name}{thumbnail_extension}"
+        upload_data["thumbnail_path"] = thumbnail_path
+        upload_data["thumbnail_url"] = _public_url(thumbnail_path)
+
+    if settings.STORAGE_KEEP_ORIGINAL and image_format != "original":
+        upload_data["original_path"] = f"originals/{new_name}{original_extension}"
+
+    return upload_data
+
+
+async def upload_bytes(
+    file_path: str, file_content: bytes, content_type: str, upsert: bool = False
+):
+    """Mengunggah bytes ke path tertentu di bucket (di executor I/O)."""
+    file_options = {"content-type": content_type}
+    if upsert:
+        # Dipakai saat retry agar upload ulang tidak gagal karena objek sudah ada
+        file_options["upsert"] = "true"
+
+    with metrics.stage_timer("storage_upload"):
+        await run_io(
+            storage_client.from_(settings.SUPABASE_BUCKET).upload,
             file=file_content,
-            path=file_path,  # Menggunakan file_path yang baru
-            file_options={"content-type": file.content_type},
+            path=file_path,
+            file_options=file_options,
         )
 
-        # 3. Dapatkan URL publik
-        res = storage_client.from_(bucket_name).get_public_url(file_path)
-        public_url = res.replace(
-            f"//storage/v1/object/public/{bucket_name}",
-            f"/storage/v1/object/public/{bucket_name}",
+
+async def store_upload(
+    upload_data: dict, file_content: bytes, content_type: str, image_hash: str
+) -> dict:
+    """
+    Re-encode gambar sesuai kebijakan storage (di executor CPU), lalu unggah
+    gambar utama, thumbnail, dan salinan asli (opsional) secara paralel.
+    Hasilnya dicatat di cache upload per hash konten.
+    """
+    with metrics.stage_timer("storage_encode"):
+        variants = await PredictService.run_in_executor(
+            encode_for_storage,
+            file_content,
+            content_type,
+            settings.STORAGE_IMAGE_FORMAT,
+            settings.STORAGE_MAX_SIDE,
+            settings.STORAGE_QUALITY,
+            settings.THUMBNAIL_MAX_SIDE if upload_data["thumbnail_path"] else 0,
+            settings.THUMBNAIL_QUALITY,
+        )
+
+    # upsert: worker lain mungkin sudah mengunggah konten identik ke path ini
+    objects = [(upload_data["file_path"], variants["image"])]
+    if "thumbnail" in variants:
+        objects.append((upload_data["thumbnail_path"], variants["thumbnail"]))
+    if upload_data["original_path"]:
+        objects.append((upload_data["original_path"], (file_content, content_type)))
+
+    await asyncio.gather(
+        *(
+            upload_bytes(path, data, object_type, upsert=True)
+            for path, (data, object_type) in objects
         )
+    )
+
+    result = {
+        "public_url": upload_data["public_url"],
+        "stored_filename": upload_data["stored_filename"],
+        "thumbnail_url": upload_data["thumbnail_url"],
+    }
+    remember_upload(image_hash, result)
+    return result
+
+
+async def upload_file_to_supabase(
+    file: UploadFile,
+    content: Optional[bytes] = None,
+    image_hash: Optional[str] = None,
+    content_type: Optional[str] = None,
+):
+    """
+    Mengunggah file ke Supabase Storage, mengganti nama file menjadi hash
+    konten, dan menyimpan metadata di Supabase DB.
+
+    `content` dapat diisi bytes yang sudah dibaca agar file tidak dibaca ulang,
+    dan `content_type` dengan tipe hasil deteksi magic bytes (default: header
+    dari klien). Konten yang sudah pernah diunggah tidak diunggah lagi.
+    """
+
+    # Baca seluruh konten file (ini menghasilkan tipe 'bytes')
+    file_content: bytes = content if content is not None else await file.read()
+    return await upload_image(
+        file.filename, file_content, image_hash, content_type or file.content_type
+    )
+
+
+async def upload_image(
+    filename: str,
+    file_content: bytes,
+    image_hash: Optional[str],
+    content_type: str,
+):
+    """
+    Seperti `upload_file_to_supabase` tetapi dari bytes + nama file, untuk
+    pemanggil tanpa UploadFile (mis. job prediksi setelah request selesai).
+    """
+    image_hash = image_hash or content_hash(file_content)
+
+    cached_upload = get_cached_upload(image_hash)
+    if cached_upload is not None:
+        return cached_upload
+
+    upload_data = prepare_upload(filename, image_hash)
+
+    try:
+        # 2. Re-encode lalu unggah ke Supabase Storage (encode di executor CPU,
+        # upload di executor I/O, keduanya tidak memblokir event loop).
+        result = await store_upload(upload_data, file_content, content_type, image_hash)
 
         # 4. Simpan metadata ke Supabase Database (Telah diaktifkan kembali)
         # response = db_client('uploads').insert({
@@ -57,12 +216,11 @@ async def upload_file_to_supabase(file: UploadFile):
         #      "size_bytes": len(file_content)
         # }).execute()
 
-        return {
-            "public_url": public_url,
-            "stored_filename": new_filename,
-            # "metadata_id": response.data[0]['id'] if response.data else None
-        }
+        # result["metadata_id"] = response.data[0]['id'] if response.data else None
+        return result
 
+    except ValueError:
+        raise
     except Exception as e:
         # Mengembalikan error dari Supabase atau I/O lainnya
         raise Exception(f"Error dalam service upload Supabase: {e}")
@@ -0,0 +1,64 @@
+# benchmarks/compare.py
+"""Membandingkan dua laporan JSON benchmark (mis. dari dua commit).
+
+Semua angka latensi (`*_ms`), throughput, dan peak RSS yang ada di kedua
+laporan dibandingkan; perubahan di atas `--threshold` persen ditandai. Exit
+code 1 jika ada regresi (latensi/RSS naik atau throughput turun).
+
+Jalankan dari folder backend:
+    python -m benchmarks.compare baseline.json candidate.json --threshold 10
+"""
+
+import argparse
+import json
+import sys
+from typing import Dict, Iterator, Tuple
+
+_HIGHER_IS_BETTER = ("throughput_per_s",)
+_COMPARED_SUFFIXES = ("_ms", "_mb", "throughput_per_s")
+
+
+def _flatten(report: Dict, prefix: str = "") -> Iterator[Tuple[str, float]]:
+    for key, value in report.items():
+        if key == "meta":
+            continue
+        path = f"{prefix}.{key}" if prefix else key
+        if isinstance(value, dict):
+            yield from _flatten(value, path)
+        elif isinstance(value, (int, float)) and key.endswith(_COMPARED_SUFFIXES):
+            yield path, float(value)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=10.0)
+    args = parser.parse_args(argv)
+
+    with open(args.baseline) as f:
+        baseline = dict(_flatten(json.load(f)))
+    with open(args.candidate) as f:
+        candidate = dict(_flatten(json.load(f)))
+
+    regressions = 0
+    for path in sorted(baseline.keys() & candidate.keys()):
+        before, after = baseline[path], candidate[path]
+        if before == 0:
+            continue
+        change = (after - before) / before * 100
+        worse = -change if path.endswith(_HIGHER_IS_BETTER) else change
+        flag = ""
+        if worse > args.threshold:
+            flag = "  REGRESSION"
+            regressions += 1
+        elif worse < -args.threshold:
+            flag = "  improved"
+        print(f"{path:70s} {before:12.3f} -> {after:12.3f} ({change:+7.1f}%){flag}")
+
+    print(f"\n{regressions} regresi di atas {args.threshold:.0f}%")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,102 @@
+# benchmarks/feature_store_rescore.py
+"""Paritas & throughput skoring ulang dari feature store vs ekstraksi ulang.
+
+Fitur beberapa gambar sintetis diekstraksi sekali (waktu per gambar dicatat),
+ditulis ke feature store sementara, lalu diskor ulang lewat `iter_batches`.
+Label dan confidence harus sama persis dengan inferensi langsung pada fitur
+asli (exit code 1 jika tidak). Untuk throughput, store diisi `--records`
+vektor (fitur asli + jitter kecil) dan dialirkan per `--batch-size`.
+
+Jalankan dari folder backend:
+    python -m benchmarks.feature_store_rescore --images 8 --records 100000
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from benchmarks.report import peak_rss_mb, run_metadata, write_report
+from benchmarks.synthetic import encode_jpeg, make_chili_image, parse_resolution
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--resolution", default="fhd")
+    parser.add_argument("--images", type=int, default=8)
+    parser.add_argument("--records", type=int, default=100000)
+    parser.add_argument("--batch-size", type=int, default=8192)
+    parser.add_argument("--output", help="Simpan laporan JSON ke file ini")
+    args = parser.parse_args(argv)
+
+    from app.services.feature_store import FeatureStore
+    from app.services.predict_service import PredictService
+
+    PredictService._load_models()
+    version = PredictService.feature_pipeline_version()
+    width, height = parse_resolution(args.resolution)
+
+    features, extraction_ms = [], []
+    for seed in range(args.images):
+        image_bytes = encode_jpeg(make_chili_image(width, height, seed))
+        start = time.perf_counter()
+        img = PredictService._decode_image(image_bytes)
+        features.append(PredictService._extract_features(img))
+        extraction_ms.append((time.perf_counter() - start) * 1000)
+    features = np.vstack(features)
+
+    with tempfile.TemporaryDirectory() as root:
+        store = FeatureStore(Path(root))
+        keys = [f"image-{index}.jpg" for index in range(args.images)]
+        store.append(version, keys, features)
+        # Key ganda: hanya record pertama yang disimpan
+        store.append(version, keys[:1], features[1:2])
+
+        stored_keys, stored = next(store.iter_batches(version, args.batch_size))
+        parity = {}
+        for model_type in PredictService._MODELS:
+            direct = PredictService._infer_batch(features, model_type)
+            rescored = PredictService._infer_batch(stored, model_type)
+            parity[model_type] = stored_keys == keys and all(
+                (a.label, a.confidence) == (b.label, b.confidence)
+                for a, b in zip(direct, rescored)
+            )
+
+        rng = np.random.default_rng(0)
+        filler = args.records - args.images
+        for start in range(0, filler, args.batch_size):
+            count = min(args.batch_size, filler - start)
+            rows = features[rng.integers(0, args.images, count)]
+            rows = rows + rng.normal(0, 1e-3, rows.shape).astype(np.float32)
+            store.append(version, [f"filler-{start + i}" for i in range(count)], rows)
+
+        start = time.perf_counter()
+        scored = 0
+        for _, vectors in store.iter_batches(version, args.batch_size):
+            for model_type in PredictService._MODELS:
+                PredictService._infer_batch(vectors, model_type)
+            scored += len(vectors)
+        rescore_seconds = time.perf_counter() - start
+        file_mb = store.path(version).stat().st_size / 2**20
+
+    PredictService.shutdown()
+    report = {
+        "meta": run_metadata("feature_store_rescore", vars(args)),
+        "pipeline_version": version,
+        "parity": parity,
+        "extraction_ms_per_image": round(float(np.mean(extraction_ms)), 2),
+        "rescore_records": scored,
+        "rescore_seconds": round(rescore_seconds, 3),
+        "rescore_per_s": round(scored / rescore_seconds, 1),
+        "store_mb": round(file_mb, 2),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+    write_report(report, args.output)
+    return 0 if all(parity.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
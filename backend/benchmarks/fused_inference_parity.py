@@ -0,0 +1,129 @@
+# benchmarks/fused_inference_parity.py
+"""Paritas & latensi inferensi gabungan vs jalur scikit-learn pada model .pkl.
+
+Set fitur uji berisi gambar sintetis, titik latih asli (dipetakan balik dari
+ruang PCA ke ruang fitur, termasuk kasus jarak nol KNN), dan variasi acak di
+sekitarnya. Kernel gabungan selalu dibangun oleh skrip ini (tidak bergantung
+FUSED_INFERENCE) untuk setiap indeks KNN. Label harus identik dan selisih
+probabilitas di bawah toleransi; exit code 1 jika tidak, termasuk bila model
+tidak didukung kernel gabungan sehingga tidak ada yang dibandingkan.
+
+Jalankan dari folder backend:
+    python -m benchmarks.fused_inference_parity
+"""
+
+import argparse
+import json
+import sys
+import time
+
+import numpy as np
+
+from app.services.fused_inference import KNN_INDEXES, build_fused_classifier
+from app.services.predict_service import PredictService
+from benchmarks.synthetic import make_chili_image
+
+MODEL_TYPES = ("knn", "svm")
+
+
+def _feature_set(count: int, seed: int) -> np.ndarray:
+    """Matriks fitur uji (N x D) dari gambar sintetis dan data latih KNN."""
+    rng = np.random.default_rng(seed)
+    synthetic = np.vstack(
+        [
+            PredictService._extract_features(make_chili_image(640, 480, index))
+            for index in range(8)
+        ]
+    )
+
+    # Titik latih KNN ada di ruang PCA; petakan balik ke ruang fitur mentah
+    artifacts = PredictService._MODELS["knn"]
+    training = artifacts["scaler"].inverse_transform(
+        artifacts["pca"].inverse_transform(artifacts["model"]._fit_X)
+    )
+    picks = training[rng.integers(0, len(training), count)]
+    jittered = picks + rng.normal(0, 0.05, picks.shape) * training.std(axis=0)
+
+    return np.vstack([synthetic, training, jittered])
+
+
+def _build_kernel(model_type: str, knn_index: str):
+    """Kernel gabungan seperti `_build_fused`, dengan indeks KNN tertentu."""
+    artifacts = PredictService._MODELS[model_type]
+    classifier = build_fused_classifier(artifacts["model"], knn_index=knn_index)
+    if classifier is None:
+        return None
+    kernel = PredictService._build_fused(artifacts)
+    return {**kernel, "classifier": classifier}
+
+
+def _run(features: np.ndarray, model_type: str, kernel=None):
+    artifacts = PredictService._MODELS[model_type]
+    if kernel is not None:
+        projected = features @ kernel["weights"] + kernel["bias"]
+        class_indices, proba = kernel["classifier"].predict(projected)
+        return kernel["labels"][class_indices], proba
+
+    projected = artifacts["pca"].transform(artifacts["scaler"].transform(features))
+    model = artifacts["model"]
+    labels = artifacts["label_encoder"].inverse_transform(model.predict(projected))
+    return labels, model.predict_proba(projected)
+
+
+def _single_row_latency_us(features: np.ndarray, model_type: str, kernel=None):
+    """Rata-rata latensi per pemanggilan 1xD (kasus /predict)."""
+    start = time.perf_counter()
+    for row in features:
+        _run(row[None, :], model_type, kernel)
+    return (time.perf_counter() - start) * 1e6 / len(features)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--samples", type=int, default=2000)
+    parser.add_argument("--latency-samples", type=int, default=300)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--tolerance", type=float, default=1e-6)
+    args = parser.parse_args(argv)
+
+    PredictService._load_models()
+    features = _feature_set(args.samples, args.seed)
+    latency_rows = features[: args.latency_samples]
+
+    report = {"rows": len(features), "tolerance": args.tolerance, "models": {}}
+    ok = True
+    for model_type in MODEL_TYPES:
+        ref_labels, ref_proba = _run(features, model_type)
+        indexes = KNN_INDEXES if model_type == "knn" else ("auto",)
+        results = {}
+        for knn_index in indexes:
+            kernel = _build_kernel(model_type, knn_index)
+            if kernel is None:
+                results[knn_index] = {"fused": False}
+                ok = False
+                continue
+
+            labels, proba = _run(features, model_type, kernel)
+            label_mismatches = int((ref_labels != labels).sum())
+            max_proba_delta = float(np.abs(ref_proba - proba).max())
+            ok &= label_mismatches == 0 and max_proba_delta <= args.tolerance
+            results[knn_index] = {
+                "label_mismatches": label_mismatches,
+                "max_proba_delta": max_proba_delta,
+                "fused_us_per_row": _single_row_latency_us(
+                    latency_rows, model_type, kernel
+                ),
+            }
+
+        report["models"][model_type] = {
+            "sklearn_us_per_row": _single_row_latency_us(latency_rows, model_type),
+            "kernels": results,
+        }
+
+    report["equivalent"] = bool(ok)
+    print(json.dumps(report, indent=2))
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,95 @@
+# benchmarks/knn_index_scaling.py
+"""Latensi indeks KNN (`brute` vs `kdtree`) terhadap ukuran data latih.
+
+Data latih diperbesar secara sintetis dari titik latih `knn_model.pkl` di
+ruang PCA (sampling ulang + noise Gaussian) sehingga distribusinya tetap mirip
+data asli. Untuk tiap ukuran, top-k setiap indeks dibandingkan dengan
+`KNeighborsClassifier.kneighbors` scikit-learn.
+
+Jalankan dari folder backend:
+    python -m benchmarks.knn_index_scaling --sizes 921 5000 20000 100000
+"""
+
+import argparse
+import json
+import time
+
+import joblib
+import numpy as np
+from sklearn.neighbors import KNeighborsClassifier
+
+from app.services.fused_inference import FusedKNN
+from app.services.predict_service import PredictService
+
+INDEXES = ("brute", "kdtree")
+
+
+def _grow_training_set(model, size: int, noise: float, rng):
+    """Sampling ulang titik latih asli + noise relatif terhadap std tiap dimensi."""
+    fit_x, fit_y = model._fit_X, model._y
+    picks = rng.integers(0, len(fit_x), size)
+    jitter = rng.normal(0, noise, (size, fit_x.shape[1])) * fit_x.std(axis=0)
+    return fit_x[picks] + jitter, model.classes_[fit_y[picks]]
+
+
+def _latency_us(func, queries: np.ndarray, batch: int) -> float:
+    """Rata-rata latensi per query untuk ukuran batch tertentu."""
+    start = time.perf_counter()
+    for begin in range(0, len(queries), batch):
+        func(queries[begin : begin + batch])
+    return (time.perf_counter() - start) * 1e6 / len(queries)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", nargs="+", type=int, default=[921, 5000, 20000])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--noise", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    source = joblib.load(PredictService._MODEL_DIR / "knn_model.pkl")["model"]
+    rng = np.random.default_rng(args.seed)
+    report = {"n_neighbors": source.n_neighbors, "sizes": {}}
+
+    for size in args.sizes:
+        train_x, train_y = _grow_training_set(source, size, args.noise, rng)
+        queries, _ = _grow_training_set(source, args.queries, args.noise, rng)
+
+        reference = KNeighborsClassifier(
+            n_neighbors=source.n_neighbors, weights=source.weights, algorithm="brute"
+        ).fit(train_x, train_y)
+        _, ref_neighbors = reference.kneighbors(queries)
+        ref_sets = [set(row) for row in ref_neighbors]
+
+        result = {}
+        for index in INDEXES:
+            start = time.perf_counter()
+            engine = FusedKNN(reference, index=index)
+            build_ms = (time.perf_counter() - start) * 1000
+
+            _, neighbors = engine.kneighbors(queries)
+            mismatches = sum(
+                set(row) != expected for row, expected in zip(neighbors, ref_sets)
+            )
+            result[index] = {
+                "build_ms": round(build_ms, 2),
+                "single_query_us": round(_latency_us(engine.predict, queries, 1), 1),
+                "batch50_us_per_query": round(
+                    _latency_us(engine.predict, queries, 50), 1
+                ),
+                "topk_mismatches": int(mismatches),
+            }
+
+        result["sklearn_brute"] = {
+            "single_query_us": round(
+                _latency_us(reference.predict_proba, queries, 1), 1
+            ),
+        }
+        report["sizes"][size] = result
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
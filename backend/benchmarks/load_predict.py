@@ -0,0 +1,201 @@
+# benchmarks/load_predict.py
+"""Load test `/predict` in-process dengan klien Supabase diganti stub lokal.
+
+Aplikasi FastAPI dijalankan lewat `httpx.ASGITransport` (tanpa jaringan)
+termasuk lifespan-nya (warm-up model, flush antrean, shutdown executor).
+Token diverifikasi secara lokal (HS256 dengan secret acak), sedangkan upload
+storage dan insert DB diganti stub yang bisa diberi latensi buatan
+(`--io-latency-ms`) untuk meniru round trip Supabase.
+
+Cache prediksi & upload dimatikan secara default agar setiap request
+benar-benar menjalankan pipeline; aktifkan dengan `--with-cache`.
+
+Jalankan dari folder backend:
+    python -m benchmarks.load_predict --requests 200 --concurrency 8 --output load.json
+"""
+
+import argparse
+import asyncio
+import os
+import secrets
+import time
+import types
+import uuid
+from collections import Counter
+from datetime import datetime, timezone
+
+from benchmarks.report import latency_summary, peak_rss_mb, run_metadata, write_report
+from benchmarks.synthetic import encode_jpeg, make_chili_image, parse_resolution
+
+
+class _StubQuery:
+    """Pengganti `db_client(table)`: insert/upsert langsung mengembalikan baris."""
+
+    def __init__(self, latency_s: float):
+        self._latency_s = latency_s
+        self._payload = None
+
+    def insert(self, payload):
+        self._payload = payload
+        return self
+
+    upsert = insert
+
+    def execute(self):
+        if self._latency_s:
+            time.sleep(self._latency_s)
+        rows = self._payload if isinstance(self._payload, list) else [self._payload]
+        data = [
+            {
+                "id": row.get("id", str(uuid.uuid4())),
+                "created_at": row.get(
+                    "created_at", datetime.now(timezone.utc).isoformat()
+                ),
+                **row,
+            }
+            for row in rows
+        ]
+        return types.SimpleNamespace(data=data)
+
+
+class _StubBucket:
+    def __init__(self, latency_s: float):
+        self._latency_s = latency_s
+
+    def upload(self, file, path, file_options=None):
+        if self._latency_s:
+            time.sleep(self._latency_s)
+
+    def get_public_url(self, path):
+        return f"http://localhost/storage/v1/object/public/benchmark/{path}"
+
+
+class _StubStorage:
+    def __init__(self, latency_s: float):
+        self._latency_s = latency_s
+
+    def from_(self, bucket):
+        return _StubBucket(self._latency_s)
+
+
+def _configure_environment(args) -> str:
+    """Set env sebelum modul app diimpor (Settings dibaca saat import)."""
+    secret = secrets.token_hex(32)
+    os.environ.setdefault("SUPABASE_URL", "http://localhost:54321")
+    os.environ.setdefault("SUPABASE_KEY", "benchmark")
+    os.environ["SUPABASE_JWT_SECRET"] = secret
+    os.environ["FEATURE_EXECUTOR_BACKEND"] = args.executor
+    if args.workers:
+        os.environ["FEATURE_EXECUTOR_WORKERS"] = str(args.workers)
+    if not args.with_cache:
+        os.environ["PREDICTION_CACHE_SIZE"] = "0"
+        os.environ["UPLOAD_CACHE_SIZE"] = "0"
+    return secret
+
+
+def _install_stubs(latency_s: float) -> None:
+    import app.routes.predict as predict_routes
+    import app.services.storage as storage
+
+    storage.storage_client = _StubStorage(latency_s)
+    storage.db_client = lambda table: _StubQuery(latency_s)
+    predict_routes.db_client = lambda table: _StubQuery(latency_s)
+
+
+async def _run_load(args, token: str, images) -> dict:
+    import httpx
+
+    from app.main import app
+
+    latencies_ms, statuses = [], Counter()
+    counter = iter(range(args.requests))
+
+    async def worker(client):
+        for index in counter:
+            filename, image_bytes = images[index % len(images)]
+            start = time.perf_counter()
+            response = await client.post(
+                args.path,
+                files={"file": (filename, image_bytes, "image/jpeg")},
+                headers={"Authorization": f"Bearer {token}"},
+            )
+            latencies_ms.append((time.perf_counter() - start) * 1000)
+            statuses[response.status_code] += 1
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://benchmark", timeout=None
+        ) as client:
+            wall_start = time.perf_counter()
+            await asyncio.gather(*(worker(client) for _ in range(args.concurrency)))
+            wall_seconds = time.perf_counter() - wall_start
+
+    return {
+        "latency": latency_summary(latencies_ms, wall_seconds),
+        "errors": args.requests - statuses[200],
+        # 429/503 = ditolak admission control (lihat ADMISSION_*)
+        "status_counts": {str(code): count for code, count in sorted(statuses.items())},
+        "wall_seconds": round(wall_seconds, 3),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--resolution", default="fhd")
+    parser.add_argument(
+        "--distinct-images",
+        type=int,
+        default=10,
+        help="Jumlah gambar sintetis berbeda yang dipakai bergiliran.",
+    )
+    parser.add_argument("--executor", choices=("thread", "process"), default="thread")
+    parser.add_argument("--workers", type=int, help="FEATURE_EXECUTOR_WORKERS")
+    parser.add_argument("--io-latency-ms", type=float, default=0.0)
+    parser.add_argument("--with-cache", action="store_true")
+    parser.add_argument(
+        "--path", default="/predict", help="Endpoint, mis. /predict?defer=true"
+    )
+    parser.add_argument("--output", help="Simpan laporan JSON ke file ini")
+    args = parser.parse_args(argv)
+
+    secret = _configure_environment(args)
+    _install_stubs(args.io_latency_ms / 1000)
+
+    import jwt
+
+    token = jwt.encode(
+        {
+            "sub": str(uuid.uuid4()),
+            "aud": "authenticated",
+            "exp": int(time.time()) + 3600,
+        },
+        secret,
+        algorithm="HS256",
+    )
+
+    width, height = parse_resolution(args.resolution)
+    images = [
+        (f"chili-{seed}.jpg", encode_jpeg(make_chili_image(width, height, seed)))
+        for seed in range(args.distinct_images)
+    ]
+
+    # Metadata dikumpulkan lebih dulu: subprocess git tidak boleh ikut terhitung
+    # sebagai peak RSS proses anak
+    meta = run_metadata("load_predict", vars(args))
+    result = asyncio.run(_run_load(args, token, images))
+    report = {
+        "meta": meta,
+        "resolution": f"{width}x{height}",
+        **result,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+    if args.executor == "process":
+        report["peak_rss_children_mb"] = peak_rss_mb(children=True)
+    write_report(report, args.output)
+
+
+if __name__ == "__main__":
+    main()
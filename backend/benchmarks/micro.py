@@ -0,0 +1,125 @@
+# benchmarks/micro.py
+"""Micro-benchmark tiap tahap PredictService per resolusi.
+
+Setiap resolusi dijalankan di proses terpisah (spawn) sehingga peak RSS per
+resolusi tidak tercampur. Input tiap tahap diambil dari keluaran tahap
+sebelumnya pada gambar sintetis yang sama, jadi angka per tahap dapat
+dijumlahkan mendekati `_extract_features`.
+
+Jalankan dari folder backend:
+    python -m benchmarks.micro --resolutions vga fhd 12mp --output micro.json
+"""
+
+import argparse
+import multiprocessing
+import time
+from typing import Callable, Dict, List
+
+import cv2
+
+from benchmarks.report import latency_summary, peak_rss_mb, run_metadata, write_report
+from benchmarks.synthetic import encode_jpeg, make_chili_image, parse_resolution
+
+
+def _time_ms(func: Callable, repeats: int) -> List[float]:
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def _bench_resolution(width: int, height: int, images: int, repeats: int) -> Dict:
+    """Benchmark semua tahap untuk satu resolusi (dijalankan di proses anak)."""
+    from app.services.image_encoding import probe_image_size
+    from app.services.predict_service import PredictService as service
+
+    cv2.setNumThreads(1)
+    service._load_models()
+
+    samples: Dict[str, List[float]] = {}
+
+    def bench(stage: str, func: Callable):
+        func()  # warm-up (alokasi pertama, cache instruksi)
+        samples.setdefault(stage, []).extend(_time_ms(func, repeats))
+
+    for seed in range(images):
+        image_bytes = encode_jpeg(make_chili_image(width, height, seed))
+        img = service._decode_image(image_bytes)
+
+        # Keluaran antar tahap untuk input tahap berikutnya
+        wb = service._gray_world_white_balance(img)
+        denoised = cv2.bilateralFilter(wb, d=9, sigmaColor=75, sigmaSpace=75)
+        hsv = cv2.cvtColor(denoised, cv2.COLOR_BGR2HSV)
+        mask = service._build_fruit_mask(hsv)
+        processed = service._preprocess_image(img)
+        gray = cv2.cvtColor(processed["enhanced"], cv2.COLOR_BGR2GRAY)
+
+        bench("probe_image_size", lambda: probe_image_size(image_bytes))
+        bench("decode_image", lambda: service._decode_image(image_bytes))
+        bench(
+            "gray_world_white_balance", lambda: service._gray_world_white_balance(img)
+        )
+        bench(
+            "bilateral_filter",
+            lambda: cv2.bilateralFilter(wb, d=9, sigmaColor=75, sigmaSpace=75),
+        )
+        bench("build_fruit_mask", lambda: service._build_fruit_mask(hsv))
+        bench("mask_aware_crop", lambda: service._mask_aware_crop(denoised, mask))
+        bench("preprocess_image", lambda: service._preprocess_image(img))
+        bench(
+            "extract_hsv_features",
+            lambda: service._extract_hsv_features(processed["hsv"]),
+        )
+        bench(
+            "extract_glcm_features",
+            lambda: service._extract_glcm_features(gray, processed["mask"]),
+        )
+        bench(
+            "extract_ccd_features",
+            lambda: service._extract_ccd_features(
+                processed["mask"], service._CCD_POINTS
+            ),
+        )
+        bench("extract_features", lambda: service._extract_features(img))
+
+        features = service._extract_features(img).reshape(1, -1)
+        for model_type in service._MODELS:
+            bench(
+                f"infer_{model_type}",
+                lambda: service._infer_batch(features, model_type),
+            )
+
+    return {
+        "stages": {stage: latency_summary(values) for stage, values in samples.items()},
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--resolutions", nargs="+", default=["vga", "fhd", "12mp"])
+    parser.add_argument("--images", type=int, default=3)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--output", help="Simpan laporan JSON ke file ini")
+    args = parser.parse_args(argv)
+
+    report = {
+        "meta": run_metadata("micro", vars(args)),
+        "resolutions": {},
+    }
+
+    context = multiprocessing.get_context("spawn")
+    for resolution in args.resolutions:
+        width, height = parse_resolution(resolution)
+        with context.Pool(1) as pool:
+            report["resolutions"][f"{width}x{height}"] = pool.apply(
+                _bench_resolution, (width, height, args.images, args.repeats)
+            )
+
+    write_report(report, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+# benchmarks/preprocess_allocations.py
+"""Alokasi & peak memori `_preprocess_image` mode standar vs lean per gambar.
+
+Setiap varian dijalankan di proses terpisah (spawn). Gambar pertama dipakai
+sebagai warm-up (buffer kerja lean terisi), lalu untuk tiap gambar berikutnya
+diukur:
+
+- `traced_peak_mb`: peak memori tracemalloc di atas baseline (array NumPy dan
+  keluaran OpenCV) selama satu kali preprocessing.
+- `large_allocations`: jumlah langkah eksekusi (baris Python di modul service)
+  yang mengalokasikan >= `--threshold-kb` sementara maupun permanen. Beberapa
+  array sementara pada satu baris dihitung satu, jadi angka ini batas bawah.
+- latensi tanpa tracing.
+
+Keluaran kedua varian dibandingkan per gambar; jika ada satu array pun yang
+berbeda di resolusi mana pun, laporan menandai gagal paritas dan skrip keluar
+dengan exit code 1 (bisa dipakai sebagai cek CI).
+
+Jalankan dari folder backend:
+    python -m benchmarks.preprocess_allocations --resolutions vga fhd 12mp
+"""
+
+import argparse
+import multiprocessing
+import sys
+import time
+import tracemalloc
+from typing import Dict, List
+
+import numpy as np
+
+from benchmarks.report import (
+    latency_summary,
+    peak_rss_mb,
+    run_metadata,
+    write_report,
+)
+from benchmarks.synthetic import make_dataset, parse_resolution
+
+VARIANTS = {"standard": False, "lean": True}
+_TRACED_MODULES = ("app.services.predict_service",)
+
+
+class _StepTracer:
+    """Menghitung langkah (baris) yang mengalokasikan >= threshold byte."""
+
+    def __init__(self, threshold: int):
+        self.threshold = threshold
+        self.large_allocations = 0
+        self._mark = 0
+
+    def _close_step(self) -> None:
+        current, peak = tracemalloc.get_traced_memory()
+        if peak - self._mark >= self.threshold:
+            self.large_allocations += 1
+        tracemalloc.reset_peak()
+        self._mark = tracemalloc.get_traced_memory()[0]
+
+    def _trace(self, frame, event, arg):
+        if frame.f_globals.get("__name__") not in _TRACED_MODULES:
+            return None
+        if event in ("line", "return"):
+            self._close_step()
+        return self._trace
+
+    def run(self, func, *args):
+        self._mark = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        sys.settrace(self._trace)
+        try:
+            return func(*args)
+        finally:
+            sys.settrace(None)
+            self._close_step()
+
+
+def _run_variant(
+    lean: bool, mode: str, images: List[bytes], repeats: int, threshold: int
+) -> Dict:
+    """Preprocessing semua gambar dengan satu varian (dijalankan di proses anak)."""
+    import cv2
+
+    from app.services.predict_service import PredictService
+
+    cv2.setNumThreads(1)
+    decoded = [PredictService._decode_image(data, mode) for data in images]
+    PredictService._preprocess_image(decoded[0], mode, lean=lean)  # warm-up
+
+    latencies_ms, peaks_mb, allocations, outputs = [], [], [], []
+    for img in decoded[1:]:
+        for _ in range(repeats):
+            start = time.perf_counter()
+            PredictService._preprocess_image(img, mode, lean=lean)
+            latencies_ms.append((time.perf_counter() - start) * 1000)
+
+        tracemalloc.start()
+        baseline = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        PredictService._preprocess_image(img, mode, lean=lean)
+        peaks_mb.append((tracemalloc.get_traced_memory()[1] - baseline) / 2**20)
+
+        tracer = _StepTracer(threshold)
+        outputs.append(
+            tracer.run(PredictService._preprocess_image, img, mode, None, lean)
+        )
+        allocations.append(tracer.large_allocations)
+        tracemalloc.stop()
+
+    return {
+        "latency": latency_summary(latencies_ms),
+        "traced_peak_mb": round(float(np.mean(peaks_mb)), 2),
+        "large_allocations": float(np.mean(allocations)),
+        "peak_rss_mb": peak_rss_mb(),
+        "outputs": outputs,
+    }
+
+
+def _identical(reference: List[dict], candidate: List[dict]) -> bool:
+    return len(reference) == len(candidate) and all(
+        ref.keys() == cand.keys()
+        and all(np.array_equal(ref[key], cand[key]) for key in ref)
+        for ref, cand in zip(reference, candidate)
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--resolutions", nargs="+", default=["vga", "fhd", "12mp"])
+    parser.add_argument("--mode", default="full", choices=["full", "downscale"])
+    parser.add_argument("--images", type=int, default=4)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--threshold-kb", type=int, default=64)
+    parser.add_argument("--output", help="Simpan laporan JSON ke file ini")
+    args = parser.parse_args(argv)
+
+    report = {
+        "meta": run_metadata("preprocess_allocations", vars(args)),
+        "resolutions": {},
+    }
+
+    ok = True
+    context = multiprocessing.get_context("spawn")
+    for resolution in args.resolutions:
+        width, height = parse_resolution(resolution)
+        images = make_dataset(width, height, args.images + 1)
+
+        runs = {}
+        for name, lean in VARIANTS.items():
+            with context.Pool(1) as pool:
+                runs[name] = pool.apply(
+                    _run_variant,
+                    (lean, args.mode, images, args.repeats, args.threshold_kb * 1024),
+                )
+
+        parity = _identical(runs["standard"]["outputs"], runs["lean"]["outputs"])
+        ok &= parity
+        report["resolutions"][f"{width}x{height}"] = {
+            "variants": {
+                name: {key: value for key, value in run.items() if key != "outputs"}
+                for name, run in runs.items()
+            },
+            "identical_outputs": parity,
+        }
+
+    report["identical_outputs"] = bool(ok)
+    write_report(report, args.output)
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,117 @@
+# benchmarks/preprocess_parity.py
+"""Laporan paritas preprocessing mode `full` vs `downscale`.
+
+Setiap mode dijalankan di proses terpisah (spawn) agar peak RSS bisa
+dibandingkan secara adil. Label dan confidence kedua model dibandingkan per
+gambar terhadap pipeline `full` (acuan saat ini).
+
+Jalankan dari folder backend:
+    python -m benchmarks.preprocess_parity --resolutions fhd 12mp --images 6
+"""
+
+import argparse
+import json
+import multiprocessing
+import time
+import tracemalloc
+from typing import Dict, List
+
+import numpy as np
+
+from benchmarks.report import peak_rss_mb
+from benchmarks.synthetic import make_dataset, parse_resolution
+
+MODES = ("full", "downscale")
+
+
+def _run_mode(mode: str, images: List[bytes]) -> Dict:
+    """Decode + ekstraksi + inferensi semua gambar dengan satu mode preprocessing."""
+    from app.services.predict_service import PredictService
+
+    PredictService._load_models()
+
+    latencies_ms, traced_peaks_mb, features = [], [], []
+    for image_bytes in images:
+        tracemalloc.start()
+        start = time.perf_counter()
+        img_bgr = PredictService._decode_image(image_bytes, mode)
+        features.append(PredictService._extract_features(img_bgr, mode))
+        latencies_ms.append((time.perf_counter() - start) * 1000)
+        traced_peaks_mb.append(tracemalloc.get_traced_memory()[1] / (1024 * 1024))
+        tracemalloc.stop()
+
+    matrix = np.vstack(features)
+    predictions = {}
+    for model_type in ("knn", "svm"):
+        results = PredictService._infer_batch(matrix, model_type)
+        predictions[model_type] = [(r.label, r.confidence) for r in results]
+
+    return {
+        "latency_ms": latencies_ms,
+        "traced_peak_mb": traced_peaks_mb,
+        "peak_rss_mb": peak_rss_mb(),
+        "predictions": predictions,
+    }
+
+
+def _summarize(reference: Dict, candidate: Dict, tolerance: float) -> Dict:
+    """Membandingkan hasil kandidat terhadap acuan per model."""
+    parity = {}
+    for model_type, ref_predictions in reference["predictions"].items():
+        cand_predictions = candidate["predictions"][model_type]
+        label_match = [
+            ref[0] == cand[0] for ref, cand in zip(ref_predictions, cand_predictions)
+        ]
+        confidence_delta = [
+            abs(ref[1] - cand[1])
+            for ref, cand in zip(ref_predictions, cand_predictions)
+        ]
+        parity[model_type] = {
+            "label_agreement": float(np.mean(label_match)),
+            "max_confidence_delta": float(np.max(confidence_delta)),
+            "within_tolerance": all(label_match) and max(confidence_delta) <= tolerance,
+        }
+    return parity
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--resolutions", nargs="+", default=["fhd", "12mp"])
+    parser.add_argument("--images", type=int, default=6)
+    parser.add_argument("--tolerance", type=float, default=0.05)
+    parser.add_argument("--output", help="Simpan laporan JSON ke file ini")
+    args = parser.parse_args(argv)
+
+    context = multiprocessing.get_context("spawn")
+    report = {"tolerance": args.tolerance, "resolutions": {}}
+
+    for resolution in args.resolutions:
+        width, height = parse_resolution(resolution)
+        images = make_dataset(width, height, args.images)
+
+        runs = {}
+        for mode in MODES:
+            with context.Pool(1) as pool:
+                runs[mode] = pool.apply(_run_mode, (mode, images))
+
+        report["resolutions"][f"{width}x{height}"] = {
+            "modes": {
+                mode: {
+                    "mean_latency_ms": float(np.mean(run["latency_ms"])),
+                    "max_traced_peak_mb": float(np.max(run["traced_peak_mb"])),
+                    "peak_rss_mb": run["peak_rss_mb"],
+                }
+                for mode, run in runs.items()
+            },
+            "parity": _summarize(runs["full"], runs["downscale"], args.tolerance),
+        }
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+# benchmarks/report.py
+"""Helper laporan benchmark: statistik latensi, peak RSS, dan metadata run.
+
+Semua script benchmark menulis JSON dengan struktur yang sama (`meta` +
+hasil) sehingga dua run dari commit berbeda bisa dibandingkan dengan
+`python -m benchmarks.compare`.
+"""
+
+import json
+import os
+import platform
+import subprocess
+import sys
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+import numpy as np
+
+
+def latency_summary(samples_ms: List[float], wall_seconds: Optional[float] = None):
+    """p50/p95/p99/mean/max (ms) dan throughput (per detik) dari sampel latensi.
+
+    Throughput dihitung dari `wall_seconds` jika diisi (mis. load test
+    konkuren), selain itu dari jumlah durasi sampel (eksekusi berurutan).
+    """
+    samples = np.asarray(samples_ms, dtype=float)
+    wall = wall_seconds if wall_seconds is not None else samples.sum() / 1000
+    return {
+        "count": int(samples.size),
+        "mean_ms": round(float(samples.mean()), 3),
+        "p50_ms": round(float(np.percentile(samples, 50)), 3),
+        "p95_ms": round(float(np.percentile(samples, 95)), 3),
+        "p99_ms": round(float(np.percentile(samples, 99)), 3),
+        "max_ms": round(float(samples.max()), 3),
+        "throughput_per_s": round(samples.size / wall, 2) if wall > 0 else None,
+    }
+
+
+def peak_rss_mb(children: bool = False):
+    """Peak RSS proses saat ini dalam MB (None jika platform tidak mendukung).
+
+    `children=True` mengembalikan peak RSS terbesar proses anak yang sudah
+    selesai (mis. worker ProcessPoolExecutor setelah shutdown).
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    who = resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF
+    peak = resource.getrusage(who).ru_maxrss
+    # Linux melaporkan KB, macOS melaporkan byte
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_metadata(benchmark: str, params: Dict) -> Dict:
+    """Metadata run agar hasil antar commit/mesin bisa dibandingkan dengan adil."""
+    import cv2
+    import sklearn
+
+    return {
+        "benchmark": benchmark,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+        "opencv": cv2.__version__,
+        "sklearn": sklearn.__version__,
+        "params": params,
+    }
+
+
+def write_report(report: Dict, output: Optional[str]) -> None:
+    """Cetak laporan JSON ke stdout dan (opsional) simpan ke file."""
+    text = json.dumps(report, indent=2)
+    if output:
+        with open(output, "w") as f:
+            f.write(text + "\n")
+    print(text)
@@ -0,0 +1,88 @@
+# benchmarks/synthetic.py
+"""Generator gambar cabai sintetis untuk benchmark dan laporan paritas."""
+
+from typing import List, Tuple
+
+import cv2
+import numpy as np
+
+# Hue OpenCV (0-179) kira-kira untuk cabai hijau, oranye, dan merah
+CHILI_HUES = (60, 45, 20, 10, 3, 175)
+
+RESOLUTIONS = {
+    "vga": (640, 480),
+    "hd": (1280, 720),
+    "fhd": (1920, 1080),
+    "5mp": (2592, 1944),
+    "12mp": (4000, 3000),
+}
+
+
+def parse_resolution(value: str) -> Tuple[int, int]:
+    """Menerima nama preset (mis. `12mp`) atau format `LEBARxTINGGI`."""
+    if value.lower() in RESOLUTIONS:
+        return RESOLUTIONS[value.lower()]
+    width, _, height = value.lower().partition("x")
+    return int(width), int(height)
+
+
+def make_chili_image(width: int, height: int, seed: int = 0) -> np.ndarray:
+    """Membuat satu gambar BGR: buah berbentuk elips memanjang di atas daun/tanah."""
+    rng = np.random.default_rng(seed)
+
+    # Background hijau/coklat
+    background_hsv = np.uint8(
+        [[[rng.integers(35, 80), rng.integers(80, 200), rng.integers(60, 160)]]]
+    )
+    background = cv2.cvtColor(background_hsv, cv2.COLOR_HSV2BGR)[0, 0]
+    img = np.empty((height, width, 3), dtype=np.uint8)
+    img[:] = background
+
+    # Buah cabai
+    hue = int(CHILI_HUES[seed % len(CHILI_HUES)])
+    fruit_hsv = np.uint8([[[hue, rng.integers(170, 255), rng.integers(150, 255)]]])
+    fruit = cv2.cvtColor(fruit_hsv, cv2.COLOR_HSV2BGR)[0, 0].tolist()
+    center = (
+        int(width * rng.uniform(0.35, 0.65)),
+        int(height * rng.uniform(0.35, 0.65)),
+    )
+    axes = (int(min(width, height) * 0.4), int(min(width, height) * 0.09))
+    angle = float(rng.uniform(0, 180))
+    cv2.ellipse(img, center, axes, angle, 0, 360, fruit, -1, cv2.LINE_AA)
+
+    # Highlight tipis agar buah tidak berwarna datar
+    highlight = [min(channel + 40, 255) for channel in fruit]
+    cv2.ellipse(
+        img,
+        center,
+        (axes[0] // 2, max(axes[1] // 4, 1)),
+        angle,
+        0,
+        360,
+        highlight,
+        -1,
+        cv2.LINE_AA,
+    )
+
+    # Tekstur noise (dibuat kecil lalu di-upscale agar murah untuk 12 MP)
+    noise_small = rng.normal(0, 18, (max(height // 8, 1), max(width // 8, 1), 3))
+    noise = cv2.resize(noise_small.astype(np.float32), (width, height))
+    img = cv2.add(img, noise, dtype=cv2.CV_8U)
+    ksize = max(3, (min(width, height) // 200) | 1)
+    return cv2.GaussianBlur(img, (ksize, ksize), 0)
+
+
+def encode_jpeg(img_bgr: np.ndarray, quality: int = 90) -> bytes:
+    """Encode gambar menjadi JPEG seperti hasil kamera ponsel."""
+    ok, buffer = cv2.imencode(".jpg", img_bgr, [cv2.IMWRITE_JPEG_QUALITY, quality])
+    if not ok:
+        raise ValueError("Gagal encode gambar sintetis.")
+    return buffer.tobytes()
+
+
+def make_dataset(width: int, height: int, count: int, seed: int = 0) -> List[bytes]:
+    """Membuat `count` gambar JPEG sintetis dengan resolusi yang sama."""
+    return [
+        encode_jpeg(make_chili_image(width, height, seed + index))
+        for index in range(count)
+    ]
@@ -0,0 +1,3 @@
+-- Thumbnail riwayat (THUMBNAIL_MAX_SIDE > 0): URL objek di prefix thumbnails/
+alter table public.predict_history
+    add column if not exists thumbnail_url text;
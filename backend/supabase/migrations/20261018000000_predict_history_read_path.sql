@@ -0,0 +1,31 @@
+-- Jalur baca riwayat prediksi (/history dan /history/stats).
+
+-- Pagination keyset: filter user_id lalu range scan (created_at, id) menurun
+create index if not exists predict_history_user_created_at_id_idx
+    on public.predict_history (user_id, created_at desc, id desc);
+
+-- Jumlah prediksi per label per model dalam rentang [p_from, p_to)
+create or replace function public.predict_history_stats(
+    p_user_id uuid,
+    p_from timestamptz default null,
+    p_to timestamptz default null
+)
+returns table (model text, label text, total bigint)
+language sql
+stable
+as $$
+    with scoped as (
+        select svm_result, knn_result
+        from public.predict_history
+        where user_id = p_user_id
+          and (p_from is null or created_at >= p_from)
+          and (p_to is null or created_at < p_to)
+    )
+    select 'svm', svm_result, count(*) from scoped
+    where svm_result is not null
+    group by svm_result
+    union all
+    select 'knn', knn_result, count(*) from scoped
+    where knn_result is not null
+    group by knn_result;
+$$;
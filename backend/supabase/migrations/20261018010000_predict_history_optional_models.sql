@@ -0,0 +1,34 @@
+-- /predict?models=svm|knn dan mode kaskade: hasil model yang tidak dijalankan
+-- disimpan NULL; daftar model yang dijalankan ada di statistics->models_run.
+
+alter table public.predict_history
+    alter column svm_result drop not null,
+    alter column knn_result drop not null;
+
+-- Baris 'all' berisi jumlah total prediksi (tidak lagi sama dengan jumlah per model)
+create or replace function public.predict_history_stats(
+    p_user_id uuid,
+    p_from timestamptz default null,
+    p_to timestamptz default null
+)
+returns table (model text, label text, total bigint)
+language sql
+stable
+as $$
+    with scoped as (
+        select svm_result, knn_result
+        from public.predict_history
+        where user_id = p_user_id
+          and (p_from is null or created_at >= p_from)
+          and (p_to is null or created_at < p_to)
+    )
+    select 'all', null, count(*) from scoped
+    union all
+    select 'svm', svm_result, count(*) from scoped
+    where svm_result is not null
+    group by svm_result
+    union all
+    select 'knn', knn_result, count(*) from scoped
+    where knn_result is not null
+    group by knn_result;
+$$;